@@ -0,0 +1,54 @@
+"""
+Проверка времени холодного импорта пакетов gens и gen_tests.
+
+Каждый импорт выполняется в отдельном процессе с `python -X importtime`; из отчета
+берется суммарное время модуля верхнего уровня и сравнивается с бюджетом.
+Запуск из каталога ProjectPython:
+
+    python benchmarks/import_time.py
+
+Код возврата 1 означает, что хотя бы один импорт превысил бюджет.
+"""
+import os
+import subprocess
+import sys
+
+#бюджеты холодного импорта, микросекунды
+BUDGETS = {
+    "gens": 50_000,
+    "gen_tests": 50_000,
+}
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PATHS = [os.path.join(ROOT, "scr"), os.path.join(ROOT, "scr_tests")]
+
+def import_time(module: str):
+    """
+    Измеряет суммарное время импорта модуля `module` в новом процессе.
+
+    :param module: Имя модуля.
+    :type module: str
+    :return: Время импорта в микросекундах.
+    :rtype: int
+    """
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(PATHS + [env.get("PYTHONPATH", "")])
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                            env=env, capture_output=True, text=True, check=True)
+    for line in result.stderr.splitlines():
+        parts = line.split("|")
+        if len(parts) == 3 and parts[2].strip() == module and not parts[2][1:].startswith(" "):
+            return int(parts[1])
+    raise RuntimeError(f"no importtime record for {module}")
+
+def main():
+    failed = False
+    for module, budget in BUDGETS.items():
+        took = import_time(module)
+        status = "ok" if took <= budget else "OVER BUDGET"
+        failed |= took > budget
+        print(f"{module:<12}{took/1000:8.1f} ms  (budget {budget/1000:.0f} ms)  {status}")
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
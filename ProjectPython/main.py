@@ -9,7 +9,6 @@ num: int = 1000
 
 gen1 = bbs_generator()
 gen2 = lagged_fibonacci_generator()
-print('поводи мышкой пжпж')
 gen3 = fortuna()
 gen4 = isaac_generator()
 m: int = 2_147_483_648
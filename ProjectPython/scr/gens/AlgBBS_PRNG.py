@@ -1,5 +1,16 @@
-from math import *
+from concurrent.futures import ProcessPoolExecutor
+from math import gcd
+import os
+import numpy as np
 from gens.LCM import *
+from gens.primes import blum_pair, blum_primes
+from gens.protocol import BaseGenerator
+
+#gmpy2 (если установлен) ускоряет арифметику больших чисел в несколько раз
+try:
+    from gmpy2 import mpz
+except ImportError:
+    mpz = int
 
 def preferences(ind):
     """
@@ -12,19 +23,14 @@ def preferences(ind):
     :rtype: tuple[int, int]
 
     Алгоритм:
-    - Создает список простых чисел, удовлетворяющих критериям:
-      - Число `i` из последовательности `[3, 7, 11, ...]` (шаг 4).
-      - Число больше `3 * 10^6` и не имеет делителей, кроме 1 и самого себя.
+    - Берет список из 1000 первых простых чисел Блюма (`i = 3 mod 4`), больших `3 * 10^6`.
+      Список строится один раз сегментированным решетом (`gens.primes.blum_primes`)
+      и кэшируется, поэтому повторные вызовы не повторяют поиск.
     - Возвращает пару чисел `p` и `q`, где:
       - gcd(p, q) < 1000, то есть НОД этих чисел должен быть сравнительно мал.
       - `p` и `q` различны, если это возможно, иначе возвращаются одинаковые числа.
     """
-    prime = []
-    for i in range(3,10**8,4):
-        if i > 3*10**6 and all(i%x != 0 for x in range(2,int(i**0.5)+1)):
-            prime.append(i)
-            if len(prime) == 1000:
-                break
+    prime = blum_primes(3*10**6, 1000)
     for i in range(len(prime)):
         if gcd(prime[ind], prime[i]) < 1000 and prime[ind] != prime[i]:
             p: int = prime[i]
@@ -38,17 +44,257 @@ m: int = 2_147_483_648
 a: int = 594_156_893
 c: int = 75_692
 seed: int = 123_456_789
-gen = linear_congruential_generator(m, a, c, seed)
+gen = None
+
+def seed_generator():
+    """
+    Возвращает общий для всех экземпляров BBS линейный конгруэнтный генератор,
+    из которого берутся начальные значения и индексы простых чисел.
+    Генератор создается при первом вызове, а не при импорте модуля.
+
+    :rtype: LinearCongruentialGenerator
+    """
+    global gen
+    if gen is None:
+        gen = linear_congruential_generator(m, a, c, seed)
+    return gen
+
+class BlumBlumShub(BaseGenerator):
+    """
+    Генератор Blum-Blum-Shub `x = (x^2) % n`, `n = p*q`.
+
+    Производительность `random_bytes` дает извлечение `bits_per_step` младших бит
+    из каждого состояния (вместо одного) и арифметика gmpy2, если он установлен.
+    Возведение в квадрат по модулям `p` и `q` с восстановлением по китайской теореме
+    об остатках не ускоряет поток: младшие биты `x` требуют восстановления на каждом
+    шаге, а оно стоит столько же, сколько сэкономленное умножение. Китайская теорема
+    об остатках используется только в `at(i)` для произвольного доступа.
+
+    Атрибуты:
+        p (int), q (int): Простые числа Блюма.
+        m (int): Модуль `n = p*q`.
+        x (int): Следующее выдаваемое значение.
+        bits_per_step (int): Количество младших бит, извлекаемых из каждого состояния
+            (оно же `bits` общего интерфейса).
+        seed (int): Начальное значение `x_0`.
+        position (int): Номер `i` следующего выдаваемого состояния `x_i`.
+
+    Методы:
+        random_bytes(n):
+            Возвращает `n` случайных байт из младших бит последовательных состояний.
+        at(i):
+            Вычисляет состояние `x_i` по замкнутой формуле, не меняя генератор.
+        seek(i):
+            Переводит генератор на состояние `x_i` (вперед или назад; им же
+            выполняется `skip(k)`).
+        parallel_random_bytes(n, workers):
+            То же, что `random_bytes(n)`, но участки потока считаются в нескольких процессах.
+    """
+    def __init__(self, p: int, q: int, seed: int, bits_per_step: int = None):
+        """
+        :param p: Первое простое число.
+        :param q: Второе простое число.
+        :param seed: Начальное значение (выдается первым).
+        :param bits_per_step: Число младших бит на шаг; по умолчанию `floor(log2(log2 n))`.
+        """
+        self.p = p
+        self.q = q
+        self.m = p*q
+        self.bits_per_step = bits_per_step or max(1, self.m.bit_length().bit_length() - 1)
+        self.bits = self.bits_per_step
+        self._mn = mpz(self.m)
+        self._bits = np.zeros(0, dtype=np.uint8)
+        self.seed = seed
+        self.position = 0
+        self._set(seed)
+
+    def _set(self, x: int):
+        """
+        Устанавливает следующее выдаваемое значение `x`.
+        """
+        self.x = x
+        self._xn = mpz(x)
+
+    def _step(self):
+        """
+        Переходит к следующему состоянию; `x` (обычное число) вычисляется при выдаче.
+        """
+        self._xn = self._xn*self._xn % self._mn
+        self.x = None
+
+    def _value(self):
+        """
+        Возвращает текущее состояние `x`.
+        """
+        if self.x is None:
+            self.x = int(self._xn)
+        return self.x
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        x = self._value()
+        self._step()
+        self.position += 1
+        return x
+
+    def at(self, i: int):
+        """
+        Вычисляет состояние `x_i` без последовательного перебора.
 
-def bbs_generator():
+        Используется замкнутая форма `x_i = x_0^(2^i mod λ(n)) mod n`, причем показатель
+        приводится отдельно по модулям `p - 1` и `q - 1`, а результат собирается
+        по китайской теореме об остатках. Если `x_0` делится на `p` (или `q`),
+        соответствующий остаток равен нулю при всех `i >= 1`.
+
+        :param i: Номер состояния.
+        :type i: int
+        :return: Состояние `x_i` (совпадает с `i`-м значением `next()`).
+        :rtype: int
+        """
+        if i < 0:
+            raise ValueError("i must be non-negative")
+        if i == 0:
+            return self.seed
+        p, q = self.p, self.q
+        if p == q:
+            if gcd(self.seed, self.m) != 1:
+                x = self.seed % self.m
+                for _ in range(i):
+                    x = x*x % self.m
+                return x
+            return pow(self.seed, pow(2, i, p*(p - 1)), self.m)
+        rp, rq = self.seed % p, self.seed % q
+        xp = pow(rp, pow(2, i, p - 1), p) if rp else 0
+        xq = pow(rq, pow(2, i, q - 1), q) if rq else 0
+        return xq + q*((xp - xq)*pow(q, -1, p) % p)
+
+    def seek(self, i: int):
+        """
+        Переводит генератор на состояние `x_i`; следующий `next()` вернет `at(i)`.
+        Накопленный остаток бит `random_bytes` сбрасывается.
+
+        :param i: Номер состояния.
+        :type i: int
+        :return: Этот же генератор.
+        :rtype: BlumBlumShub
+        """
+        self._set(self.at(i))
+        self.position = i
+        self._bits = np.zeros(0, dtype=np.uint8)
+        return self
+
+    def skip(self, k: int):
+        if k < 0:
+            raise ValueError("k must be non-negative")
+        bits = self._bits
+        self.seek(self.position + k)
+        self._bits = bits
+        return self
+
+    def _state(self):
+        return (self.p, self.q, self.seed, self.bits_per_step, self._value())
+
+    def _restore(self, state):
+        p, q, seed, bits_per_step, x = state
+        self.__init__(p, q, seed, bits_per_step)
+        self._set(x)
+
+    def random_bytes(self, n: int):
+        """
+        Возвращает `n` случайных байт.
+
+        Из каждого состояния берутся `bits_per_step` младших бит (старший из них первым),
+        биты упаковываются в байты; неиспользованный остаток сохраняется до
+        следующего вызова.
+
+        :param n: Количество байт.
+        :type n: int
+        :return: Случайные байты.
+        :rtype: bytes
+        """
+        k = self.bits_per_step
+        need = 8*n - len(self._bits)
+        steps = max(0, -(-need//k))
+        mask = (1 << k) - 1
+        vals = []
+        if steps and self.x is not None:
+            #текущее состояние (например, начальное значение) уже известно полностью
+            vals.append(self.x & mask)
+            self._step()
+            steps -= 1
+        x, n_mod = self._xn, self._mn
+        for i in range(steps):
+            vals.append(int(x & mask))
+            x = x*x % n_mod
+        self._xn = x
+        if k <= 64:
+            arr = np.array(vals, dtype=np.uint64)
+            shifts = np.arange(k - 1, -1, -1, dtype=np.uint64)
+            new = ((arr[:, None] >> shifts) & np.uint64(1)).astype(np.uint8).ravel()
+        else:
+            new = np.array([(v >> s) & 1 for v in vals for s in range(k - 1, -1, -1)], dtype=np.uint8)
+        self.position += len(vals)
+        bits = np.concatenate([self._bits, new])
+        self._bits = bits[8*n:]
+        return np.packbits(bits[:8*n]).tobytes()
+
+    def parallel_random_bytes(self, n: int, workers: int = None):
+        """
+        Возвращает те же `n` байт, что и `random_bytes(n)`, и так же сдвигает генератор,
+        но нужные состояния делятся на непересекающиеся участки, каждый из которых
+        процесс-обработчик начинает с `at(start)` и дальше считает последовательно.
+
+        :param n: Количество байт.
+        :type n: int
+        :param workers: Количество процессов; по умолчанию число ядер.
+        :type workers: int
+        :return: Случайные байты.
+        :rtype: bytes
+        """
+        workers = workers or os.cpu_count() or 1
+        k = self.bits_per_step
+        steps = max(0, -(-(8*n - len(self._bits))//k))
+        #участки кратны 8 состояниям, чтобы каждый давал целое число байт
+        chunk = max(8, (-(-steps//(4*workers)) + 7) & ~7)
+        starts = list(range(self.position, self.position + steps, chunk))
+        counts = [min(chunk, self.position + steps - start) for start in starts]
+        args = [(self.p, self.q, self.seed, start, count, k) for start, count in zip(starts, counts)]
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            blocks = list(pool.map(_block_bits, *zip(*args))) if args else []
+        parts = [np.unpackbits(np.frombuffer(block, dtype=np.uint8))[:count*k] for block, count in zip(blocks, counts)]
+        bits = np.concatenate([self._bits] + parts)
+        self._set(self.at(self.position + steps))
+        self.position += steps
+        self._bits = bits[8*n:]
+        return np.packbits(bits[:8*n]).tobytes()
+
+def _block_bits(p: int, q: int, seed: int, start: int, count: int, bits_per_step: int):
+    """
+    Возвращает упакованные младшие биты состояний `x_start .. x_(start+count-1)`
+    (функция выполняется в процессе-обработчике `parallel_random_bytes`).
+    """
+    gen = BlumBlumShub(p, q, seed, bits_per_step=bits_per_step).seek(start)
+    return gen.random_bytes(-(-count*bits_per_step//8))
+
+def bbs_generator(bits: int = None, index: int = None):
     """
     Генератор псевдослучайных чисел на основе алгоритма Blum Blum Shub (BBS).
 
     Алгоритм использует квадратичное сравнение для генерации случайных чисел:
     `x = (x^2) % (p * q)`, где `p` и `q` — большие простые числа.
 
-    :yield: Следующее псевдослучайное число в последовательности.
-    :rtype: int
+    :param bits: Битовая длина простых чисел `p` и `q` (например, 512-2048).
+        Если не задана, используются простые числа из функции `preferences`.
+    :type bits: int
+    :param index: Номер пары простых чисел длины `bits` в кэше `gens.primes.blum_pair`.
+        По умолчанию выбирается по следующему значению линейного конгруэнтного генератора.
+    :type index: int
+
+    :return: Итератор по последовательности состояний; следующее число - `next()`,
+        байты из младших бит состояний - `random_bytes(n)`.
+    :rtype: BlumBlumShub
 
     Примечания:
     - Начальное значение (`seed`) и параметры `p` и `q` выбираются следующим образом:
@@ -57,13 +303,16 @@ def bbs_generator():
         - `a`: Множитель.
         - `c`: Приращение.
         - `seed`: Начальное значение (seed).
-      - Простые числа `p` и `q` выбираются через функцию `preferences`.
+      - Простые числа `p` и `q` выбираются через функцию `preferences`, а при заданном `bits` -
+        через `gens.primes.blum_pair`, который хранит найденные пары в дисковом кэше.
     - Генератор является бесконечным, и для получения следующего значения используется `next()`.
     """
+    gen = seed_generator()
     seed: int = next(gen)
     x = seed
     p: int = 0
-    p,q = preferences(next(gen)%10)
-    while True:
-        yield x
-        x = (x**2) % (p*q)
\ No newline at end of file
+    if bits is None:
+        p,q = preferences(next(gen)%10)
+    else:
+        p,q = blum_pair(bits, next(gen)%10 if index is None else index)
+    return BlumBlumShub(p, q, x)
@@ -1,13 +1,32 @@
+import operator
+import numpy as np
 from gens.LCM import *
+from gens.protocol import BaseGenerator
 
-def preferences():
+#Стандартные пары запаздываний (j, k) для x[n] = x[n-j] op x[n-k]:
+STANDARD_LAGS = [(24, 55), (38, 89), (37, 100), (30, 127), (83, 258), (107, 378), (273, 607), (1029, 2281), (576, 3217), (4187, 9689)]
+
+#Операции генератора: поштучная (над int) и векторная (над массивами NumPy)
+OPERATIONS = {
+    '+': (operator.add, np.add),
+    '-': (operator.sub, np.subtract),
+    '*': (operator.mul, np.multiply),
+    '^': (operator.xor, np.bitwise_xor),
+}
+
+WORD_TYPES = {8: np.uint8, 16: np.uint16, 32: np.uint32, 64: np.uint64}
+
+def preferences(size: int = 55):
     """
     Генерирует начальную базу чисел для Lagged Fibonacci Generator (LFG).
 
     Использует линейный конгруэнтный генератор для создания последовательности чисел, 
     которая служит базой для работы LFG.
 
-    :return: Список из 55 начальных чисел для Lagged Fibonacci Generator.
+    :param size: Количество чисел в базе (равно большему запаздыванию).
+    :type size: int
+
+    :return: Список из `size` начальных чисел для Lagged Fibonacci Generator.
     :rtype: list[int]
 
     Алгоритм:
@@ -16,42 +35,150 @@ def preferences():
         - `a`: Множитель.
         - `c`: Приращение.
         - `seed`: Начальное значение (seed).
-    - Генерируется 55 чисел, которые сохраняются в список `base`.
+    - Генерируется `size` чисел, которые сохраняются в список `base`.
     """
     m: int = 2_147_483_648
     a: int = 594_156_893
     c: int = 75_692
     seed: int = 123_456_789
     gen = linear_congruential_generator(m, a, c, seed)
-    size = 55
     base = []
     for i in range(size):
         x = next(gen)
         base.append(x)
     return base
 
-def lagged_fibonacci_generator():
+class LaggedFibonacciGenerator(BaseGenerator):
+    """
+    Генератор Фибоначчи с запаздываниями `x[n] = (x[n-j] op x[n-k]) % (2^m)`.
+
+    Состояние - кольцевой буфер из `k` последних значений и индекс самого старого из них,
+    поэтому на каждое число приходится одна запись вместо сдвига всей базы.
+
+    Атрибуты:
+        ring (list[int]): Кольцевой буфер последних `k` значений.
+        pos (int): Индекс значения `x[n-k]` в буфере.
+        short (int), long (int): Запаздывания `j < k`.
+        op (str): Операция: '+', '-', '*' или '^' (XOR).
+        word_bits (int): Разрядность `m` выдаваемых чисел.
+        m (int): Модуль `2^word_bits` (диапазон значений).
+
+    Методы:
+        fill(n):
+            Возвращает следующие `n` чисел последовательности в виде массива NumPy.
+    """
+    def __init__(self, base: list, word_bits: int = 8, lags: tuple = (25, 55), op: str = '+'):
+        """
+        :param base: Начальная база из `k` чисел; `base[0]` считается последним значением.
+        :param word_bits: Разрядность `m` выдаваемых чисел (8, 16, 32, 64 или не больше 64).
+        :param lags: Пара запаздываний `(j, k)`, `j < k`.
+        :param op: Операция: '+', '-', '*' или '^' (XOR).
+        """
+        self.short, self.long = lags
+        if not 0 < self.short < self.long:
+            raise ValueError("lags must satisfy 0 < j < k")
+        if len(base) != self.long:
+            raise ValueError(f"base must contain {self.long} numbers")
+        if op not in OPERATIONS:
+            raise ValueError(f"unknown operation {op!r}")
+        if not 0 < word_bits <= 64:
+            raise ValueError("word_bits must be between 1 and 64")
+        self.op = op
+        self.word_bits = word_bits
+        self.bits = word_bits
+        self.m = 1 << word_bits
+        self.mask = self.m - 1
+        self.dtype = WORD_TYPES.get(word_bits, np.uint64)
+        #буфер хранит значения в хронологическом порядке, начиная с самого старого
+        self.ring = [x & self.mask for x in reversed(base)]
+        self.pos = 0
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        ring = self.ring
+        pos = self.pos
+        x = OPERATIONS[self.op][0](ring[(pos + self.long - self.short) % self.long], ring[pos]) & self.mask
+        ring[pos] = x
+        self.pos = (pos + 1) % self.long
+        self.position += 1
+        return x
+
+    def fill(self, n: int):
+        """
+        Возвращает следующие `n` чисел последовательности.
+
+        Пока номер числа отстает от текущего не больше чем на меньшее запаздывание `j`,
+        все его операнды уже известны, поэтому числа вычисляются блоками по `j`
+        одной векторной операцией над словами нужной разрядности (переполнение
+        uint8/16/32/64 совпадает со взятием остатка). Результат совпадает
+        с поштучной генерацией.
+
+        :param n: Количество чисел.
+        :type n: int
+        :return: Массив из `n` чисел.
+        :rtype: np.ndarray
+        """
+        r, s = self.short, self.long
+        func = OPERATIONS[self.op][1]
+        buf = np.empty(s + n, dtype=self.dtype)
+        buf[:s] = self.ring[self.pos:] + self.ring[:self.pos]
+        for start in range(s, s + n, r):
+            end = min(start + r, s + n)
+            func(buf[start-r:end-r], buf[start-s:end-s], out=buf[start:end])
+        if self.word_bits not in WORD_TYPES:
+            buf &= np.uint64(self.mask)
+        self.ring = buf[n:].tolist()
+        self.pos = 0
+        self.position += n
+        return buf[s:].copy()
+
+    def _state(self):
+        ring = self.ring[self.pos:] + self.ring[:self.pos]
+        return ((self.short, self.long), self.op, self.word_bits, np.array(ring, dtype=self.dtype))
+
+    def _restore(self, state):
+        lags, op, word_bits, ring = state
+        self.__init__(ring[::-1].tolist(), word_bits, lags, op)
+
+def lagged_fibonacci_generator(lags: tuple = (25, 55), op: str = '+', word_bits: int = 8):
     """
     Генератор псевдослучайных чисел на основе Lagged Fibonacci Generator (LFG).
 
     Алгоритм основан на формуле:
-        `x[n] = (x[n-24] + x[n-55]) % (2^m)`
-    где `base` — начальная база из 55 чисел.
+        `x[n] = (x[n-j] op x[n-k]) % (2^m)`,
+    где `(j, k)` - запаздывания, а начальная база из `k` чисел берется из `preferences`.
+    Параметры по умолчанию воспроизводят исходный генератор
+    `x[n] = (base[24] + base[54]) % 2^8`, то есть `x[n] = (x[n-25] + x[n-55]) % 2^8`;
+    стандартные пары запаздываний перечислены в `STANDARD_LAGS`.
+
+    :param lags: Пара запаздываний `(j, k)`.
+    :type lags: tuple[int, int]
+    :param op: Операция: '+', '-', '*' или '^' (XOR).
+    :type op: str
+    :param word_bits: Разрядность `m` выдаваемых слов (например, 8, 32 или 64).
+    :type word_bits: int
 
-    :yield: Следующее псевдослучайное число в последовательности.
-    :rtype: int
+    :return: Итератор по последовательности; следующее число - `next()`, блок чисел - `fill(n)`.
+    :rtype: LaggedFibonacciGenerator
 
     Примечания:
-    - Начальная база чисел создается с помощью функции `preferences`.
-    - Размер базы составляет 55 чисел.
-    - Используется сдвиг значений базы, чтобы обновлять последовательность в процессе генерации.
+    - Начальная база чисел создается с помощью функции `preferences`. Числа LCG
+      содержат 31 бит, поэтому для слов шире 31 бита каждое число базы
+      собирается из нескольких последовательных значений LCG.
+    - Для операции '*' все числа базы делаются нечетными, иначе последовательность
+      вырождается в ноль.
+    - Последние `k` значений хранятся в кольцевом буфере (см. `LaggedFibonacciGenerator`).
     """
-    base = preferences()
-    m: int = 8
-    x = 0
-    while True:
-        x = (base[24] + base[-1])%(2**m)
-        for i in range(54,0,-1):
-            base[i] = base[i-1]
-        base[0] = x
-        yield x
\ No newline at end of file
+    size = lags[1]
+    parts = -(-word_bits//31)
+    raw = preferences(size*parts)
+    base = []
+    for i in range(size):
+        x = 0
+        for v in raw[i*parts:(i + 1)*parts]:
+            x = (x << 31) | v
+        base.append(x | 1 if op == '*' else x)
+    m: int = word_bits
+    return LaggedFibonacciGenerator(base, m, lags, op)
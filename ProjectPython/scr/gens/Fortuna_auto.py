@@ -1,104 +1,471 @@
-from pynput import mouse
 import hashlib
+import os
+import threading
 import time
+import weakref
+import numpy as np
+from gens.protocol import BaseGenerator
 
-class Fortuna_auto():
+class FortunaGenerator():
     """
-    Класс для генерации случайных чисел с использованием данных о движении мыши 
-    и хеширования с алгоритмом SHA-256. Использует метод Fortuna для генерации случайных чисел.
+    Генератор Fortuna: 256-битный ключ и 128-битный счетчик, SHA-256 в режиме счетчика.
+
+    Блок выхода - `SHA-256(key || counter)` (32 байта). После каждого запроса
+    `random_bytes` ключ заменяется новым блоком того же потока, поэтому уже выданные
+    байты нельзя восстановить по текущему состоянию.
+
+    Атрибуты:
+        key (bytes): Текущий ключ (32 байта).
+        counter (int): 128-битный счетчик; 0 означает, что генератор еще не получил зерно.
+
+    Методы:
+        reseed(seed):
+            Подмешивает зерно в ключ: `key = SHA-256d(key || seed)`.
+        random_bytes(n):
+            Возвращает `n` случайных байт и меняет ключ.
+    """
+    BLOCK = 32
+    #не больше 2^20 байт на один ключ, как в спецификации Fortuna
+    MAX_REQUEST = 2**20
+
+    def __init__(self):
+        self.key = bytes(32)
+        self.counter = 0
+
+    def reseed(self, seed: bytes):
+        """
+        Подмешивает зерно `seed` в ключ и увеличивает счетчик.
+
+        :param seed: Байты энтропии.
+        :type seed: bytes
+        """
+        self.key = hashlib.sha256(hashlib.sha256(self.key + seed).digest()).digest()
+        self.counter = (self.counter + 1) % 2**128
+
+    def _blocks(self, k: int):
+        """
+        Возвращает `k` последовательных блоков `SHA-256(key || counter)`.
+        Префикс с ключом хешируется один раз, для каждого блока копируется состояние хеша.
+        """
+        prefix = hashlib.sha256(self.key)
+        out = []
+        counter = self.counter
+        for i in range(k):
+            h = prefix.copy()
+            h.update(counter.to_bytes(16, 'little'))
+            out.append(h.digest())
+            counter = (counter + 1) % 2**128
+        self.counter = counter
+        return b''.join(out)
+
+    def random_bytes(self, n: int):
+        """
+        Возвращает `n` случайных байт. Запросы длиннее 2^20 байт делятся на части,
+        после каждой части ключ меняется.
+
+        :param n: Количество байт.
+        :type n: int
+        :return: Случайные байты.
+        :rtype: bytes
+        """
+        if self.counter == 0:
+            raise RuntimeError("generator is not seeded")
+        out = []
+        while n > 0:
+            size = min(n, self.MAX_REQUEST)
+            out.append(self._blocks(-(-size//self.BLOCK))[:size])
+            self.key = self._blocks(1)
+            n -= size
+        return b''.join(out)
+
+def timing_jitter_source(rounds: int = 64):
+    """
+    Источник энтропии из дрожания времени: младшие байты длительностей коротких
+    вычислений, измеренных `time.perf_counter_ns`.
+
+    :param rounds: Количество измерений за один вызов.
+    :type rounds: int
+    :return: Функция без аргументов, возвращающая байты.
+    """
+    def source():
+        out = bytearray()
+        for i in range(rounds):
+            start = time.perf_counter_ns()
+            x = 0
+            for j in range(i % 7 + 8):
+                x ^= j*start
+            out.append((time.perf_counter_ns() - start) & 0xFF)
+        return bytes(out)
+    return source
+
+def urandom_source(size: int = 32):
+    """
+    Источник энтропии из `os.urandom`.
+
+    :param size: Количество байт за один вызов.
+    :type size: int
+    :return: Функция без аргументов, возвращающая байты.
+    """
+    return lambda: os.urandom(size)
+
+def file_source(path: str, size: int = 32):
+    """
+    Источник энтропии из файла или именованного канала (например, `/dev/hwrng`).
+    Файл открывается при первом вызове; по достижении конца возвращаются пустые байты.
+
+    :param path: Путь к файлу или каналу.
+    :type path: str
+    :param size: Количество байт за один вызов.
+    :type size: int
+    :return: Функция без аргументов, возвращающая байты.
+    """
+    state = {}
+    def source():
+        if 'file' not in state:
+            state['file'] = open(path, 'rb')
+        return state['file'].read(size)
+    return source
+
+def default_sources():
+    """
+    Источники энтропии накопителя по умолчанию: дрожание времени и `os.urandom`.
+
+    :return: Список функций-источников.
+    :rtype: list
+    """
+    return [timing_jitter_source(), urandom_source()]
+
+def _stop_background(accumulator, listener):
+    """
+    Останавливает фоновый поток накопителя и слушатель мыши (вызывается из `close`
+    или при удалении генератора сборщиком мусора).
+    """
+    accumulator.stop()
+    if listener is not None:
+        listener.stop()
+
+class EntropyAccumulator():
+    """
+    Накопитель энтропии Fortuna с 32 пулами и фоновым потоком опроса источников.
+
+    События источника `i` раскладываются по пулам по кругу. Пересев генератора
+    возможен, когда в пул 0 поступило не меньше `MIN_POOL_SIZE` байт и с прошлого
+    пересева прошло не меньше `RESEED_INTERVAL` секунд; в `r`-м пересеве участвуют
+    пулы `i`, для которых `2^i` делит `r`.
 
     Атрибуты:
-        coord (str): Строка для хранения координат мыши в бинарном виде.
-        flag (bool): Флаг, указывающий, активен ли процесс сбора координат.
-        hesh_pul (int): Переменная для хранения текущего хеша, используется для генерации чисел.
-        coef (int): Коэффициент для обрезки сгенерированного числа.
+        pools (list): 32 хеша SHA-256, накапливающих события.
+        sources (list): Функции-источники, возвращающие байты.
+        interval (float): Пауза между опросами источников в фоновом потоке.
+        reseed_count (int): Количество выполненных пересевов.
+
+    Методы:
+        add_random_event(source, pool, data):
+            Добавляет событие источника в пул.
+        start(), stop():
+            Запускает и останавливает фоновый поток опроса источников.
+        reseed(generator):
+            Пересевает генератор, если накоплено достаточно энтропии; никогда не ждет.
+    """
+    POOLS = 32
+    MIN_POOL_SIZE = 64
+    RESEED_INTERVAL = 0.1
+
+    def __init__(self, sources: list = None, interval: float = 0.05):
+        """
+        :param sources: Источники энтропии; по умолчанию дрожание времени и `os.urandom`.
+        :param interval: Пауза между опросами источников (секунды).
+        """
+        self.pools = [hashlib.sha256() for i in range(self.POOLS)]
+        self.pool0_size = 0
+        self.sources = list(sources) if sources is not None else default_sources()
+        self.interval = interval
+        self.reseed_count = 0
+        self.last_reseed = 0.0
+        self._next_pool = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def add_random_event(self, source: int, pool: int, data: bytes):
+        """
+        Добавляет событие в пул: номер источника, длину и сами данные (не более 32 байт).
+
+        :param source: Номер источника (0-255).
+        :param pool: Номер пула (0-31).
+        :param data: Байты события.
+        """
+        data = data[:32]
+        with self._lock:
+            self.pools[pool].update(bytes([source & 0xFF, len(data)]) + data)
+            if pool == 0:
+                self.pool0_size += len(data)
+
+    def add_event(self, source: int, data: bytes):
+        """
+        Добавляет событие источника `source` в следующий по кругу пул этого источника.
+
+        :param source: Номер источника (0-255).
+        :param data: Байты события.
+        """
+        pool = self._next_pool.get(source, 0)
+        self._next_pool[source] = (pool + 1) % self.POOLS
+        self.add_random_event(source, pool, data)
+
+    def poll(self):
+        """
+        Опрашивает все источники один раз. Ошибки отдельного источника пропускаются.
+        """
+        for i, source in enumerate(self.sources):
+            try:
+                data = source()
+            except Exception:
+                continue
+            for j in range(0, len(data), 32):
+                self.add_event(i, data[j:j+32])
+
+    def _run(self):
+        while not self._stop.is_set():
+            self.poll()
+            self._stop.wait(self.interval)
+
+    def start(self):
+        """
+        Запускает фоновый поток-демон, опрашивающий источники каждые `interval` секунд.
+        """
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="fortuna-accumulator", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        """
+        Останавливает фоновый поток.
+        """
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def reseed(self, generator):
+        """
+        Пересевает генератор по расписанию Fortuna, если накоплено достаточно энтропии.
+        Если пулы в этот момент заняты фоновым потоком, пересев откладывается,
+        так что потребитель никогда не ждет сбора энтропии.
+
+        :param generator: Генератор с методом `reseed(seed)`.
+        :type generator: FortunaGenerator
+        :return: True, если пересев выполнен.
+        :rtype: bool
+        """
+        now = time.monotonic()
+        if self.pool0_size < self.MIN_POOL_SIZE or now - self.last_reseed < self.RESEED_INTERVAL:
+            return False
+        if not self._lock.acquire(blocking=False):
+            return False
+        try:
+            self.reseed_count += 1
+            seed = b''
+            for i in range(self.POOLS):
+                if self.reseed_count % (1 << i):
+                    break
+                seed += hashlib.sha256(self.pools[i].digest()).digest()
+                self.pools[i] = hashlib.sha256()
+            self.pool0_size = 0
+            self.last_reseed = now
+        finally:
+            self._lock.release()
+        generator.reseed(seed)
+        return True
+
+class Fortuna_auto(BaseGenerator):
+    """
+    Класс для генерации случайных чисел по схеме Fortuna: генератор `FortunaGenerator`
+    и накопитель энтропии `EntropyAccumulator` с фоновым потоком.
+
+    Генератор получает начальное зерно из `os.urandom` и сразу готов к работе;
+    накопитель в фоне собирает энтропию из дрожания времени, `os.urandom`,
+    дополнительных источников и (если доступен pynput) движений мыши, а генератор
+    пересевается перед запросами без ожидания.
+
+    Фоновый поток и слушатель мыши останавливаются методом `close()` (или при выходе
+    из блока `with`), а если генератор не закрыт - когда его удаляет сборщик мусора.
+
+    Атрибуты:
+        core (FortunaGenerator): Генератор Fortuna.
+        accumulator (EntropyAccumulator): Накопитель энтропии.
+        buffer (int): Сколько байт запрашивать у `core` за один раз.
         self_gen (generator): Генератор случайных чисел.
 
+    Сохраненное состояние (`getstate`, `checkpoint`) содержит ключ генератора, то есть
+    позволяет предсказать дальнейший выход: храните его как секрет. Восстановленный
+    генератор продолжает ту же последовательность до первого пересева; пулы накопителя
+    не сохраняются, и фоновый сбор энтропии нужно запустить заново (`start_listen`).
+
     Методы:
         on_move(x, y):
-            Обрабатывает события движения мыши, собирая координаты для генерации случайных чисел.
+            Передает координаты мыши в накопитель энтропии.
         gen():
-            Генерирует случайные числа на основе хеша координат мыши и текущего времени.
+            Генерирует 32-битные случайные числа генератором Fortuna.
+        random_bytes(n):
+            Возвращает `n` случайных байт.
+        fill(n):
+            Возвращает `n` 32-битных чисел в виде массива NumPy.
         next_num():
             Возвращает следующее случайное число от генератора.
         start_listen():
-            Запускает слушатель событий мыши для получения координат.
+            Запускает фоновый сбор энтропии (и слушатель мыши, если он доступен).
+        close():
+            Останавливает фоновый сбор энтропии.
     """
-    def __init__(self):
+    MOUSE_SOURCE = 255
+
+    def __init__(self, sources: list = None):
         """
-        Инициализирует объект класса Fortuna_auto.
-        Создает переменные для хранения координат, флага сбора данных, хеша, коэффициента 
-        и генератора случайных чисел.
+        Инициализирует объект класса Fortuna_auto: генератор с начальным зерном
+        из `os.urandom`, накопитель энтропии и генератор случайных чисел.
+
+        :param sources: Дополнительные источники энтропии накопителя (к дрожанию
+            времени и `os.urandom`).
         """
-        self.coord = ''
-        self.flag = True
-        self.hesh_pul = 0
-        self.coef = 8
-        self.self_gen = 0
+        self.core = FortunaGenerator()
+        self.core.reseed(os.urandom(32))
+        self.accumulator = EntropyAccumulator(default_sources() + list(sources or []))
+        self.buffer = 4096
+        self._data = b''
+        self._offset = 0
+        self.self_gen = self.gen()
+        self.listener = None
+        self._finalizer = None
     
     def on_move(self,x,y):
         """
-        Обрабатывает события движения мыши, собирает координаты и запускает генератор чисел.
+        Обрабатывает события движения мыши: координаты и время события
+        добавляются в накопитель энтропии.
 
         :param x: Координата по оси X.
         :param y: Координата по оси Y.
-        
-        Возвращает False, когда длина собранных данных достигает 256 бит, что инициирует 
-        запуск генератора случайных чисел.
-        """
-        if self.flag == True:
-            self.coord += (bin(x)[2:]+bin(y)[2:])
-            if len(self.coord) >= 256:
-                self.self_gen = self.gen()
-                next(self.self_gen)
-                return False
+        """
+        data = int(x).to_bytes(4, 'little', signed=True) + int(y).to_bytes(4, 'little', signed=True)
+        self.accumulator.add_event(self.MOUSE_SOURCE, data + time.perf_counter_ns().to_bytes(8, 'little'))
     
     def gen(self):
         """
-        Генератор случайных чисел на основе хеширования координат и текущего времени.
+        Генератор случайных чисел на основе генератора Fortuna.
 
-        Генерирует случайные числа, используя хеш SHA-256 от координат мыши и текущего времени.
-        Процесс генерирования чисел запускается после сбора достаточного объема данных.
+        Перед каждым запросом `buffer` байт генератор пересевается из накопителя,
+        если тот готов; после каждого запроса ключ меняется. Байты выдаются
+        как 32-битные числа.
 
-        :yield: Следующее случайное число, обрезанное по коэффициенту `coef`, в 32-битном формате.
+        :yield: Следующее 32-битное случайное число.
         """
-        self.flag = False
         while True:
-            new_hesh = int(hashlib.sha256(self.coord.encode('utf-8')).hexdigest(),16)
-            self.hesh_pul ^= new_hesh
-            self.coord = str(self.hesh_pul)
-            tme = str(time.time())
-            ind = tme.index('.')
-            yield int(str(self.hesh_pul ^ int(tme[:ind] + tme[ind+1:]))[:self.coef],32)
+            yield self.next_num()
+
+    def random_bytes(self, n: int):
+        """
+        Возвращает `n` случайных байт от генератора Fortuna, предварительно
+        пересеяв его, если накоплено достаточно энтропии.
+
+        :param n: Количество байт.
+        :type n: int
+        :return: Случайные байты.
+        :rtype: bytes
+        """
+        self.accumulator.reseed(self.core)
+        return self.core.random_bytes(n)
+
+    def fill(self, n: int):
+        """
+        Возвращает `n` 32-битных чисел из одного запроса `random_bytes(4*n)`.
+
+        :param n: Количество чисел.
+        :type n: int
+        :return: Массив uint32.
+        :rtype: np.ndarray
+        """
+        self.position += n
+        return np.frombuffer(self.random_bytes(4*n), dtype='>u4').astype(np.uint32)
+
+    def __next__(self):
+        return self.next_num()
 
     def next_num(self):
         """
-        Возвращает следующее случайное число от генератора.
+        Возвращает следующее случайное число от генератора: очередные 4 байта
+        буфера, который пополняется запросами по `buffer` байт.
 
-        :return: Следующее случайное число, генерируемое методом `gen()`.
+        :return: Следующее 32-битное случайное число.
         """
-        return next(self.self_gen)
+        if self._offset >= len(self._data):
+            self._data = self.random_bytes(self.buffer)
+            self._offset = 0
+        x = int.from_bytes(self._data[self._offset:self._offset+4], 'big')
+        self._offset += 4
+        self.position += 1
+        return x
+
+    def _state(self):
+        return (self.core.key, self.core.counter, self.buffer, self._data[self._offset:])
+
+    def _restore(self, state):
+        key, counter, self.buffer, self._data = state
+        self.core = FortunaGenerator()
+        self.core.key, self.core.counter = key, counter
+        self.accumulator = EntropyAccumulator()
+        self._offset = 0
+        self.self_gen = self.gen()
+        self.listener = None
+        self._finalizer = None
     
     def start_listen(self):
         """
-        Запускает слушатель событий мыши.
+        Запускает фоновый поток накопителя энтропии и, если pynput доступен
+        и может подключиться к дисплею, слушатель движения мыши. Не блокирует.
+        """
+        self.accumulator.start()
+        if self.listener is None:
+            #pynput необязателен и импортируется только здесь: без дисплея
+            #(или без самого пакета) мышь просто не используется
+            try:
+                from pynput import mouse
+                #слабая ссылка, чтобы поток слушателя не удерживал генератор; False останавливает слушатель
+                on_move = weakref.WeakMethod(self.on_move)
+                self.listener = mouse.Listener(on_move=lambda x, y: on_move()(x, y) if on_move() else False)
+                self.listener.start()
+            except Exception:
+                self.listener = None
+        if self._finalizer is None or not self._finalizer.alive:
+            self._finalizer = weakref.finalize(self, _stop_background, self.accumulator, self.listener)
+            self._finalizer.atexit = False
 
-        Инициализирует слушателя движения мыши и запускает его в отдельном потоке.
-        Ожидает завершения работы слушателя.
+    def close(self):
+        """
+        Останавливает фоновый поток накопителя и слушатель мыши. Генератор остается
+        рабочим (без пополнения энтропии), сбор можно запустить снова `start_listen()`.
         """
-        mouse_listener = mouse.Listener(on_move=self.on_move)
-        mouse_listener.start()
-        mouse_listener.join()
+        if self._finalizer is not None:
+            self._finalizer()
+        self.listener = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
 
-def fortuna():
+def fortuna(sources: list = None):
     """
     Запускает генератор случайных чисел, используя объект Fortuna_auto.
 
-    Создает экземпляр Fortuna_auto, начинает слушать события мыши и генерирует случайные числа.
+    Создает экземпляр Fortuna_auto, запускает фоновый сбор энтропии и сразу
+    возвращает генератор, не дожидаясь действий пользователя. Фоновый поток
+    останавливается `close()` или блоком `with fortuna() as gen: ...`.
 
-    :yield: Следующее случайное число, генерируемое объектом Fortuna_auto.
+    :param sources: Дополнительные источники энтропии, например `file_source('/dev/hwrng')`;
+        дрожание времени и `os.urandom` используются всегда.
+    :return: Итератор 32-битных случайных чисел с общим интерфейсом генераторов.
+    :rtype: Fortuna_auto
     """
-    fart = Fortuna_auto()
+    fart = Fortuna_auto(sources)
     fart.start_listen()
-    while True:
-        yield fart.next_num()
\ No newline at end of file
+    return fart
\ No newline at end of file
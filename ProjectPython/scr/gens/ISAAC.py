@@ -1,68 +1,234 @@
-def f(a,i):
+import numpy as np
+from gens.protocol import BaseGenerator
+
+SIZE = 256
+
+#Сдвиги раунда: ISAAC - a ^= a<<13, a>>6, a<<2, a>>16; ISAAC-64 - a = ~(a ^ a<<21), a>>5, a<<12, a>>33
+SHIFTS32 = (13, 6, 2, 16)
+SHIFTS64 = (21, 5, 12, 33)
+
+def _mix32(s):
+    """
+    Перемешивание восьми 32-битных слов при инициализации ISAAC.
     """
-    Выполняет побитовые операции с параметром `a` в зависимости от значения `i`.
-
-    :param a: Целое число, с которым проводятся операции.
-    :type a: int
-    :param i: Индекс, определяющий тип операции.
-    :type i: int
-    :return: Результат сдвига влево или вправо в зависимости от значения `i % 4`.
-    :rtype: int
-
-    Операции:
-    - `i % 4 == 0`: Сдвиг влево на 13 бит.
-    - `i % 4 == 1`: Сдвиг вправо на 6 бит.
-    - `i % 4 == 2`: Сдвиг влево на 2 бита.
-    - `i % 4 == 3`: Сдвиг вправо на 16 бит.
+    a, b, c, d, e, f, g, h = s
+    M = 0xFFFFFFFF
+    a ^= b << 11 & M; d = d + a & M; b = b + c & M
+    b ^= c >> 2;      e = e + b & M; c = c + d & M
+    c ^= d << 8 & M;  f = f + c & M; d = d + e & M
+    d ^= e >> 16;     g = g + d & M; e = e + f & M
+    e ^= f << 10 & M; h = h + e & M; f = f + g & M
+    f ^= g >> 4;      a = a + f & M; g = g + h & M
+    g ^= h << 8 & M;  b = b + g & M; h = h + a & M
+    h ^= a >> 9;      c = c + h & M; a = a + b & M
+    return [a, b, c, d, e, f, g, h]
+
+def _mix64(s):
+    """
+    Перемешивание восьми 64-битных слов при инициализации ISAAC-64.
     """
-    #по рекомендациям создателя:
-    p0 = 13
-    p1 = 6
-    p2 = 2
-    p3 = 16
-    if i%4 == 0:
-        return a<<p0
-    if i%4 == 1:
-        return a>>p1
-    if i%4 == 2:
-        return a<<p2
-    if i%4 == 3:
-        return a>>p3
-
-def isaac_generator():
+    a, b, c, d, e, f, g, h = s
+    M = 0xFFFFFFFFFFFFFFFF
+    a = a - e & M; f ^= h >> 9;      h = h + a & M
+    b = b - f & M; g ^= a << 9 & M;  a = a + b & M
+    c = c - g & M; h ^= b >> 23;     b = b + c & M
+    d = d - h & M; a ^= c << 15 & M; c = c + d & M
+    e = e - a & M; b ^= d >> 14;     d = d + e & M
+    f = f - b & M; c ^= e << 20 & M; e = e + f & M
+    g = g - c & M; d ^= f >> 17;     f = f + g & M
+    h = h - d & M; e ^= g << 14 & M; g = g + h & M
+    return [a, b, c, d, e, f, g, h]
+
+class Isaac(BaseGenerator):
+    """
+    Генератор ISAAC (32 бита) и ISAAC-64 Боба Дженкинса.
+
+    Состояние - 256 слов `mm` и регистры `a`, `b`, `c`; один раунд `round()` обновляет
+    все 256 слов и выдает 256 чисел. Память на экземпляр - два массива по 256 слов
+    (около 2 КБ для ISAAC и 4 КБ для ISAAC-64), последовательность не ограничена.
+
+    Атрибуты:
+        bits (int): Разрядность слов (32 или 64).
+        mm (np.ndarray): Внутреннее состояние из 256 слов.
+        rsl (np.ndarray): Результаты последнего раунда.
+        index (int): Номер следующего невыданного числа в `rsl`.
+
+    Методы:
+        round():
+            Выполняет один раунд и возвращает 256 новых чисел.
+        fill(n):
+            Возвращает следующие `n` чисел в виде массива NumPy.
+        skip(k):
+            Пропускает `k` чисел, выполняя раунды без копирования результатов.
+    """
+    def __init__(self, key=b'', bits: int = 32):
+        """
+        Инициализирует состояние по ключу (процедура `randinit` с флагом TRUE).
+
+        :param key: Ключ: байты или последовательность до 256 слов; недостающие слова равны нулю.
+        :param bits: Разрядность слов: 32 (ISAAC) или 64 (ISAAC-64).
+        """
+        if bits not in (32, 64):
+            raise ValueError("bits must be 32 or 64")
+        self.bits = bits
+        self.m = 2**bits
+        self.dtype = np.uint32 if bits == 32 else np.uint64
+        mask = self.m - 1
+        if isinstance(key, (bytes, bytearray, str)):
+            if isinstance(key, str):
+                key = key.encode('utf-8')
+            step = bits//8
+            key = [int.from_bytes(key[i:i+step], 'little') for i in range(0, len(key), step)]
+        if len(key) > SIZE:
+            raise ValueError("key must contain at most 256 words")
+        seed = [int(x) & mask for x in key] + [0]*(SIZE - len(key))
+
+        mix = _mix32 if bits == 32 else _mix64
+        s = [0x9e3779b9 if bits == 32 else 0x9e3779b97f4a7c13]*8
+        for i in range(4):
+            s = mix(s)
+        mm = [0]*SIZE
+        for source in (seed, mm):
+            for i in range(0, SIZE, 8):
+                s = mix([x + y & mask for x, y in zip(s, source[i:i+8])])
+                mm[i:i+8] = s
+        self.mm = np.array(mm, dtype=self.dtype)
+        self.a = self.b = self.c = 0
+        self.rsl = np.zeros(SIZE, dtype=self.dtype)
+        self.round()
+        self.index = SIZE
+
+    def round(self):
+        """
+        Выполняет один раунд ISAAC: обновляет все 256 слов состояния.
+
+        :return: 256 новых чисел в порядке индексов `rsl[0..255]`, как в эталонных
+            тестовых векторах ISAAC.
+        :rtype: np.ndarray
+        """
+        mm = self.mm.tolist()
+        r = [0]*SIZE
+        M = self.m - 1
+        self.c = self.c + 1 & M
+        a, b = self.a, self.b + self.c & M
+        if self.bits == 32:
+            s0, s1, s2, s3 = SHIFTS32
+            sx, sy = 2, 10
+        else:
+            s0, s1, s2, s3 = SHIFTS64
+            sx, sy = 3, 11
+        for i in range(0, SIZE, 4):
+            #первый шаг четверки различается у ISAAC и ISAAC-64
+            if self.bits == 32:
+                a ^= a << s0 & M
+            else:
+                a = ~(a ^ (a << s0 & M)) & M
+            x = mm[i]
+            a = mm[i ^ 128] + a & M
+            mm[i] = y = mm[x >> sx & 255] + a + b & M
+            r[i] = b = mm[y >> sy & 255] + x & M
+
+            x = mm[i+1]
+            a = mm[(i+1) ^ 128] + (a ^ a >> s1) & M
+            mm[i+1] = y = mm[x >> sx & 255] + a + b & M
+            r[i+1] = b = mm[y >> sy & 255] + x & M
+
+            x = mm[i+2]
+            a = mm[(i+2) ^ 128] + (a ^ a << s2 & M) & M
+            mm[i+2] = y = mm[x >> sx & 255] + a + b & M
+            r[i+2] = b = mm[y >> sy & 255] + x & M
+
+            x = mm[i+3]
+            a = mm[(i+3) ^ 128] + (a ^ a >> s3) & M
+            mm[i+3] = y = mm[x >> sx & 255] + a + b & M
+            r[i+3] = b = mm[y >> sy & 255] + x & M
+        self.a, self.b = a, b
+        self.mm[:] = mm
+        self.rsl[:] = r
+        self.index = 0
+        return self.rsl.copy()
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        if self.index == SIZE:
+            self.round()
+        x = int(self.rsl[self.index])
+        self.index += 1
+        self.position += 1
+        return x
+
+    def fill(self, n: int):
+        """
+        Возвращает следующие `n` чисел последовательности.
+
+        :param n: Количество чисел.
+        :type n: int
+        :return: Массив из `n` слов (uint32 или uint64).
+        :rtype: np.ndarray
+        """
+        out = np.empty(n, dtype=self.dtype)
+        i = 0
+        while i < n:
+            if self.index == SIZE:
+                self.round()
+            k = min(SIZE - self.index, n - i)
+            out[i:i+k] = self.rsl[self.index:self.index+k]
+            self.index += k
+            i += k
+        self.position += n
+        return out
+
+    def skip(self, k: int):
+        """
+        Пропускает `k` чисел: остаток текущего раунда и нужное количество раундов.
+
+        :param k: Количество пропускаемых чисел.
+        :type k: int
+        :return: Этот же генератор.
+        :rtype: Isaac
+        """
+        if k < 0:
+            raise ValueError("k must be non-negative")
+        self.position += k
+        k -= SIZE - self.index
+        while k > 0:
+            self.round()
+            k -= SIZE
+        self.index = SIZE + k
+        return self
+
+    def _state(self):
+        return (self.bits, self.mm.copy(), self.rsl.copy(), self.a, self.b, self.c, self.index)
+
+    def _restore(self, state):
+        bits, mm, rsl, self.a, self.b, self.c, self.index = state
+        self.bits = bits
+        self.m = 2**bits
+        self.dtype = np.uint32 if bits == 32 else np.uint64
+        self.mm = np.array(mm, dtype=self.dtype)
+        self.rsl = np.array(rsl, dtype=self.dtype)
+
+def isaac_generator(key=b'', bits: int = 32):
     """
     Генератор псевдослучайных чисел на основе алгоритма ISAAC.
 
     Алгоритм:
-    - Инициализирует массивы `z` (выходные значения) и `s` (состояние) размером `2^n`.
-    - Использует три регистра (`a`, `b`, `c`) для хранения промежуточных данных.
-    - Выполняет побитовые операции с использованием функции `f()` и обновляет состояние `s`.
+    - Состояние из 256 слов `mm` инициализируется по ключу `key` (процедура `randinit`).
+    - Каждый раунд использует три регистра (`a`, `b`, `c`), обновляет все 256 слов
+      состояния и выдает 256 чисел.
+
+    :param key: Ключ (байты или последовательность слов); пустой ключ дает эталонную
+        последовательность ISAAC с нулевым начальным значением.
+    :param bits: Разрядность: 32 (ISAAC) или 64 (ISAAC-64).
+    :type bits: int
 
-    :yield: Следующее псевдослучайное число.
-    :rtype: int
+    :return: Итератор по последовательности; следующее число - `next()`, блок чисел - `fill(n)`.
+    :rtype: Isaac
 
     Примечания:
-    - Размер массива `s` определяется параметром `n` (в данном случае `n = 20`).
-    - Генерация чисел завершается, когда индекс `i` достигает размера массива `s`.
+    - Числа выдаются в порядке индексов результатов раунда.
+    - Последовательность бесконечна, память не зависит от количества запрошенных чисел.
     """
-    n = 20 
-    #степень числа 2 выбрана высокой для универсальности использования 
-    #при любом размере внешнего запроса на количество генерируемых чисел
-    
-    z = [0]*(2**n)
-    s = []
-    for i in range(2**n):
-        s.append(i)
-    a,b,c = 0,0,0
-
-    c += 1
-    b += c
-    i = 0
-    while i < 2**n-1:
-        yield b
-        x = s[i]
-        a = f(a,i) + s[(i + 128) % (2**n)]
-        s[i] = a + b + s[(x>>2)%(2**n)]
-        z[i] = x + s[(s[i]>>10)%(2**n)]
-        b = z[i]
-        i += 1
\ No newline at end of file
+    return Isaac(key, bits)
@@ -1,3 +1,209 @@
+import numpy as np
+from gens.protocol import BaseGenerator
+
+class LinearCongruentialGenerator(BaseGenerator):
+    """
+    Линейный конгруэнтный генератор `x = (a*x + c) % m` с поштучной и блочной выдачей.
+
+    Атрибуты:
+        m (int): Модуль (диапазон значений).
+        a (int): Множитель.
+        c (int): Приращение.
+        x (int): Следующее выдаваемое значение.
+        block (int): Размер блока, вычисляемого за одну векторную операцию.
+        bits (int): Количество используемых младших бит числа: `log2(m)` для модуля-степени
+            двойки, иначе `floor(log2(m))`.
+
+    Методы:
+        fill(n):
+            Возвращает следующие `n` чисел последовательности в виде массива NumPy.
+        jump(k):
+            Пропускает `k` чисел последовательности за O(log k) операций
+            (им же выполняются `skip(k)` и `seek(n)`).
+        substream(i, stride, leapfrog):
+            Создаёт независимый генератор `i`-го подпотока.
+    """
+    def __init__(self, m: int, a: int, c: int, seed: int, block: int = 4096):
+        """
+        Инициализирует генератор и заранее вычисляет множители `a^k mod m`
+        и приращения `c*(a^(k-1) + ... + 1) mod m` для `k = 0..block`.
+
+        :param m: Модуль (диапазон значений).
+        :param a: Множитель.
+        :param c: Приращение.
+        :param seed: Начальное значение (seed).
+        :param block: Размер блока для `fill`.
+        """
+        self.m = m
+        self.a = a
+        self.c = c
+        self.x = seed
+        self.block = block
+        self.bits = (m - 1).bit_length() if m & (m - 1) == 0 else m.bit_length() - 1
+        self._mul = None
+        self._inc = None
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        x = self.x
+        self.x = (self.a*x + self.c) % self.m
+        self.position += 1
+        return x
+
+    def _dtype(self):
+        """
+        Тип элементов массива, в который помещаются значения `0..m-1`
+        (и начальное значение, если оно ещё не выдано).
+        """
+        bound = max(self.m, self.x + 1)
+        if bound <= 2**32:
+            return np.uint32
+        if bound <= 2**64:
+            return np.uint64
+        return object
+
+    def _vectorizable(self):
+        """
+        Проверяет, можно ли считать шаг `A*x + C` в uint64 без потери точности:
+        либо модуль - степень двойки не больше `2^64` (переполнение совпадает с
+        взятием остатка), либо `(m-1)^2 + (m-1)` помещается в 64 бита.
+        """
+        m = self.m
+        return (m & (m - 1) == 0 and m <= 2**64) or (m - 1)*m < 2**64
+
+    def _tables(self):
+        """
+        Строит таблицы множителей `a^k mod m` и приращений `C_k mod m`, `k = 0..block`.
+        """
+        if self._mul is None:
+            mul = [1]
+            inc = [0]
+            for i in range(self.block):
+                mul.append(mul[-1]*self.a % self.m)
+                inc.append((inc[-1]*self.a + self.c) % self.m)
+            self._mul = np.array(mul, dtype=np.uint64)
+            self._inc = np.array(inc, dtype=np.uint64)
+        return self._mul, self._inc
+
+    def _mod(self, arr):
+        """
+        Берёт остаток по модулю `m` от массива uint64.
+        """
+        m = self.m
+        if m == 2**64:
+            return arr
+        if m & (m - 1) == 0:
+            return arr & np.uint64(m - 1)
+        return arr % np.uint64(m)
+
+    def fill(self, n: int):
+        """
+        Возвращает следующие `n` чисел последовательности.
+
+        Блок из `block` чисел вычисляется одной векторной операцией
+        `x_k = (a^k * x + C_k) % m`, после чего состояние переносится на начало
+        следующего блока. Результат совпадает с поштучной генерацией через `next()`.
+
+        :param n: Количество чисел.
+        :type n: int
+        :return: Массив из `n` чисел (uint32 при `m <= 2^32`, uint64 при `m <= 2^64`, иначе object).
+        :rtype: np.ndarray
+        """
+        out = np.empty(n, dtype=self._dtype())
+        i = 0
+        #начальное значение может быть не меньше m - выдаём его поштучно
+        while i < n and self.x >= self.m:
+            out[i] = next(self)
+            i += 1
+        if not self._vectorizable():
+            while i < n:
+                out[i] = next(self)
+                i += 1
+            return out
+        mul, inc = self._tables()
+        while i < n:
+            k = min(self.block, n - i)
+            x = np.uint64(self.x)
+            out[i:i+k] = self._mod(mul[:k]*x + inc[:k])
+            self.x = (int(mul[k])*self.x + int(inc[k])) % self.m
+            self.position += k
+            i += k
+        return out
+
+    def _power(self, k: int):
+        """
+        Возводит аффинное отображение `x -> a*x + c` в степень `k` по модулю `m`
+        быстрым возведением в степень.
+
+        :param k: Показатель степени (количество шагов).
+        :type k: int
+        :return: Пара `(A, C)`, такая что `k` шагов генератора равны `x -> A*x + C`.
+        :rtype: tuple[int, int]
+        """
+        m = self.m
+        mul, inc = 1, 0
+        a, c = self.a % m, self.c % m
+        while k > 0:
+            if k & 1:
+                mul, inc = mul*a % m, (inc*a + c) % m
+            a, c = a*a % m, (c*a + c) % m
+            k >>= 1
+        return mul, inc
+
+    def jump(self, k: int):
+        """
+        Пропускает `k` чисел последовательности без их генерации.
+
+        :param k: Количество пропускаемых чисел.
+        :type k: int
+        :return: Этот же генератор.
+        :rtype: LinearCongruentialGenerator
+        """
+        if k < 0:
+            raise ValueError("k must be non-negative")
+        if k > 0:
+            mul, inc = self._power(k)
+            self.x = (mul*self.x + inc) % self.m
+            self.position += k
+        return self
+
+    def skip(self, k: int):
+        return self.jump(k)
+
+    def _state(self):
+        return (self.m, self.a, self.c, self.x, self.block)
+
+    def _restore(self, state):
+        self.__init__(*state)
+
+    def substream(self, i: int, stride: int, leapfrog: bool = False):
+        """
+        Создаёт генератор `i`-го из непересекающихся подпотоков текущей последовательности.
+
+        При разбиении на блоки (`leapfrog=False`) подпоток `i` - это числа с номерами
+        `i*stride, i*stride + 1, ...` (используйте не более `stride` чисел).
+        В режиме чехарды (`leapfrog=True`) подпоток `i` - числа с номерами
+        `i, i + stride, i + 2*stride, ...`, то есть LCG с множителем `a^stride`.
+        Исходный генератор не изменяется, поэтому `N` процессов могут независимо
+        получить свои подпотоки.
+
+        :param i: Номер подпотока.
+        :type i: int
+        :param stride: Длина блока или шаг чехарды (обычно число процессов).
+        :type stride: int
+        :param leapfrog: Режим чехарды вместо разбиения на блоки.
+        :type leapfrog: bool
+        :return: Новый генератор подпотока.
+        :rtype: LinearCongruentialGenerator
+        """
+        if leapfrog:
+            sub = LinearCongruentialGenerator(self.m, self.a, self.c, self.x, self.block).jump(i)
+            mul, inc = self._power(stride)
+            return LinearCongruentialGenerator(self.m, mul, inc, sub.x, self.block)
+        return LinearCongruentialGenerator(self.m, self.a, self.c, self.x, self.block).jump(i*stride)
+
 def linear_congruential_generator(m: int, a: int, c: int, seed: int):
     """
     Генератор псевдослучайных чисел с использованием линейного конгруэнтного метода.
@@ -7,15 +213,13 @@ def linear_congruential_generator(m: int, a: int, c: int, seed: int):
     :param c: Приращение.
     :param seed: Начальное значение (seed).
 
-    :yield: Следующее псевдослучайное число.
+    :return: Итератор по последовательности; следующее число - `next()`, блок чисел - `fill(n)`.
+    :rtype: LinearCongruentialGenerator
     """
-    x = seed
-    while True:
-        yield x
-        x = (a*x + c) % m
+    return LinearCongruentialGenerator(m, a, c, seed)
 
 #Рекомендлванные параметры для инициализации генератора:
 # m = [2**32, 2**32, 2**31, 2**31, 2**32, 2**32, 2**32, 2**32, 2**24, 2**31 - 1, 2**31 - 1, 2**31 - 1, 2**31 - 1, 2**64, 2**64, 69069, 2**48]
 # a = [1664525, 226954477, 1103515245, 1103515245, 1103515245, 1103515245, 134775813, 214013, 1140671485, 2147483629, 16807, 48271, 6364136223846793005, 6364136223846793005, 69069, 25214903917]
 # c = [1013904223, 1, 12345, 12345, 12345, 12345, 1, 2531011, 12820163, 2147483587, 0, 0, 1442695040888963407, 1, 11]
-#Генератор Лемера: c = 0
\ No newline at end of file
+#Генератор Лемера: c = 0
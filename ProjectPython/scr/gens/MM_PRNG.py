@@ -1,4 +1,135 @@
+import numpy as np
 from gens.LCM import *
+from gens.protocol import BaseGenerator, as_generator, from_state
+
+class ShuffleGenerator(BaseGenerator):
+    """
+    Перемешивающий комбинатор над двумя (или одним) генераторами проекта.
+
+    С двумя генераторами это схема Макларена-Марсальи: таблица `v` заполняется числами
+    из `gen_x`, очередное число `gen_y` выбирает ячейку таблицы, значение из нее выдается
+    и заменяется новым числом `gen_x`. С одним генератором - схема Бейса-Дурхэма:
+    ячейку выбирает предыдущее выданное число.
+
+    Атрибуты:
+        gen_x, gen_y: Генераторы-компоненты (`gen_y` равен None в схеме Бейса-Дурхэма).
+        k (int): Размер таблицы.
+        v (list[int]): Таблица перемешивания.
+        m (int): Модуль `gen_x` (диапазон выдаваемых значений).
+        bits (int): Количество используемых бит числа, как у `gen_x`.
+        block (int): Размер блоков, которыми запрашиваются числа компонентов.
+
+    Методы:
+        fill(n):
+            Возвращает следующие `n` чисел в виде массива NumPy.
+    """
+    def __init__(self, gen_x, gen_y=None, k: int = 128, block: int = 4096):
+        """
+        :param gen_x: Генератор значений; обычный итератор оборачивается `as_generator`.
+        :param gen_y: Генератор индексов или None для схемы Бейса-Дурхэма.
+        :param k: Размер таблицы.
+        :param block: Размер блоков для `fill`.
+        """
+        self.gen_x = gen_x = as_generator(gen_x)
+        self.gen_y = gen_y = as_generator(gen_y) if gen_y is not None else None
+        self.k = k
+        self.block = block
+        self.m = gen_x.m
+        self.bits = gen_x.bits
+        self.m_y = gen_y.m if gen_y is not None else None
+        if gen_y is not None:
+            #ячейки 1..k заполнены числами gen_x, ячейка 0 - нулем
+            self.v = [0] + [int(x) for x in gen_x.fill(k)]
+            self.y = None
+        else:
+            self.v = [int(x) for x in gen_x.fill(k)]
+            self.y = int(next(gen_x))
+
+    def _index(self, y: int):
+        """
+        Номер ячейки таблицы для числа `y`: `ceil(k*y / mY)` в схеме Макларена-Марсальи,
+        `floor(k*y / m)` в схеме Бейса-Дурхэма.
+        """
+        if self.gen_y is None:
+            return self.k*y//self.m
+        return -(-self.k*y//self.m_y)
+
+    def _indices(self, ys):
+        """
+        Векторно вычисляет номера ячеек `ceil(k*y / mY)` для блока чисел `gen_y`.
+        """
+        k, m_y = self.k, self.m_y
+        if ys.dtype != object and (k + 1)*m_y <= 2**64:
+            ys = ys.astype(np.uint64)
+            return ((ys*np.uint64(k) + np.uint64(m_y - 1))//np.uint64(m_y)).tolist()
+        return [-(-k*int(y)//m_y) for y in ys]
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        x = int(next(self.gen_x))
+        self.position += 1
+        if self.gen_y is None:
+            j = self._index(self.y)
+            self.y = self.v[j]
+            self.v[j] = x
+            return self.y
+        j = self._index(int(next(self.gen_y)))
+        res = self.v[j]
+        self.v[j] = x
+        return res
+
+    def fill(self, n: int):
+        """
+        Возвращает следующие `n` чисел.
+
+        Числа компонентов берутся блоками через их `fill`, номера ячеек для схемы
+        Макларена-Марсальи вычисляются векторно; в цикле остается только обмен
+        значений с таблицей. Результат совпадает с поштучной генерацией.
+
+        :param n: Количество чисел.
+        :type n: int
+        :return: Массив из `n` чисел того же типа, что выдает `gen_x`.
+        :rtype: np.ndarray
+        """
+        chunks = []
+        v = self.v
+        for start in range(0, n, self.block):
+            size = min(self.block, n - start)
+            xs = self.gen_x.fill(size)
+            out = []
+            if self.gen_y is None:
+                k, m, y = self.k, self.m, self.y
+                for x in xs.tolist():
+                    j = k*y//m
+                    y = v[j]
+                    v[j] = x
+                    out.append(y)
+                self.y = y
+            else:
+                for x, j in zip(xs.tolist(), self._indices(self.gen_y.fill(size))):
+                    out.append(v[j])
+                    v[j] = x
+            chunks.append(np.array(out, dtype=xs.dtype))
+        self.position += n
+        return np.concatenate(chunks) if chunks else np.zeros(0, dtype=np.uint64)
+
+    def _state(self):
+        gen_y = self.gen_y.getstate() if self.gen_y is not None else None
+        return (self.k, self.block, tuple(self.v), self.y, self.gen_x.getstate(), gen_y)
+
+    def _restore(self, state):
+        k, block, v, y, gen_x, gen_y = state
+        self.gen_x = from_state(gen_x)
+        self.gen_y = from_state(gen_y) if gen_y is not None else None
+        self.k = k
+        self.block = block
+        self.m = self.gen_x.m
+        self.bits = self.gen_x.bits
+        self.m_y = self.gen_y.m if self.gen_y is not None else None
+        self.v = list(v)
+        self.y = y
 
 def maclaren_marsaliya_generator():
     """
@@ -10,14 +141,15 @@ def maclaren_marsaliya_generator():
     - На каждой итерации выбирает значение из `v` по индексу `j`, вычисленному на основе значения `genY`.
     - Замещает значение в массиве `v[j]` новым числом из `genX`.
 
-    :yield: Следующее псевдослучайное число из массива `v`.
-    :rtype: int
+    :return: Итератор по последовательности; следующее число - `next()`, блок чисел - `fill(n)`.
+    :rtype: ShuffleGenerator
 
     Примечания:
     - Размер массива `v` задается параметром `k` (в данном случае `k = 128`).
-    - Индекс `j` вычисляется по формуле:  
-      `j = (k * y) // mY + ((k * y) % mY >= 0.5)`,  
+    - Индекс `j` вычисляется по формуле:
+      `j = (k * y) // mY + ((k * y) % mY >= 0.5)`,
       где `y` — очередное значение из `genY`, а `mY` — модуль генератора `genY`.
+    - Перемешивание с другими генераторами и размерами таблицы - `ShuffleGenerator`.
     """
     mX: int = 2_147_483_648
     aX: int = 594_156_893
@@ -33,12 +165,4 @@ def maclaren_marsaliya_generator():
 
     k = 128 #или 64, 256
 
-    v = [0]
-    for i in range(k):
-        v.append(next(genX))
-    while True:
-        x = next(genX)
-        y = next(genY)
-        j = (k*y)//mY + ((k*y)%mY >= 0.5)
-        yield v[j]
-        v[j] = x
\ No newline at end of file
+    return ShuffleGenerator(genX, genY, k)
@@ -8,19 +8,39 @@
 - isaac_generator: Генератор ISAAC.
 - maclaren_marsaliya_generator: Генератор Макларена-Марсальи.
 - fortuna: Генератор Fortuna.
+
+Все генераторы реализуют общий интерфейс `BaseGenerator` (`next_u32`, `fill_u32`,
+`fill_u64`, `random_bytes`); обычные итераторы приводятся к нему функцией `as_generator`.
+Состояние генератора сохраняется методами `to_bytes()`/`checkpoint(path)` и
+восстанавливается функциями `from_bytes(data)`/`load_checkpoint(path)`.
+
+Подмодули загружаются лениво, при первом обращении к экспортируемому имени,
+поэтому `import gens` не импортирует NumPy и другие зависимости.
 """
-from gens.AlgBBS_PRNG import bbs_generator
-from gens.Fibon_PRNG import lagged_fibonacci_generator
-from gens.Fortuna_auto import fortuna
-from gens.ISAAC import isaac_generator
-from gens.LCM import linear_congruential_generator
-from gens.MM_PRNG import maclaren_marsaliya_generator
+import importlib
+
+_EXPORTS = {
+    "linear_congruential_generator": "gens.LCM",
+    "lagged_fibonacci_generator": "gens.Fibon_PRNG",
+    "bbs_generator": "gens.AlgBBS_PRNG",
+    "isaac_generator": "gens.ISAAC",
+    "maclaren_marsaliya_generator": "gens.MM_PRNG",
+    "fortuna": "gens.Fortuna_auto",
+    "BaseGenerator": "gens.protocol",
+    "as_generator": "gens.protocol",
+    "from_state": "gens.protocol",
+    "from_bytes": "gens.protocol",
+    "load_checkpoint": "gens.protocol",
+}
+
+__all__ = list(_EXPORTS)
+
+def __getattr__(name):
+    if name in _EXPORTS:
+        value = getattr(importlib.import_module(_EXPORTS[name]), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
-__all__ = [
-    "linear_congruential_generator",
-    "lagged_fibonacci_generator",
-    "bbs_generator",
-    "isaac_generator",
-    "maclaren_marsaliya_generator",
-    "fortuna"
-]
\ No newline at end of file
+def __dir__():
+    return sorted(set(globals()) | set(_EXPORTS))
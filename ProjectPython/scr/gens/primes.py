@@ -0,0 +1,303 @@
+"""
+Модуль генерации простых чисел для генератора Blum-Blum-Shub.
+
+Содержит сегментированное решето Эратосфена по нечётным числам, детерминированный
+тест Миллера-Рабина, поиск простых чисел Блюма (`p = 3 mod 4`) и безопасных простых
+чисел (`p = 2q + 1`) заданной битовой длины, а также дисковый кэш найденных пар.
+"""
+import hashlib
+import json
+import os
+from math import isqrt
+from functools import lru_cache
+
+#основания, при которых тест Миллера-Рабина точен для n < 3.3 * 10^24
+MR_BASES = (2, 3, 5, 7, 11, 13, 17, 19, 23, 29, 31, 37, 41)
+MR_LIMIT = 3_317_044_064_679_887_385_961_981
+
+SEGMENT = 1 << 18
+CACHE_ENV = "GENS_PRIME_CACHE"
+
+def small_primes(limit: int):
+    """
+    Возвращает все простые числа, меньшие `limit`, решетом Эратосфена по нечётным числам.
+
+    :param limit: Верхняя граница (не включается).
+    :type limit: int
+    :return: Список простых чисел в порядке возрастания.
+    :rtype: list[int]
+    """
+    if limit <= 2:
+        return []
+    #sieve[i] соответствует числу 2*i + 1 < limit
+    size = limit//2
+    sieve = bytearray([1])*size
+    sieve[0] = 0
+    for i in range(1, min(size, (isqrt(limit) + 1)//2 + 1)):
+        if sieve[i]:
+            p = 2*i + 1
+            start = p*p//2
+            if start >= size:
+                break
+            sieve[start::p] = bytes(len(range(start, size, p)))
+    return [2] + [2*i + 1 for i in range(size) if sieve[i]]
+
+@lru_cache(maxsize=None)
+def _base_primes(limit: int):
+    return tuple(small_primes(limit))
+
+def segmented_sieve(lo: int, hi: int):
+    """
+    Перечисляет простые числа из полуинтервала `[lo, hi)`.
+
+    Интервал обрабатывается сегментами по `SEGMENT` нечётных чисел, поэтому память
+    не зависит от длины интервала.
+
+    :param lo: Нижняя граница (включается).
+    :type lo: int
+    :param hi: Верхняя граница (не включается).
+    :type hi: int
+    :yield: Простые числа в порядке возрастания.
+    :rtype: int
+    """
+    if lo <= 2 < hi:
+        yield 2
+    lo = max(lo, 3) | 1
+    base = _base_primes(isqrt(hi) + 2)[1:]
+    while lo < hi:
+        top = min(lo + 2*SEGMENT, hi)
+        #seg[i] соответствует числу lo + 2*i
+        size = (top - lo + 1)//2
+        seg = bytearray([1])*size
+        for p in base:
+            if p*p >= top:
+                break
+            start = max(p*p, (lo + p - 1)//p*p)
+            if start % 2 == 0:
+                start += p
+            i = (start - lo)//2
+            if i < size:
+                seg[i::p] = bytes(len(range(i, size, p)))
+        for i in range(size):
+            if seg[i]:
+                yield lo + 2*i
+        lo = top if top % 2 else top + 1
+
+def is_probable_prime(n: int):
+    """
+    Тест Миллера-Рабина с фиксированным набором оснований.
+
+    Для `n < 3.3 * 10^24` результат точен; для больших `n` используются первые 40
+    простых оснований, и вероятность ошибки не превышает `4^-40`.
+
+    :param n: Проверяемое число.
+    :type n: int
+    :return: True, если `n` простое (или вероятно простое).
+    :rtype: bool
+    """
+    if n < 2:
+        return False
+    for p in MR_BASES:
+        if n % p == 0:
+            return n == p
+    d = n - 1
+    s = 0
+    while d % 2 == 0:
+        d //= 2
+        s += 1
+    bases = MR_BASES if n < MR_LIMIT else _base_primes(180)[:40]
+    for a in bases:
+        x = pow(a, d, n)
+        if x == 1 or x == n - 1:
+            continue
+        for _ in range(s - 1):
+            x = x*x % n
+            if x == n - 1:
+                break
+        else:
+            return False
+    return True
+
+@lru_cache(maxsize=None)
+def blum_primes(lo: int, count: int):
+    """
+    Возвращает первые `count` простых чисел Блюма (`p = 3 mod 4`), больших `lo`.
+
+    :param lo: Нижняя граница (не включается).
+    :type lo: int
+    :param count: Количество простых чисел.
+    :type count: int
+    :return: Кортеж простых чисел в порядке возрастания.
+    :rtype: tuple[int, ...]
+    """
+    primes = []
+    start = lo + 1
+    width = max(count*64, 1024)
+    while len(primes) < count:
+        for p in segmented_sieve(start, start + width):
+            if p % 4 == 3:
+                primes.append(p)
+                if len(primes) == count:
+                    break
+        start += width
+    return tuple(primes)
+
+def _candidate(bits: int, index: int, kind: str, attempt: int):
+    """
+    Детерминированно строит стартовое нечётное число длины `bits` бит, `= 3 mod 4`,
+    из SHA-256 в режиме счётчика по `(kind, bits, index, attempt)`.
+    """
+    data = b''
+    counter = 0
+    while len(data)*8 < bits:
+        data += hashlib.sha256(f"{kind}:{bits}:{index}:{attempt}:{counter}".encode('utf-8')).digest()
+        counter += 1
+    x = int.from_bytes(data, 'big') >> (len(data)*8 - bits)
+    #два старших бита гарантируют, что произведение двух чисел имеет ровно 2*bits бит
+    x |= 3 << (bits - 2)
+    return x | 3
+
+def _search(bits: int, index: int, safe: bool):
+    """
+    Ищет простое число Блюма (или безопасное простое) длины `bits` бит.
+
+    Кандидаты `x, x + 4, x + 8, ...` просеиваются малыми простыми числами, и только
+    выжившие проверяются тестом Миллера-Рабина. Для безопасных простых отсеиваются
+    также кандидаты, у которых `(x - 1)/2` делится на малое простое.
+    """
+    if bits < 18:
+        raise ValueError("bits must be at least 18")
+    kind = "safe" if safe else "blum"
+    window = 4096 if not safe else 1 << 16
+    base = _base_primes(1 << 16)[1:]
+    attempt = 0
+    while True:
+        x = _candidate(bits, index, kind, attempt)
+        attempt += 1
+        #sieve[j] соответствует числу x + 4*j
+        sieve = bytearray([1])*window
+        for p in base:
+            inv4 = pow(4, -1, p)
+            j = (-x)*inv4 % p
+            sieve[j::p] = bytes(len(range(j, window, p)))
+            if safe:
+                j = (1 - x)*inv4 % p
+                sieve[j::p] = bytes(len(range(j, window, p)))
+        for j in range(window):
+            if not sieve[j]:
+                continue
+            cand = x + 4*j
+            if cand.bit_length() != bits:
+                break
+            if safe and pow(2, cand - 1, cand) != 1:
+                continue
+            if is_probable_prime(cand) and (not safe or is_probable_prime((cand - 1)//2)):
+                return cand
+
+def blum_prime(bits: int, index: int = 0):
+    """
+    Возвращает детерминированное простое число Блюма (`p = 3 mod 4`) длины `bits` бит.
+
+    :param bits: Битовая длина (например, 512-2048).
+    :type bits: int
+    :param index: Номер числа; разные индексы дают независимые простые числа.
+    :type index: int
+    :return: Простое число.
+    :rtype: int
+    """
+    return _search(bits, index, False)
+
+def safe_prime(bits: int, index: int = 0):
+    """
+    Возвращает детерминированное безопасное простое число `p = 2q + 1` длины `bits` бит.
+
+    Безопасные простые числа больше 7 являются и простыми числами Блюма.
+
+    :param bits: Битовая длина.
+    :type bits: int
+    :param index: Номер числа.
+    :type index: int
+    :return: Простое число.
+    :rtype: int
+    """
+    return _search(bits, index, True)
+
+def cache_path():
+    """
+    Путь к файлу кэша пар простых чисел: переменная окружения `GENS_PRIME_CACHE`
+    или `~/.cache/gens/primes.json`.
+
+    :rtype: str
+    """
+    return os.environ.get(CACHE_ENV) or os.path.join(os.path.expanduser("~"), ".cache", "gens", "primes.json")
+
+def _load_cache(path: str):
+    try:
+        with open(path, 'r', encoding='utf-8') as file:
+            cache = json.load(file)
+    except (OSError, ValueError):
+        return {}
+    return cache if isinstance(cache, dict) else {}
+
+def _store_cache(path: str, key: str, value):
+    """
+    Добавляет запись в кэш. Файл перезаписывается атомарно; ошибки записи
+    (например, каталог только для чтения) не мешают работе генератора.
+    """
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        cache = _load_cache(path)
+        cache[key] = value
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, 'w', encoding='utf-8') as file:
+            json.dump(cache, file)
+        os.replace(tmp, path)
+    except OSError:
+        pass
+
+def _cached_pair(cached, bits: int, safe: bool):
+    """
+    Разбирает пару из кэша и проверяет ее так же, как результат поиска: оба числа
+    простые, `= 3 mod 4`, длины `bits` бит и различны (для безопасных простых
+    проверяется и `(p - 1)/2`). Испорченная или подмененная запись дает None.
+    """
+    try:
+        p, q = (int(x, 16) for x in cached)
+    except (TypeError, ValueError):
+        return None
+    for x in (p, q):
+        if x % 4 != 3 or x.bit_length() != bits or not is_probable_prime(x):
+            return None
+        if safe and not is_probable_prime((x - 1)//2):
+            return None
+    return (p, q) if p != q else None
+
+@lru_cache(maxsize=None)
+def blum_pair(bits: int, index: int = 0, safe: bool = False):
+    """
+    Возвращает пару различных простых чисел Блюма `(p, q)` длины `bits` бит.
+
+    Пары кэшируются в памяти процесса и на диске (см. `cache_path`) по ключу
+    из вида, длины и индекса, так что повторный запрос не повторяет поиск.
+    Пара из дискового кэша проверяется тестом Миллера-Рабина; не прошедшая
+    проверку запись ищется заново и перезаписывается.
+
+    :param bits: Битовая длина каждого из чисел.
+    :type bits: int
+    :param index: Номер пары.
+    :type index: int
+    :param safe: Искать безопасные простые числа вместо простых чисел Блюма.
+    :type safe: bool
+    :return: Пара `(p, q)`.
+    :rtype: tuple[int, int]
+    """
+    key = f"{'safe' if safe else 'blum'}:{bits}:{index}"
+    path = cache_path()
+    cached = _cached_pair(_load_cache(path).get(key), bits, safe)
+    if cached is not None:
+        return cached
+    search = safe_prime if safe else blum_prime
+    p = search(bits, 2*index)
+    q = search(bits, 2*index + 1)
+    _store_cache(path, key, [format(p, 'x'), format(q, 'x')])
+    return p, q
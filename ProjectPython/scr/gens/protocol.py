@@ -0,0 +1,482 @@
+"""
+Общий интерфейс генераторов пакета gens.
+
+Каждый генератор выдает числа через `next()` и блоки через `fill(n)`; из каждого числа
+используются младшие `bits` бит. Поверх этого `BaseGenerator` дает единые методы
+`next_u32()`, `fill_u32(out)`, `fill_u64(out)` и `random_bytes(n)`. Методы `fill_*`
+записывают результат прямо в буфер вызывающего (массив NumPy, bytearray или memoryview).
+
+Поток бит генератора - младшие `bits` бит каждого числа, начиная со старшего;
+`random_bytes` упаковывает его в байты, а слова `fill_u32`/`fill_u64` - это
+последовательные 4/8 байт потока в порядке big-endian. Для генераторов с `bits`,
+равным 32 или 64, слова совпадают с самими числами.
+
+Состояние генератора возвращает `getstate()` и восстанавливает `setstate(state)`;
+`to_bytes()` и `from_bytes(data)` переводят его в компактный двоичный вид, а
+`checkpoint(path)` и `load_checkpoint(path)` сохраняют его на диск. `seek(n)` переводит
+генератор к числу с номером `n`: алгебраическим прыжком, если он есть у генератора,
+иначе пропуском блоками через `fill`.
+"""
+import importlib
+import os
+import struct
+import numpy as np
+
+MAGIC = b'GENS\x01'
+#сколько чисел пропускается за один вызов fill в skip
+SKIP_BLOCK = 1 << 16
+
+def _as_array(out, dtype):
+    """
+    Возвращает массив NumPy типа `dtype`, разделяющий память с буфером `out`.
+    """
+    if isinstance(out, np.ndarray):
+        if out.dtype != dtype or not out.flags.c_contiguous:
+            raise TypeError(f"out must be a contiguous {np.dtype(dtype).name} array")
+        return out
+    view = memoryview(out)
+    if view.readonly:
+        raise TypeError("out must be writable")
+    return np.frombuffer(view.cast('B'), dtype=dtype)
+
+def words_to_bits(words, width: int):
+    """
+    Разворачивает числа в поток бит: по `width` младших бит каждого числа,
+    начиная со старшего.
+
+    :param words: Массив чисел (не длиннее 64 бит).
+    :type words: np.ndarray
+    :param width: Количество бит на число (1-64).
+    :type width: int
+    :return: Массив uint8 из нулей и единиц длины `len(words)*width`.
+    :rtype: np.ndarray
+    """
+    words = np.asarray(words)
+    if words.dtype == object:
+        words = np.array([int(x) & (2**64 - 1) for x in words], dtype=np.uint64)
+    raw = np.ascontiguousarray(words, dtype='>u8').view(np.uint8)
+    return np.unpackbits(raw).reshape(-1, 64)[:, 64 - width:].ravel()
+
+def _varint(n: int):
+    out = bytearray()
+    while True:
+        byte = n & 0x7F
+        n >>= 7
+        if n:
+            out.append(byte | 0x80)
+        else:
+            out.append(byte)
+            return bytes(out)
+
+def _encode(obj, out: bytearray):
+    """
+    Дописывает в `out` значение состояния: None, bool, int, float, str, bytes,
+    одномерный массив NumPy с числовыми элементами или кортеж/список таких значений.
+    """
+    if obj is None or isinstance(obj, bool):
+        out += {None: b'N', True: b'T', False: b'F'}[obj]
+    elif isinstance(obj, (int, np.integer)):
+        obj = int(obj)
+        data = obj.to_bytes(obj.bit_length()//8 + 1, 'little', signed=True)
+        out += b'I' + _varint(len(data)) + data
+    elif isinstance(obj, float):
+        out += b'D' + struct.pack('<d', obj)
+    elif isinstance(obj, str):
+        data = obj.encode('utf-8')
+        out += b'S' + _varint(len(data)) + data
+    elif isinstance(obj, (bytes, bytearray)):
+        out += b'B' + _varint(len(obj)) + bytes(obj)
+    elif isinstance(obj, np.ndarray):
+        if obj.dtype == object or obj.ndim != 1:
+            raise TypeError("only one-dimensional numeric arrays can be encoded")
+        arr = np.ascontiguousarray(obj, dtype=obj.dtype.newbyteorder('<'))
+        kind = arr.dtype.str.encode('ascii')
+        out += b'A' + _varint(len(kind)) + kind + _varint(arr.nbytes) + arr.tobytes()
+    elif isinstance(obj, (tuple, list)):
+        out += b'L' + _varint(len(obj))
+        for item in obj:
+            _encode(item, out)
+    else:
+        raise TypeError(f"cannot encode {type(obj).__name__}")
+
+def _decode(data, i: int):
+    """
+    Читает значение, записанное `_encode`, начиная с позиции `i`.
+
+    :return: Пара (значение, позиция после него); списки читаются как кортежи.
+    """
+    def varint(i):
+        n = shift = 0
+        while True:
+            byte = data[i]
+            i += 1
+            n |= (byte & 0x7F) << shift
+            shift += 7
+            if not byte & 0x80:
+                return n, i
+    tag = data[i:i+1]
+    i += 1
+    if tag in (b'N', b'T', b'F'):
+        return {b'N': None, b'T': True, b'F': False}[tag], i
+    if tag == b'D':
+        return struct.unpack_from('<d', data, i)[0], i + 8
+    if tag in (b'I', b'S', b'B'):
+        size, i = varint(i)
+        raw = bytes(data[i:i+size])
+        if len(raw) != size:
+            raise ValueError("truncated state")
+        if tag == b'I':
+            return int.from_bytes(raw, 'little', signed=True), i + size
+        return (raw.decode('utf-8') if tag == b'S' else raw), i + size
+    if tag == b'A':
+        size, i = varint(i)
+        kind = bytes(data[i:i+size]).decode('ascii')
+        i += size
+        size, i = varint(i)
+        if len(data) < i + size:
+            raise ValueError("truncated state")
+        return np.frombuffer(bytes(data[i:i+size]), dtype=kind).astype(np.dtype(kind).newbyteorder('=')), i + size
+    if tag == b'L':
+        size, i = varint(i)
+        items = []
+        for _ in range(size):
+            item, i = _decode(data, i)
+            items.append(item)
+        return tuple(items), i
+    raise ValueError(f"unknown state tag {tag!r}")
+
+def _class_path(cls):
+    return f"{cls.__module__}:{cls.__qualname__}"
+
+class BaseGenerator():
+    """
+    Базовый класс генераторов с общим интерфейсом.
+
+    Подкласс задает атрибуты `m` (модуль, диапазон чисел) и `bits` (сколько младших бит
+    числа используется), а также метод `__next__`; при наличии векторной реализации
+    подкласс переопределяет `fill(n)`, а при собственном побитовом выходе - `random_bytes(n)`.
+    `__next__` и `fill` увеличивают счетчик `position`. Для сохранения состояния подкласс
+    реализует `_state()` (значения, достаточные для продолжения последовательности)
+    и `_restore(state)`, а при наличии прыжка вперед - `skip(k)`.
+
+    Атрибуты:
+        position (int): Количество чисел, выданных через `next()` и `fill()`.
+
+    Методы:
+        fill(n):
+            Следующие `n` чисел в виде массива NumPy.
+        next_u32():
+            Следующее 32-битное слово.
+        fill_u32(out), fill_u64(out):
+            Заполняют буфер вызывающего 32/64-битными словами.
+        random_bytes(n):
+            Следующие `n` байт потока бит.
+        getstate(), setstate(state):
+            Возвращают и восстанавливают состояние генератора.
+        to_bytes():
+            Состояние в компактном двоичном виде (обратная функция - `from_bytes`).
+        checkpoint(path):
+            Атомарно записывает состояние в файл (обратная функция - `load_checkpoint`).
+        skip(k), seek(n):
+            Пропускают `k` чисел / переходят к числу с номером `n`.
+    """
+    m = 2**32
+    bits = 32
+    position = 0
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        raise NotImplementedError
+
+    def fill(self, n: int):
+        """
+        Возвращает следующие `n` чисел, вызывая `next()` (подклассы ускоряют этот метод).
+
+        :param n: Количество чисел.
+        :type n: int
+        :return: Массив uint64 (или object для чисел длиннее 64 бит).
+        :rtype: np.ndarray
+        """
+        if self.m <= 2**64:
+            return np.fromiter((next(self) for i in range(n)), dtype=np.uint64, count=n)
+        return np.array([next(self) for i in range(n)], dtype=object)
+
+    def _pending(self):
+        """
+        Остаток бит, не выданный предыдущим `random_bytes`.
+        """
+        return getattr(self, '_bits', None)
+
+    def random_bytes(self, n: int):
+        """
+        Возвращает `n` байт потока бит: по `bits` младших бит каждого числа.
+        Неиспользованный остаток сохраняется до следующего вызова.
+
+        :param n: Количество байт.
+        :type n: int
+        :return: Случайные байты.
+        :rtype: bytes
+        """
+        pending = self._pending()
+        if pending is None:
+            pending = np.zeros(0, dtype=np.uint8)
+        if not len(pending) and self.bits in (8, 16, 32, 64):
+            step = self.bits//8
+            words = self.fill(-(-n//step))
+            if words.dtype == object:
+                words = np.array([int(x) & (2**self.bits - 1) for x in words], dtype=np.uint64)
+            data = np.ascontiguousarray(words, dtype=f'>u{step}').tobytes()
+            self._bits = words_to_bits(np.frombuffer(data[n:], dtype=np.uint8), 8)
+            return data[:n]
+        need = 8*n - len(pending)
+        count = max(0, -(-need//self.bits))
+        bits = np.concatenate([pending, words_to_bits(self.fill(count), self.bits)])
+        self._bits = bits[8*n:]
+        return np.packbits(bits[:8*n]).tobytes()
+
+    def fill_u32(self, out):
+        """
+        Заполняет буфер `out` 32-битными словами.
+
+        :param out: Массив uint32, bytearray или memoryview (длина в байтах кратна 4).
+        :return: Массив uint32, разделяющий память с `out`.
+        :rtype: np.ndarray
+        """
+        arr = _as_array(out, np.uint32)
+        n = len(arr)
+        pending = self._pending()
+        if pending is not None and len(pending):
+            arr[:] = np.frombuffer(self.random_bytes(4*n), dtype='>u4')
+        elif self.bits == 32:
+            arr[:] = self.fill(n)
+        elif self.bits == 64:
+            words = self.fill(-(-n//2)).astype(np.uint64)
+            pairs = np.empty(2*len(words), dtype=np.uint32)
+            pairs[0::2] = words >> np.uint64(32)
+            pairs[1::2] = words & np.uint64(0xFFFFFFFF)
+            arr[:] = pairs[:n]
+            if n % 2:
+                self._bits = words_to_bits(pairs[n:], 32)
+        else:
+            arr[:] = np.frombuffer(self.random_bytes(4*n), dtype='>u4')
+        return arr
+
+    def fill_u64(self, out):
+        """
+        Заполняет буфер `out` 64-битными словами.
+
+        :param out: Массив uint64, bytearray или memoryview (длина в байтах кратна 8).
+        :return: Массив uint64, разделяющий память с `out`.
+        :rtype: np.ndarray
+        """
+        arr = _as_array(out, np.uint64)
+        n = len(arr)
+        pending = self._pending()
+        if (pending is None or not len(pending)) and self.bits == 64:
+            arr[:] = self.fill(n)
+        elif (pending is None or not len(pending)) and self.bits == 32:
+            words = self.fill(2*n).astype(np.uint64)
+            arr[:] = words[0::2] << np.uint64(32) | words[1::2]
+        else:
+            arr[:] = np.frombuffer(self.random_bytes(8*n), dtype='>u8')
+        return arr
+
+    def next_u32(self):
+        """
+        Возвращает следующее 32-битное слово.
+
+        :rtype: int
+        """
+        out = np.empty(1, dtype=np.uint32)
+        self.fill_u32(out)
+        return int(out[0])
+
+    def _state(self):
+        raise TypeError(f"{type(self).__name__} state cannot be saved")
+
+    def _restore(self, state):
+        raise TypeError(f"{type(self).__name__} state cannot be restored")
+
+    def getstate(self):
+        """
+        Возвращает состояние генератора: класс, собственное состояние, `position`
+        и неиспользованный остаток бит `random_bytes`.
+
+        :return: Кортеж из чисел, строк, байт и массивов NumPy.
+        :rtype: tuple
+        """
+        pending = self._pending()
+        if pending is None:
+            pending = np.zeros(0, dtype=np.uint8)
+        return (_class_path(type(self)), self._state(), self.position,
+                np.packbits(pending).tobytes(), len(pending))
+
+    def setstate(self, state):
+        """
+        Восстанавливает состояние, полученное `getstate()` генератора того же класса.
+
+        :param state: Состояние генератора.
+        :type state: tuple
+        """
+        path, own, position, pending, count = state
+        if path != _class_path(type(self)):
+            raise ValueError(f"state of {path} cannot be restored into {_class_path(type(self))}")
+        self._restore(own)
+        self.position = position
+        self._bits = np.unpackbits(np.frombuffer(pending, dtype=np.uint8))[:count]
+
+    def __reduce_ex__(self, protocol):
+        #pickle и copy используют сохраняемое состояние, если генератор его поддерживает
+        try:
+            state = self.getstate()
+        except TypeError:
+            return super().__reduce_ex__(protocol)
+        return from_state, (state,)
+
+    def to_bytes(self):
+        """
+        Возвращает состояние генератора в компактном двоичном виде.
+
+        :rtype: bytes
+        """
+        out = bytearray(MAGIC)
+        _encode(self.getstate(), out)
+        return bytes(out)
+
+    def checkpoint(self, path: str):
+        """
+        Записывает состояние генератора в файл `path`. Файл заменяется атомарно,
+        поэтому прерванная запись не портит предыдущую контрольную точку.
+
+        :param path: Путь к файлу.
+        :type path: str
+        """
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, 'wb') as file:
+            file.write(self.to_bytes())
+        os.replace(tmp, path)
+
+    def skip(self, k: int):
+        """
+        Пропускает `k` чисел, запрашивая их блоками по `SKIP_BLOCK` через `fill`
+        (генераторы с прыжком вперед переопределяют этот метод).
+
+        :param k: Количество пропускаемых чисел.
+        :type k: int
+        :return: Этот же генератор.
+        :rtype: BaseGenerator
+        """
+        if k < 0:
+            raise ValueError("k must be non-negative")
+        while k > 0:
+            size = min(k, SKIP_BLOCK)
+            self.fill(size)
+            k -= size
+        return self
+
+    def seek(self, n: int):
+        """
+        Переводит генератор к числу с номером `n` (следующий `next()` вернет `n`-е число,
+        считая от создания генератора). Остаток бит `random_bytes` сбрасывается.
+        Вернуться назад можно только у генераторов с замкнутой формой (BBS);
+        в остальных случаях восстановите более раннюю контрольную точку.
+
+        :param n: Номер числа.
+        :type n: int
+        :return: Этот же генератор.
+        :rtype: BaseGenerator
+        """
+        if n < self.position:
+            raise ValueError("cannot seek backwards; restore an earlier checkpoint instead")
+        self.skip(n - self.position)
+        self._bits = np.zeros(0, dtype=np.uint8)
+        return self
+
+class IteratorGenerator(BaseGenerator):
+    """
+    Обертка, дающая общий интерфейс обычному итератору (например, функции-генератору).
+
+    Атрибуты:
+        it: Исходный итератор.
+        bits (int): Сколько младших бит каждого числа используется.
+    """
+    def __init__(self, it, bits: int = 32):
+        """
+        :param it: Итератор целых чисел.
+        :param bits: Количество используемых младших бит каждого числа (1-64).
+        """
+        self.it = iter(it)
+        self.bits = bits
+        self.m = 2**bits
+
+    def __next__(self):
+        x = int(next(self.it)) & (self.m - 1)
+        self.position += 1
+        return x
+
+def as_generator(gen, bits: int = 32):
+    """
+    Приводит генератор к общему интерфейсу `BaseGenerator`.
+
+    :param gen: Генератор пакета gens или любой итератор целых чисел.
+    :param bits: Количество используемых бит числа для обычных итераторов.
+    :type bits: int
+    :return: Генератор с методами `next_u32`, `fill_u32`, `fill_u64`, `random_bytes`.
+    :rtype: BaseGenerator
+    """
+    if isinstance(gen, BaseGenerator):
+        return gen
+    return IteratorGenerator(gen, bits)
+
+def from_state(state):
+    """
+    Создает генератор по состоянию, полученному `getstate()`.
+
+    Класс генератора ищется только в модулях пакета gens: состояние, прочитанное
+    из файла, не может импортировать произвольный модуль.
+
+    :param state: Состояние генератора.
+    :type state: tuple
+    :return: Генератор, продолжающий сохраненную последовательность.
+    :rtype: BaseGenerator
+    """
+    module, name = state[0].split(':')
+    if not module.startswith(f"{__package__}."):
+        raise ValueError(f"{state[0]} is not a generator class of the {__package__} package")
+    cls = importlib.import_module(module)
+    for part in name.split('.'):
+        cls = getattr(cls, part)
+    if not (isinstance(cls, type) and issubclass(cls, BaseGenerator)):
+        raise ValueError(f"{state[0]} is not a generator class")
+    gen = cls.__new__(cls)
+    gen.setstate(state)
+    return gen
+
+def from_bytes(data):
+    """
+    Создает генератор по состоянию, полученному `to_bytes()`.
+
+    :param data: Двоичное состояние.
+    :type data: bytes
+    :rtype: BaseGenerator
+    """
+    data = memoryview(data).cast('B')
+    if bytes(data[:len(MAGIC)]) != MAGIC:
+        raise ValueError("not a generator state")
+    state, end = _decode(data, len(MAGIC))
+    if end != len(data):
+        raise ValueError("trailing data after generator state")
+    return from_state(state)
+
+def load_checkpoint(path: str):
+    """
+    Создает генератор по контрольной точке, записанной `checkpoint(path)`.
+
+    :param path: Путь к файлу.
+    :type path: str
+    :rtype: BaseGenerator
+    """
+    with open(path, 'rb') as file:
+        return from_bytes(file.read())
@@ -4,5 +4,5 @@ setup(
     name="gens",
     version="0.1",
     packages=find_packages(),
-    install_requires=[], 
+    install_requires=["numpy"],
 )
\ No newline at end of file
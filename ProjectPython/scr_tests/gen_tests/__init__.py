@@ -3,11 +3,31 @@
 Экспортируемые функции:
 - diehard_tests: Тесты Diehard.
 - nist_tests: Тесты NIST.
+- BitStream: Упакованный битовый поток для тестов.
+- NistStream: Потоковый накопитель тестов NIST с ограниченной памятью.
+- nist_protocol: Проверка NIST на многих последовательностях (доля прошедших и равномерность p-значений).
+
+Модули с тестами (и их зависимости NumPy и SciPy) загружаются лениво,
+при первом обращении к экспортируемой функции.
 """
-from gen_tests.testingDiehard import diehard_tests
-from gen_tests.testingNIST import nist_tests
+import importlib
+
+_EXPORTS = {
+    "diehard_tests": "gen_tests.testingDiehard",
+    "nist_tests": "gen_tests.testingNIST",
+    "BitStream": "gen_tests.bitstream",
+    "NistStream": "gen_tests.streaming",
+    "nist_protocol": "gen_tests.assessment",
+}
+
+__all__ = list(_EXPORTS)
+
+def __getattr__(name):
+    if name in _EXPORTS:
+        value = getattr(importlib.import_module(_EXPORTS[name]), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
-__all__ = [
-    "diehard_tests",
-    "nist_tests",
-]
\ No newline at end of file
+def __dir__():
+    return sorted(set(globals()) | set(_EXPORTS))
@@ -0,0 +1,136 @@
+"""
+Проверка генератора по NIST SP 800-22 на многих последовательностях (раздел 4.2).
+
+Генератор выдает `sequences` последовательностей по `num` 32-битных чисел подряд:
+последовательность `i` - слова `[i·num, (i+1)·num)` потока `fill_u32`. Для каждой
+из них вычисляются p-значения всех тестов (`nist_pvalues`), и для каждого теста
+(каждого шаблона, направления, состояния) проверяются два условия:
+
+- доля последовательностей с `p >= alpha` не меньше `p̂ - 3·sqrt(p̂(1 - p̂)/m)`,
+  `p̂ = 1 - alpha`, `m` - число последовательностей, к которым тест применим;
+- p-значения распределены равномерно: хи-квадрат по 10 интервалам `[0, 0.1), ...,
+  [0.9, 1]` дает `P_T = igamc(9/2, χ²/2) >= 0.0001`.
+
+Последовательности делятся на непрерывные участки, которые проверяются в
+процессах-обработчиках. Для каждого участка генератор сохраняет состояние
+(`getstate`) у его первого слова и пропускает участок методом `skip`; обработчик
+восстанавливает генератор (`from_state`) и сам выдает свои последовательности.
+LCG и BBS пропускают участок алгебраическим прыжком, ISAAC - целыми раундами без
+выдачи слов; генераторы без прыжка вперед выдают и отбрасывают числа участка
+в основном процессе. Участок, который не состоит из целого числа чисел генератора
+(или начинается с остатка бит `random_bytes`), также выдается заново через
+`fill_u32`. Если состояние генератора сохранить нельзя, биты участка выдаются
+в основном процессе и передаются обработчику. Последовательность определяется
+только своим номером, поэтому результат не зависит от числа процессов.
+"""
+import os
+from concurrent.futures import ProcessPoolExecutor
+from math import sqrt
+import numpy as np
+from gen_tests.bitstream import BLOCK_WORDS, BitStream
+from gen_tests.distributions import igamc
+from gen_tests.testingNIST import nist_pvalues
+from gens.protocol import as_generator, from_state
+
+#наименьшее p-значение равномерности, при котором тест считается пройденным
+UNIFORMITY_ALPHA = 0.0001
+
+def nist_protocol(gen, sequences: int, num: int, alpha: float = 0.01, workers: int = None):
+    """
+    Проверяет генератор тестами NIST на `sequences` последовательностях.
+
+    :param gen: Генератор пакета gens или любой итератор 32-битных чисел.
+    :param sequences: Количество последовательностей.
+    :type sequences: int
+    :param num: Количество 32-битных чисел в последовательности.
+    :type num: int
+    :param alpha: Уровень значимости тестов одной последовательности.
+    :type alpha: float
+    :param workers: Количество процессов; по умолчанию число ядер, при 1 проверка
+        выполняется в текущем процессе.
+    :type workers: int
+    :return: Словарь {тест: (число последовательностей, доля прошедших,
+        p-значение равномерности, пройден ли тест)}. Тесты с несколькими
+        p-значениями разделены: `'serial/1'`, `'random_excursions/-4'`,
+        `'non_overlapping_templates/001'` и т.п.
+    :rtype: dict[str, tuple[int, float, float, bool]]
+    """
+    gen = as_generator(gen)
+    workers = workers or os.cpu_count() or 1
+    chunk = max(1, -(-sequences//(4*workers)))
+    counts = [min(chunk, sequences - start) for start in range(0, sequences, chunk)]
+    if workers == 1:
+        results = [_sequences_pvalues(_draw(gen, count, num), count, num) for count in counts]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(_sequences_pvalues, _draw(gen, count, num), count, num) for count in counts]
+            results = [future.result() for future in futures]
+    pvalues = {}
+    for res in (res for part in results for res in part):
+        for name, p in _flatten(res):
+            pvalues.setdefault(name, []).append(p)
+    return {name: second_level(values, alpha) for name, values in pvalues.items()}
+
+def _draw(gen, count: int, num: int):
+    """
+    Источник `count` последовательностей для обработчика: сохраненное состояние
+    генератора (генератор пропускает участок) или упакованные биты участка.
+    """
+    try:
+        state = gen.getstate()
+    except TypeError:
+        return BitStream.from_generator(gen, 32*count*num).packed.tobytes()
+    #участок из целых чисел генератора без остатка бит (state[-1]) пропускается прыжком
+    if not state[-1] and 32*count*num % gen.bits == 0:
+        gen.skip(32*count*num//gen.bits)
+        return state
+    words = np.empty(min(count*num, BLOCK_WORDS), dtype=np.uint32)
+    for start in range(0, count*num, BLOCK_WORDS):
+        gen.fill_u32(words[:min(BLOCK_WORDS, count*num - start)])
+    return state
+
+def _sequences_pvalues(source, count: int, num: int):
+    """
+    p-значения тестов для `count` последовательностей участка (функция выполняется
+    в процессе-обработчике `nist_protocol`).
+    """
+    if isinstance(source, tuple):
+        gen = from_state(source)
+        return [nist_pvalues(BitStream.from_generator(gen, 32*num)) for _ in range(count)]
+    bits = BitStream(source, 32*count*num)
+    return [nist_pvalues(bits.slice(32*i*num, 32*(i + 1)*num)) for i in range(count)]
+
+def _flatten(res):
+    """
+    Пары (имя теста, p-значение) с разделением тестов с несколькими p-значениями.
+    """
+    for name, p in res.items():
+        if isinstance(p, dict):
+            yield from ((f"{name}/{key}", value) for key, value in p.items())
+        elif isinstance(p, tuple):
+            yield from ((f"{name}/{i}", value) for i, value in enumerate(p, 1))
+        else:
+            yield name, p
+
+def second_level(pvalues, alpha: float = 0.01):
+    """
+    Доля прошедших последовательностей и равномерность p-значений одного теста.
+
+    :param pvalues: p-значения теста для всех последовательностей.
+    :type pvalues: list[float]
+    :param alpha: Уровень значимости тестов одной последовательности.
+    :type alpha: float
+    :return: Кортеж (число последовательностей, доля прошедших, p-значение
+        равномерности, пройден ли тест).
+    :rtype: tuple[int, float, float, bool]
+    """
+    pvalues = np.asarray(pvalues, dtype=np.float64)
+    m = len(pvalues)
+    proportion = float(np.mean(pvalues >= alpha))
+    expected = 1 - alpha
+    #нижняя граница доверительного интервала, как в NIST STS: лишние прошедшие тесты не считаются ошибкой
+    low = expected - 3*sqrt(expected*alpha/m)
+    bins = np.bincount(np.minimum((pvalues*10).astype(np.int64), 9), minlength=10)
+    chi2 = float(np.sum((bins - m/10)**2/(m/10)))
+    uniformity = igamc(9/2, chi2/2)
+    return m, proportion, uniformity, proportion >= low and uniformity >= UNIFORMITY_ALPHA
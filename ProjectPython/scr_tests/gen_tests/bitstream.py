@@ -0,0 +1,392 @@
+"""
+Битовый поток для статистических тестов.
+
+Последовательность хранится упакованной: 8 бит в байте, первым идет старший бит
+байта (порядок `np.packbits`/`np.unpackbits`). Числа генератора переводятся в биты
+блоками слов фиксированной ширины, поэтому ведущие нули каждого слова сохраняются,
+а последовательность из 10^8 бит занимает около 12.5 МБ.
+
+Статистики тестов считаются прямо по упакованному виду: количество единиц - по таблице
+`POPCOUNT`, смены значения соседних бит - через XOR со сдвинутым на бит потоком,
+частоты m-битных шаблонов - по скользящим кодам и `np.bincount`. Длинные потоки
+обрабатываются участками по `CHUNK_BITS` бит, так что дополнительная память
+не зависит от длины последовательности.
+"""
+import numpy as np
+from gens.protocol import as_generator, words_to_bits
+
+#сколько 32-битных слов запрашивается у генератора за один раз
+BLOCK_WORDS = 1 << 20
+#количество единиц в каждом значении байта
+POPCOUNT = np.array([bin(i).count('1') for i in range(256)], dtype=np.uint8)
+#длина участка потока, обрабатываемого за одну векторную операцию
+CHUNK_BITS = 1 << 22
+#наибольшая длина шаблона для codes/pattern_counts (окно из 4 байт)
+MAX_PATTERN = 25
+
+class BitStream():
+    """
+    Упакованная последовательность бит.
+
+    Атрибуты:
+        packed (np.ndarray): Массив uint8, 8 бит в байте; лишние биты последнего байта равны нулю.
+        n (int): Длина последовательности в битах.
+
+    Методы:
+        from_words(words, width):
+            Поток из младших `width` бит каждого числа.
+        from_bytes(data, n):
+            Поток из первых `n` бит байтовой строки.
+        from_generator(gen, n):
+            Поток из первых `n` бит генератора.
+        from_bits(bits):
+            Упаковывает массив или список нулей и единиц.
+        concatenate(streams):
+            Поток из нескольких потоков, записанных подряд.
+        slice(start, stop):
+            Поток из бит участка `[start, stop)`.
+        unpack(start, stop):
+            Биты участка `[start, stop)` по одному в байте.
+        count_ones():
+            Количество единиц.
+        transitions():
+            Количество смен значения между соседними битами.
+        block_ones(M):
+            Количество единиц в каждом из `n // M` блоков длины `M`.
+        longest_runs(M):
+            Длина самой длинной серии единиц в каждом из `n // M` блоков.
+        words(width, count, first):
+            Значения последовательных непересекающихся блоков по `width` бит.
+        codes(m, start, stop):
+            Коды m-битных окон, начинающихся в позициях `[start, stop)`.
+        pattern_counts(m, wrap):
+            Частоты всех m-битных шаблонов в перекрывающихся окнах.
+    """
+    def __init__(self, packed, n: int = None):
+        """
+        :param packed: Упакованные биты (массив uint8, bytes или bytearray).
+        :param n: Длина в битах; по умолчанию `8*len(packed)`.
+        """
+        if isinstance(packed, (bytes, bytearray)):
+            packed = np.frombuffer(packed, dtype=np.uint8)
+        packed = np.asarray(packed, dtype=np.uint8)
+        if n is None:
+            n = 8*len(packed)
+        if not 0 <= n <= 8*len(packed):
+            raise ValueError("n does not match the packed data")
+        self.packed = packed[:-(-n//8)]
+        self.n = n
+        if n % 8:
+            self.packed = self.packed.copy()
+            self.packed[-1] &= 0xFF << (8 - n % 8) & 0xFF
+
+    @classmethod
+    def from_words(cls, words, width: int = 32):
+        """
+        Строит поток из младших `width` бит каждого числа, начиная со старшего.
+
+        :param words: Массив чисел.
+        :type words: np.ndarray | list[int]
+        :param width: Ширина слова в битах (1-64).
+        :type width: int
+        :rtype: BitStream
+        """
+        words = np.asarray(words)
+        if width in (8, 16, 32, 64) and words.dtype != object:
+            #для байтовых ширин упакованный поток - сами слова в порядке big-endian
+            data = np.ascontiguousarray(words & (2**width - 1), dtype=f'>u{width//8}').view(np.uint8)
+            return cls(data, width*len(words))
+        return cls(np.packbits(words_to_bits(words, width)), width*len(words))
+
+    @classmethod
+    def from_bytes(cls, data, n: int = None):
+        """
+        Строит поток из первых `n` бит байтовой строки (старший бит байта первый).
+
+        :param data: Байты.
+        :type data: bytes
+        :param n: Длина в битах; по умолчанию все биты.
+        :type n: int
+        :rtype: BitStream
+        """
+        return cls(data, n)
+
+    @classmethod
+    def from_generator(cls, gen, n: int):
+        """
+        Строит поток из первых `n` бит генератора: 32-битные слова `fill_u32`
+        запрашиваются блоками по `BLOCK_WORDS` и записываются сразу в упакованный массив.
+
+        :param gen: Генератор пакета gens или любой итератор 32-битных чисел.
+        :param n: Длина в битах.
+        :type n: int
+        :rtype: BitStream
+        """
+        gen = as_generator(gen)
+        count = -(-n//32)
+        words = np.empty(count, dtype=np.uint32)
+        for start in range(0, count, BLOCK_WORDS):
+            gen.fill_u32(words[start:start+BLOCK_WORDS])
+        return cls(words.astype('>u4').view(np.uint8), n)
+
+    @classmethod
+    def from_bits(cls, bits):
+        """
+        Упаковывает последовательность нулей и единиц.
+
+        :param bits: Массив или список бит.
+        :type bits: np.ndarray | list[int]
+        :rtype: BitStream
+        """
+        bits = np.asarray(bits, dtype=np.uint8)
+        return cls(np.packbits(bits), len(bits))
+
+    @classmethod
+    def concatenate(cls, streams):
+        """
+        Записывает потоки подряд. Поток, начинающийся не с границы байта,
+        сдвигается по упакованным байтам, без распаковки бит.
+
+        :param streams: Потоки.
+        :type streams: list[BitStream]
+        :rtype: BitStream
+        """
+        n = sum(len(stream) for stream in streams)
+        out = np.zeros(-(-n//8) + 1, dtype=np.uint8)
+        pos = 0
+        for stream in streams:
+            first, shift = pos//8, pos % 8
+            size = len(stream.packed)
+            #лишние биты последнего байта равны нулю, поэтому байты можно объединять по ИЛИ
+            out[first:first + size] |= stream.packed >> shift
+            if shift:
+                out[first + 1:first + size + 1] |= stream.packed << (8 - shift)
+            pos += stream.n
+        return cls(out, n)
+
+    def __len__(self):
+        return self.n
+
+    def slice(self, start: int, stop: int = None):
+        """
+        Поток из бит участка `[start, stop)`; при начале не с границы байта
+        упакованные байты сдвигаются на `start % 8` бит.
+
+        :param start: Номер первого бита.
+        :type start: int
+        :param stop: Номер бита после последнего; по умолчанию конец потока.
+        :type stop: int
+        :rtype: BitStream
+        """
+        stop = self.n if stop is None else min(stop, self.n)
+        if start >= stop:
+            return BitStream(np.zeros(0, dtype=np.uint8), 0)
+        data = self.packed[start//8:-(-stop//8)]
+        shift = start % 8
+        if shift:
+            data = data << shift | np.append(data[1:], np.uint8(0)) >> (8 - shift)
+        return BitStream(data, stop - start)
+
+    def unpack(self, start: int = 0, stop: int = None):
+        """
+        Возвращает биты участка `[start, stop)` по одному в байте.
+
+        :param start: Номер первого бита.
+        :type start: int
+        :param stop: Номер бита после последнего; по умолчанию конец потока.
+        :type stop: int
+        :return: Массив uint8 из нулей и единиц.
+        :rtype: np.ndarray
+        """
+        stop = self.n if stop is None else min(stop, self.n)
+        if start >= stop:
+            return np.zeros(0, dtype=np.uint8)
+        first = start//8
+        bits = np.unpackbits(self.packed[first:-(-stop//8)])
+        return bits[start - 8*first:stop - 8*first]
+
+    def count_ones(self):
+        """
+        Количество единиц в потоке.
+
+        :rtype: int
+        """
+        return int(POPCOUNT[self.packed].sum(dtype=np.int64))
+
+    def transitions(self):
+        """
+        Количество позиций `i < n - 1`, в которых `b[i] != b[i+1]`: единицы в
+        `x XOR (x << 1)` по 64-битным словам потока.
+
+        :rtype: int
+        """
+        if self.n < 2:
+            return 0
+        size = -(-len(self.packed)//8)*8
+        padded = np.zeros(size, dtype=np.uint8)
+        padded[:len(self.packed)] = self.packed
+        words = padded.view('>u8').astype(np.uint64)
+        carry = np.zeros_like(words)
+        carry[:-1] = words[1:] >> np.uint64(63)
+        diff = words ^ (words << np.uint64(1) | carry)
+        #последний бит сравнивается с нулевым дополнением - его вклад вычитается
+        last = int(self.packed[(self.n - 1)//8] >> (7 - (self.n - 1) % 8) & 1)
+        return int(POPCOUNT[diff.view(np.uint8)].sum(dtype=np.int64)) - last
+
+    def block_ones(self, M: int):
+        """
+        Количество единиц в каждом из `n // M` непересекающихся блоков длины `M`
+        (неполный последний блок отбрасывается).
+
+        :param M: Длина блока в битах.
+        :type M: int
+        :return: Массив int64 длины `n // M`.
+        :rtype: np.ndarray
+        """
+        N = self.n//M
+        if M % 8 == 0:
+            return POPCOUNT[self.packed[:N*M//8]].reshape(N, M//8).sum(axis=1, dtype=np.int64)
+        out = np.empty(N, dtype=np.int64)
+        step = max(1, CHUNK_BITS//M)
+        for first in range(0, N, step):
+            last = min(N, first + step)
+            out[first:last] = self.unpack(first*M, last*M).reshape(-1, M).sum(axis=1, dtype=np.int64)
+        return out
+
+    def longest_runs(self, M: int):
+        """
+        Длина самой длинной серии единиц в каждом из `n // M` блоков длины `M`.
+        Блоки дополняются нулем с обеих сторон, так что начала и концы серий -
+        позиции перепадов `0 -> 1` и `1 -> 0`.
+
+        :param M: Длина блока в битах.
+        :type M: int
+        :return: Массив int64 длины `n // M`.
+        :rtype: np.ndarray
+        """
+        N = self.n//M
+        out = np.zeros(N, dtype=np.int64)
+        step = max(1, CHUNK_BITS//M)
+        for first in range(0, N, step):
+            last = min(N, first + step)
+            rows = np.zeros((last - first, M + 2), dtype=np.int8)
+            rows[:, 1:-1] = self.unpack(first*M, last*M).reshape(-1, M)
+            edges = np.diff(rows.ravel())
+            starts = np.flatnonzero(edges == 1)
+            ends = np.flatnonzero(edges == -1)
+            np.maximum.at(out, first + starts//(M + 2), ends - starts)
+        return out
+
+    def words(self, width: int, count: int = None, first: int = 0):
+        """
+        Значения `count` непересекающихся блоков по `width` бит, начиная с блока
+        номер `first` (первый бит блока - старший). Для ширины 8, 16, 32 и 64 блоки
+        читаются прямо из упакованного массива.
+
+        :param width: Ширина блока (1-64).
+        :type width: int
+        :param count: Количество блоков; по умолчанию все оставшиеся.
+        :type count: int
+        :param first: Номер первого блока.
+        :type first: int
+        :return: Массив uint64.
+        :rtype: np.ndarray
+        """
+        if not 0 < width <= 64:
+            raise ValueError("width must be between 1 and 64")
+        count = self.n//width - first if count is None else count
+        if (first + count)*width > self.n:
+            raise ValueError("not enough bits")
+        if width in (8, 16, 32, 64):
+            step = width//8
+            return self.packed[first*step:(first + count)*step].view(f'>u{step}').astype(np.uint64)
+        out = np.empty(count, dtype=np.uint64)
+        weights = np.uint64(1) << np.arange(width - 1, -1, -1, dtype=np.uint64)
+        step = max(1, CHUNK_BITS//width)
+        for start in range(0, count, step):
+            stop = min(count, start + step)
+            bits = self.unpack((first + start)*width, (first + stop)*width).reshape(-1, width).astype(np.uint64)
+            out[start:stop] = (bits*weights).sum(axis=1, dtype=np.uint64)
+        return out
+
+    def codes(self, m: int, start: int = 0, stop: int = None):
+        """
+        Коды m-битных окон `b[p] .. b[p+m-1]` (первый бит - старший) для позиций
+        `p` из `[start, stop)`. Из каждых 4 байт, начинающихся с байта `j`, собирается
+        32-битное слово; окна восьми позиций `8j .. 8j+7` - его сдвиги на `32 - m - r`.
+
+        :param m: Длина окна (1-25).
+        :type m: int
+        :param start: Первая позиция.
+        :type start: int
+        :param stop: Позиция после последней; по умолчанию `n - m + 1`.
+        :type stop: int
+        :return: Массив uint32 кодов.
+        :rtype: np.ndarray
+        """
+        if not 0 < m <= MAX_PATTERN:
+            raise ValueError(f"m must be between 1 and {MAX_PATTERN}")
+        stop = self.n - m + 1 if stop is None else stop
+        if stop <= start:
+            return np.zeros(0, dtype=np.uint32)
+        if stop + m - 1 > self.n:
+            raise ValueError("windows must lie inside the stream")
+        first = start//8
+        size = (stop - 1)//8 - first + 1
+        window = np.zeros(size + 3, dtype=np.uint32)
+        chunk = self.packed[first:first + size + 3]
+        window[:len(chunk)] = chunk
+        word = window[:size] << 24 | window[1:size+1] << 16 | window[2:size+2] << 8 | window[3:size+3]
+        #окна, начинающиеся с r-го бита байта, - один сдвиг слова на 32 - m - r
+        out = np.empty((size, 8), dtype=np.uint32)
+        mask = np.uint32((1 << m) - 1)
+        for r in range(8):
+            out[:, r] = word >> np.uint32(32 - m - r) & mask
+        return out.ravel()[start - 8*first:stop - 8*first]
+
+    def pattern_counts(self, m: int, wrap: bool = False):
+        """
+        Частоты всех m-битных шаблонов среди перекрывающихся окон потока.
+
+        :param m: Длина шаблона (1-25).
+        :type m: int
+        :param wrap: Продолжить поток его первыми `m - 1` битами (циклические окна,
+            всего `n` окон), как в сериальном тесте и тесте приближенной энтропии NIST.
+        :type wrap: bool
+        :return: Массив int64 длины `2^m`: элемент `c` - число окон с кодом `c`.
+        :rtype: np.ndarray
+        """
+        stream = self
+        if wrap and m > 1:
+            whole = self.n//8
+            tail = np.concatenate([self.unpack(8*whole, self.n), self.unpack(0, m - 1)])
+            stream = BitStream(np.concatenate([self.packed[:whole], np.packbits(tail)]), self.n + m - 1)
+        counts = np.zeros(1 << m, dtype=np.int64)
+        total = stream.n - m + 1
+        for start in range(0, max(total, 0), CHUNK_BITS):
+            codes = stream.codes(m, start, min(total, start + CHUNK_BITS))
+            counts += np.bincount(codes, minlength=1 << m)
+        return counts
+
+def as_stream(bits):
+    """
+    Приводит последовательность бит к упакованному виду.
+
+    :param bits: BitStream, массив или список из нулей и единиц.
+    :rtype: BitStream
+    """
+    if isinstance(bits, BitStream):
+        return bits
+    return BitStream.from_bits(bits)
+
+def as_bits(bits):
+    """
+    Приводит последовательность бит к массиву NumPy по одному биту в элементе.
+
+    :param bits: BitStream, массив или список из нулей и единиц.
+    :return: Массив int8 из нулей и единиц.
+    :rtype: np.ndarray
+    """
+    if isinstance(bits, BitStream):
+        return bits.unpack().view(np.int8)
+    return np.asarray(bits, dtype=np.int8)
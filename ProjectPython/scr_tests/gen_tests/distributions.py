@@ -0,0 +1,50 @@
+"""
+Функции распределений для вычисления p-значений тестов.
+
+Нормальное распределение вычисляется через `math.erfc` и не требует SciPy.
+SciPy импортируется только при первом вызове функций, которым он нужен;
+если SciPy не установлен, вызов завершается ошибкой ImportError с пояснением.
+"""
+from math import erfc, sqrt
+
+def norm_cdf(x: float):
+    """
+    Функция стандартного нормального распределения `Φ(x)`.
+
+    :param x: Аргумент.
+    :type x: float
+    :return: `Φ(x) = erfc(-x/√2)/2`.
+    :rtype: float
+    """
+    return 0.5*erfc(-float(x)/sqrt(2))
+
+def _scipy(module: str):
+    """
+    Импортирует подмодуль SciPy по требованию.
+    """
+    try:
+        return __import__(f"scipy.{module}", fromlist=[module])
+    except ImportError as error:
+        raise ImportError(f"this test requires SciPy (scipy.{module}); install scipy to run it") from error
+
+def chisquare(counts):
+    """
+    Критерий хи-квадрат Пирсона для равных ожидаемых частот (`scipy.stats.chisquare`).
+
+    :param counts: Наблюдаемые частоты.
+    :return: Результат `scipy.stats.chisquare` с атрибутом `pvalue`.
+    """
+    return _scipy("stats").chisquare(counts)
+
+def igamc(a: float, x: float):
+    """
+    Верхняя регуляризованная неполная гамма-функция `Q(a, x)` (`scipy.special.gammaincc`),
+    через которую NIST SP 800-22 выражает p-значения критериев хи-квадрат.
+
+    :param a: Параметр `a > 0`.
+    :type a: float
+    :param x: Аргумент `x >= 0`.
+    :type x: float
+    :rtype: float
+    """
+    return float(_scipy("special").gammaincc(a, x))
\ No newline at end of file
@@ -0,0 +1,100 @@
+"""
+Ранг двоичных матриц над GF(2) для тестов ранга NIST и Diehard.
+
+Строка матрицы хранится одним числом uint64 (столбец `j` - бит `j`), матрицы
+обрабатываются пачками: исключение Гаусса выполняется одновременно для всех
+матриц пачки, по одному векторному шагу на столбец.
+"""
+import numpy as np
+
+#сколько матриц обрабатывается одной векторной операцией
+RANK_BATCH = 8192
+
+def gf2_rank(rows, cols: int = 64):
+    """
+    Ранги пачки двоичных матриц над GF(2).
+
+    :param rows: Массив формы `(B, M)`: `B` матриц по `M` строк, строка - число
+        из `cols` младших бит.
+    :type rows: np.ndarray
+    :param cols: Количество столбцов (не больше 64).
+    :type cols: int
+    :return: Массив int64 из `B` рангов.
+    :rtype: np.ndarray
+    """
+    rows = np.array(rows, dtype=np.uint64)
+    if rows.ndim != 2:
+        raise ValueError("rows must have shape (matrices, rows)")
+    B, M = rows.shape
+    ranks = np.zeros(B, dtype=np.int64)
+    for first in range(0, B, RANK_BATCH):
+        ranks[first:first + RANK_BATCH] = _rank_batch(rows[first:first + RANK_BATCH], cols)
+    return ranks
+
+def _rank_batch(rows, cols: int):
+    """
+    Исключение Гаусса-Жордана для пачки матриц: в каждом столбце опорной становится
+    первая еще не использованная строка с единицей, и она вычитается (XOR)
+    из всех остальных строк с единицей в этом столбце.
+    """
+    B, M = rows.shape
+    index = np.arange(B)
+    used = np.zeros((B, M), dtype=bool)
+    rank = np.zeros(B, dtype=np.int64)
+    for col in range(cols):
+        bit = np.uint64(1) << np.uint64(col)
+        has = (rows & bit) != 0
+        candidates = has & ~used
+        found = candidates.any(axis=1)
+        if not found.any():
+            continue
+        pivot_row = candidates.argmax(axis=1)
+        pivot = rows[index, pivot_row]
+        has[index, pivot_row] = False
+        has &= found[:, None]
+        rows ^= np.where(has, pivot[:, None], np.uint64(0))
+        used[index[found], pivot_row[found]] = True
+        rank += found
+    return rank
+
+def rank_probabilities(m: int, q: int):
+    """
+    Распределение ранга случайной двоичной матрицы `m x q` над GF(2):
+    `P(r) = 2^(r(q+m-r) - mq) * Π_{i<r} (1 - 2^(i-q))(1 - 2^(i-m)) / (1 - 2^(i-r))`.
+
+    :param m: Количество строк.
+    :type m: int
+    :param q: Количество столбцов.
+    :type q: int
+    :return: Массив вероятностей рангов `0..min(m, q)`.
+    :rtype: np.ndarray
+    """
+    probs = []
+    for r in range(min(m, q) + 1):
+        p = 2.0**(r*(q + m - r) - m*q)
+        for i in range(r):
+            p *= (1 - 2.0**(i - q))*(1 - 2.0**(i - m))/(1 - 2.0**(i - r))
+        probs.append(p)
+    return np.array(probs)
+
+def rank_classes(ranks, m: int, q: int, low: int):
+    """
+    Наблюдаемые и ожидаемые частоты рангов с объединением всех рангов `<= low`
+    в один класс.
+
+    :param ranks: Ранги матриц.
+    :type ranks: np.ndarray
+    :param m: Количество строк.
+    :type m: int
+    :param q: Количество столбцов.
+    :type q: int
+    :param low: Наибольший ранг объединенного класса.
+    :type low: int
+    :return: Пара массивов (наблюдаемые частоты, ожидаемые частоты) для классов
+        `<= low, low + 1, ..., min(m, q)`.
+    :rtype: tuple[np.ndarray, np.ndarray]
+    """
+    probs = rank_probabilities(m, q)
+    expected = len(ranks)*np.concatenate([[probs[:low + 1].sum()], probs[low + 1:]])
+    observed = np.bincount(np.clip(np.asarray(ranks) - low, 0, None), minlength=len(probs) - low)
+    return observed, expected
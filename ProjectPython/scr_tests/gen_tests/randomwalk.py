@@ -0,0 +1,174 @@
+"""
+Случайное блуждание битовой последовательности для тестов NIST SP 800-22
+(кумулятивных сумм и случайных отклонений).
+
+Биты переводятся в шаги `±1`, частичные суммы `S_k` считаются `np.cumsum` в int32
+участками по `CHUNK_BITS` бит с переносом текущего уровня. Нули блуждания
+(`np.flatnonzero`) делят его на циклы, а посещения каждого состояния по циклам
+считаются `np.add.reduceat`; незавершенный цикл переносится в следующий участок.
+Все статистики получаются за один проход по последовательности.
+
+Блуждание по части последовательности можно объединить с блужданием по следующей
+части (`merge`), если та вычислена от известного начального уровня: посещения
+до первого нуля части и после ее последнего нуля хранятся отдельно и при
+объединении образуют общий цикл.
+"""
+import numpy as np
+from gen_tests.bitstream import CHUNK_BITS, as_stream
+
+#число посещений, начиная с которого циклы объединяются в один класс
+VISIT_CLASSES = 5
+
+class RandomWalk():
+    """
+    Статистики случайного блуждания `S_k = X_1 + ... + X_k`, `X_i = 2ε_i - 1`.
+
+    Атрибуты:
+        n (int): Длина последовательности.
+        level (int): Начальный уровень блуждания (0 для начала последовательности).
+        final (int): Конечное значение `S_n`.
+        high (int): Наибольшее значение `S_k` (с учетом начального уровня).
+        low (int): Наименьшее значение `S_k` (с учетом начального уровня).
+        states (int): Наибольшее учитываемое состояние по модулю.
+        visits (dict[int, int]): Общее число посещений `ξ(x)` каждого состояния
+            `x = ±1, ..., ±states`.
+
+    Свойства (для блуждания от начала последовательности):
+        forward (int): Наибольшее отклонение `max |S_k|` (прямые суммы).
+        backward (int): Наибольшее отклонение сумм, накопленных с конца
+            последовательности: `max |S_n - S_k|`, `0 <= k < n`.
+        cycles (int): Количество циклов `J` (участков между нулями блуждания,
+            дополненного нулем в начале и в конце).
+        classes (dict[int, np.ndarray]): Для каждого состояния - количество циклов,
+            в которых оно посещено `0, 1, ..., 4` и не менее 5 раз.
+
+    Методы:
+        __init__(bits, states=9, level=0):
+            Вычисляет статистики за один проход.
+        merge(other):
+            Добавляет статистики блуждания по следующей части последовательности.
+    """
+
+    def __init__(self, bits, states: int = 9, level: int = 0):
+        """
+        Вычисляет статистики блуждания.
+
+        :param bits: Последовательность битов.
+        :type bits: BitStream | np.ndarray | list[int]
+        :param states: Наибольшее учитываемое состояние по модулю (9 для
+            вариантного теста случайных отклонений).
+        :type states: int
+        :param level: Уровень блуждания перед первым битом: `2·(число единиц) - (число бит)`
+            предшествующей части последовательности.
+        :type level: int
+        """
+        bits = as_stream(bits)
+        labels = [x for x in range(-states, states + 1) if x]
+        self.n = len(bits)
+        self.level = self.final = self.high = self.low = level
+        self.states = states
+        self.visits = dict.fromkeys(labels, 0)
+        #посещения до первого нуля, циклы между нулями и посещения после последнего нуля
+        self._zero = False
+        self._lead = dict.fromkeys(labels, 0)
+        self._closed = 0
+        self._classes = {x: np.zeros(VISIT_CLASSES + 1, dtype=np.int64) for x in labels}
+        self._pending = dict.fromkeys(labels, 0)
+        for start in range(0, len(bits), CHUNK_BITS):
+            walk = np.cumsum(bits.unpack(start, min(len(bits), start + CHUNK_BITS)).astype(np.int32)*2 - 1, dtype=np.int32)
+            walk += self.final
+            self.final = int(walk[-1])
+            chunk_high, chunk_low = int(walk.max()), int(walk.min())
+            self.high, self.low = max(self.high, chunk_high), min(self.low, chunk_low)
+            zeros = np.flatnonzero(walk == 0)
+            #участок i заканчивается i-м нулем, последний (без нуля) переходит дальше
+            starts = np.concatenate([[0], zeros + 1])
+            if starts[-1] == len(walk):
+                starts = starts[:-1]
+            for x in labels:
+                if chunk_low <= x <= chunk_high:
+                    counts = np.add.reduceat(walk == x, starts, dtype=np.int64)
+                else:
+                    counts = np.zeros(len(starts), dtype=np.int64)
+                self.visits[x] += int(counts.sum())
+                self._add_open(x, int(counts[0]))
+                if not len(zeros):
+                    continue
+                #первый участок завершил открытый цикл (или начало блуждания)
+                if self._zero:
+                    self._classes[x][min(self._pending[x], VISIT_CLASSES)] += 1
+                self._classes[x] += np.bincount(np.minimum(counts[1:len(zeros)], VISIT_CLASSES), minlength=VISIT_CLASSES + 1)
+                self._pending[x] = int(counts[len(zeros)]) if len(counts) > len(zeros) else 0
+            if len(zeros):
+                self._closed += len(zeros) - 1 + self._zero
+                self._zero = True
+
+    def _add_open(self, x, count):
+        """
+        Добавляет посещения состояния `x` к незавершенному циклу (или к началу
+        блуждания до первого нуля).
+        """
+        if self._zero:
+            self._pending[x] += count
+        else:
+            self._lead[x] += count
+
+    def merge(self, other):
+        """
+        Добавляет статистики блуждания по части последовательности, следующей
+        сразу за этой.
+
+        :param other: Блуждание, вычисленное от уровня `self.final`.
+        :type other: RandomWalk
+        """
+        if other.level != self.final or other.states != self.states:
+            raise ValueError("walks must be consecutive (other.level == self.final)")
+        for x in self.visits:
+            self.visits[x] += other.visits[x]
+            self._add_open(x, other._lead[x])
+            if not other._zero:
+                continue
+            if self._zero:
+                self._classes[x][min(self._pending[x], VISIT_CLASSES)] += 1
+            self._classes[x] += other._classes[x]
+            self._pending[x] = other._pending[x]
+        if other._zero:
+            self._closed += other._closed + self._zero
+            self._zero = True
+        self.n += other.n
+        self.final = other.final
+        self.high, self.low = max(self.high, other.high), min(self.low, other.low)
+
+    @property
+    def forward(self):
+        return max(self.high, -self.low)
+
+    @property
+    def backward(self):
+        return max(self.final - min(self.low, 0), max(self.high, 0) - self.final)
+
+    @property
+    def cycles(self):
+        #цикл от начала до первого нуля и незавершенный цикл в конце
+        return self._closed + self._zero + (self.final != 0)
+
+    @property
+    def classes(self):
+        out = {x: counts.copy() for x, counts in self._classes.items()}
+        for x in out:
+            if self._zero:
+                out[x][min(self._lead[x], VISIT_CLASSES)] += 1
+            if self.final != 0:
+                out[x][min(self._pending[x] if self._zero else self._lead[x], VISIT_CLASSES)] += 1
+        return out
+
+def as_walk(bits):
+    """
+    Приводит последовательность бит к статистикам случайного блуждания.
+
+    :param bits: RandomWalk, BitStream, массив или список из нулей и единиц.
+    :rtype: RandomWalk
+    """
+    if isinstance(bits, RandomWalk):
+        return bits
+    return RandomWalk(bits)
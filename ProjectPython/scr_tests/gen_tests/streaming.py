@@ -0,0 +1,407 @@
+"""
+Потоковый набор тестов NIST SP 800-22 с ограниченной памятью.
+
+Последовательность обрабатывается участками. Для участка вычисляются накопители
+статистик тестов (число единиц, смены значений с граничными битами, частоты классов
+по блокам, гистограммы шаблонов, таблицы вхождений теста Маурера, случайное
+блуждание), и накопитель следующего участка присоединяется к накопленному (`merge`).
+p-значения вычисляются по накопителям в конце, поэтому память не зависит от длины
+последовательности, а к готовому результату можно дописать новые данные без
+повторного счета (накопитель можно сохранить `pickle`).
+
+Накопители блочных тестов хранят биты до первой и после последней границы блока
+своего участка, поэтому блоки при объединении совпадают с блоками всей
+последовательности. Параметры тестов, зависящие от длины последовательности
+(длина блока теста самой длинной серии, длина блока теста Маурера, длина шаблона
+теста приближенной энтропии, длины блоков теста непересекающихся шаблонов
+и спектрального теста), выбираются один раз по ожидаемой длине `total`.
+"""
+from functools import partial
+import numpy as np
+from gens.protocol import as_generator
+from gen_tests.bitstream import BitStream, as_stream
+from gen_tests.randomwalk import RandomWalk
+import gen_tests.testingNIST as nist
+
+#сколько бит запрашивается у генератора за один раз
+STREAM_CHUNK = 1 << 24
+#наибольшая длина блока теста непересекающихся шаблонов
+TEMPLATE_BLOCK = 1 << 20
+#наибольшая длина участка спектрального теста
+SPECTRAL_SEGMENT = 1 << 24
+
+class _Blocks():
+    """
+    Накопитель блочного теста: статистики полных блоков длины `block` (границы
+    блоков отсчитываются от начала всей последовательности) и биты неполных блоков
+    на краях участка. Наследники задают `_add` (статистики блоков участка)
+    и `_combine` (сложение статистик).
+    """
+
+    def __init__(self, block, bits, start):
+        self.block = block
+        self.start = start
+        self.n = len(bits)
+        #биты до первой границы блока и после последней
+        need = -start % block
+        self._head = bits.slice(0, need)
+        self._reached = len(bits) >= need
+        full = (len(bits) - need) // block * block if self._reached else 0
+        self._tail = bits.slice(need + full) if self._reached else bits.slice(len(bits))
+        if full:
+            self._add(bits.slice(need, need + full), start + need)
+
+    def merge(self, other):
+        """
+        Присоединяет накопитель участка, следующего сразу за этим.
+        """
+        if not self._reached:
+            self._head = BitStream.concatenate([self._head, other._head])
+            self._reached = other._reached
+            self._tail = other._tail
+            self._combine(other)
+        elif other._reached:
+            #конец этого участка и начало следующего - ровно один блок
+            fragment = BitStream.concatenate([self._tail, other._head])
+            if len(fragment):
+                self._add(fragment, self.start + self.n - len(self._tail))
+            self._combine(other)
+            self._tail = other._tail
+        else:
+            self._tail = BitStream.concatenate([self._tail, other._head])
+        self.n += other.n
+
+class _BlockCounts(_Blocks):
+    """
+    Накопитель блочного теста, статистика которого - сумма массивов `count(bits)`
+    по участкам из целых блоков.
+    """
+
+    def __init__(self, block, bits, start, count):
+        self._count = count
+        self.counts = None
+        super().__init__(block, bits, start)
+
+    def _add(self, bits, start):
+        self._add_counts(self._count(bits))
+
+    def _combine(self, other):
+        if other.counts is not None:
+            self._add_counts(other.counts)
+
+    def _add_counts(self, counts):
+        self.counts = counts if self.counts is None else self.counts + counts
+
+    def total(self):
+        """
+        Сумма статистик по всем полным блокам.
+        """
+        if self.counts is None:
+            raise ValueError("sequence is shorter than one block")
+        return self.counts
+
+class _Maurer(_Blocks):
+    """
+    Накопитель теста Маурера: номера первого и последнего вхождения каждого L-битного
+    блока в участке и сумма `log2` расстояний для блоков, предыдущее вхождение
+    которых лежит в том же участке. Расстояния до первых вхождений участка
+    досчитываются при объединении с предыдущим участком, а оставшиеся - в конце.
+    """
+
+    def __init__(self, L, bits, start):
+        self.Q = 10 * 2**L
+        self.first = np.zeros(1 << L, dtype=np.int64)
+        self.last = np.zeros(1 << L, dtype=np.int64)
+        self.total = 0.0
+        self.K = 0
+        super().__init__(L, bits, start)
+
+    def _add(self, bits, start):
+        L = self.block
+        total, codes, index = nist._maurer_distances(bits, L, start // L, self.last, self.Q)
+        self.first[codes] = index
+        self.total += total
+        self.K += max(0, start // L + len(bits) // L - max(self.Q, start // L))
+
+    def _combine(self, other):
+        resolved = (other.first > self.Q) & (self.last > 0)
+        self.total += other.total + float(np.log2(other.first[resolved] - self.last[resolved]).sum())
+        self.K += other.K
+        self.first = np.where(self.first > 0, self.first, other.first)
+        self.last = np.where(other.last > 0, other.last, self.last)
+
+    def pvalue(self):
+        """
+        p-значение для накопителя всей последовательности.
+        """
+        if self.K <= 0:
+            raise ValueError("sequence is too short for this L")
+        #у первых вхождений последовательности предыдущее вхождение - "нулевой" блок
+        late = self.first > self.Q
+        return nist._maurer_pvalue(self.total + float(np.log2(self.first[late]).sum()), self.K, self.block)
+
+class _Patterns():
+    """
+    Накопитель частот перекрывающихся m-битных шаблонов: окна внутри участка
+    и по `m - 1` бит с каждого края для окон на стыках и циклических окон.
+    """
+
+    def __init__(self, m, bits):
+        self.m = m
+        self.counts = bits.pattern_counts(m) if len(bits) >= m else np.zeros(1 << m, dtype=np.int64)
+        self._first = bits.slice(0, m - 1)
+        self._last = bits.slice(max(0, len(bits) - m + 1))
+
+    def _joined(self, head):
+        """
+        Частоты окон, начинающихся в последних битах участка и заканчивающихся в `head`.
+        """
+        fragment = BitStream.concatenate([self._last, head])
+        stop = min(len(self._last), len(fragment) - self.m + 1)
+        if stop <= 0:
+            return 0
+        return np.bincount(fragment.codes(self.m, 0, stop), minlength=1 << self.m)
+
+    def merge(self, other):
+        self.counts = self.counts + self._joined(other._first) + other.counts
+        self._first = BitStream.concatenate([self._first, other._first]).slice(0, self.m - 1)
+        joined = BitStream.concatenate([self._last, other._last])
+        self._last = joined.slice(max(0, len(joined) - self.m + 1))
+
+    def histogram(self):
+        """
+        Частоты циклических окон всей последовательности (как `pattern_counts(m, wrap=True)`).
+        """
+        return self.counts + self._joined(self._first)
+
+class _Bits():
+    """
+    Накопитель тестов частоты и серий: число единиц, число смен значения
+    и крайние биты участка.
+    """
+
+    def __init__(self, bits):
+        self.n = len(bits)
+        self.ones = bits.count_ones()
+        self.transitions = bits.transitions()
+        self._first = int(bits.unpack(0, 1).sum()) if len(bits) else None
+        self._last = int(bits.unpack(len(bits) - 1).sum()) if len(bits) else None
+
+    def merge(self, other):
+        if self.n and other.n:
+            self.transitions += self._last != other._first
+        self.transitions += other.transitions
+        self.ones += other.ones
+        self._first = self._first if self.n else other._first
+        self._last = other._last if other.n else self._last
+        self.n += other.n
+
+def _block_frequency_counts(bits, M):
+    """
+    Сумма `Σ(2·ones_i - M)²` и количество блоков длины `M`.
+    """
+    ones = bits.block_ones(M)
+    return np.array([int(np.sum((2 * ones - M)**2)), len(ones)])
+
+def _spectral_counts(bits, segment):
+    """
+    Суммарное число амплитуд ниже порога по участкам длины `segment` и их общая длина.
+    """
+    peaks = nist._spectral_peaks([bits.slice(i, i + segment) for i in range(0, len(bits), segment)])
+    return np.array([int(peaks.sum()), len(bits)])
+
+def _non_overlapping_counts(bits, block, codes):
+    """
+    Количество блоков и суммы `ΣW`, `ΣW²` чисел вхождений шаблонов `codes` в блоки.
+    """
+    N = len(bits) // block
+    W, _ = nist._template_counts(bits, 9, N, block, -1)
+    total, squares = nist._non_overlapping_sums(W[:, codes])
+    return np.concatenate([[N], total, squares])
+
+def _overlapping_counts(bits, block):
+    """
+    Частоты классов числа вхождений шаблона из девяти единиц в блоки.
+    """
+    _, V = nist._template_counts(bits, 9, 1, block, (1 << 9) - 1)
+    return nist._overlapping_counts(V)
+
+class NistStream():
+    """
+    Накопитель статистик набора тестов NIST (`nist_tests`) для потоковой проверки.
+
+    Атрибуты:
+        total (int): Ожидаемая длина последовательности; по ней выбираются параметры тестов.
+        start (int): Номер первого бита накопленного участка (0 - начало последовательности).
+        n (int): Количество накопленных бит.
+        walk (RandomWalk): Случайное блуждание накопленного участка.
+        longest_block (int): Длина блока теста самой длинной серии.
+        template_block (int): Длина блока теста непересекающихся шаблонов
+            (`total // 8`, но не больше `TEMPLATE_BLOCK`).
+        maurer_block (int): Длина блока `L` теста Маурера; `None`, если `total`
+            меньше `MAURER_MIN_BITS` и тест не выполняется.
+        entropy_block (int): Длина шаблона теста приближенной энтропии.
+        spectral_segment (int): Длина участка спектрального теста
+            (`total`, но не больше `SPECTRAL_SEGMENT`).
+
+    Методы:
+        update(bits):
+            Дописывает следующие биты последовательности.
+        extend(gen, n, chunk_bits):
+            Дописывает `n` бит генератора участками по `chunk_bits`.
+        merge(other):
+            Присоединяет накопитель участка, следующего сразу за этим.
+        pvalues():
+            p-значения тестов для накопленной последовательности.
+        score():
+            Средний процент успешности тестов, как у `nist_tests`.
+    """
+
+    def __init__(self, total: int, bits=None, start: int = 0, level: int = 0):
+        """
+        :param total: Ожидаемая длина всей последовательности.
+        :type total: int
+        :param bits: Биты участка; по умолчанию пустой участок.
+        :type bits: BitStream | np.ndarray | list[int]
+        :param start: Номер первого бита участка во всей последовательности.
+        :type start: int
+        :param level: Уровень случайного блуждания перед участком
+            (`2·(число единиц) - start`).
+        :type level: int
+        """
+        bits = as_stream([] if bits is None else bits)
+        self.total = total
+        self.start = start
+        self.n = len(bits)
+        self.longest_block = nist._longest_run_block(total)
+        self.template_block = max(1, min(total // 8, TEMPLATE_BLOCK))
+        self.maurer_block = nist._maurer_block(total)
+        self.entropy_block = nist._approximate_entropy_block(total)
+        self.spectral_segment = max(2, min(total, SPECTRAL_SEGMENT))
+        self._templates = nist.aperiodic_templates(9)
+        codes = [int(t, 2) for t in self._templates]
+        self._bits = _Bits(bits)
+        self._blocks = {
+            'block_frequency': _BlockCounts(128, bits, start, partial(_block_frequency_counts, M=128)),
+            'longest_run': _BlockCounts(self.longest_block, bits, start, partial(nist._longest_run_counts, M=self.longest_block)),
+            'rank': _BlockCounts(32 * 32, bits, start, partial(nist._rank_counts, M=32)),
+            'spectral': _BlockCounts(self.spectral_segment, bits, start, partial(_spectral_counts, segment=self.spectral_segment)),
+            'non_overlapping_templates': _BlockCounts(self.template_block, bits, start,
+                                                      partial(_non_overlapping_counts, block=self.template_block, codes=codes)),
+            'overlapping_template': _BlockCounts(1032, bits, start, partial(_overlapping_counts, block=1032)),
+            'linear_complexity': _BlockCounts(500, bits, start, partial(nist._linear_complexity_counts, M=500)),
+        }
+        self._maurer = _Maurer(self.maurer_block, bits, start) if self.maurer_block is not None else None
+        self._patterns = _Patterns(max(8, self.entropy_block + 1), bits)
+        self.walk = RandomWalk(bits, level=level)
+
+    def update(self, bits):
+        """
+        Дописывает следующие биты последовательности.
+
+        :param bits: Биты.
+        :type bits: BitStream | np.ndarray | list[int]
+        """
+        self.merge(NistStream(self.total, bits, self.start + self.n, self.walk.final))
+
+    def extend(self, gen, n: int, chunk_bits: int = STREAM_CHUNK):
+        """
+        Дописывает `n` бит генератора, запрашивая их участками по `chunk_bits` бит.
+
+        :param gen: Генератор пакета gens или любой итератор 32-битных чисел.
+        :param n: Количество бит.
+        :type n: int
+        :param chunk_bits: Длина участка (кратна 32, чтобы числа не разрывались).
+        :type chunk_bits: int
+        :return: Этот накопитель.
+        :rtype: NistStream
+        """
+        if chunk_bits <= 0 or chunk_bits % 32:
+            raise ValueError("chunk_bits must be a positive multiple of 32")
+        gen = as_generator(gen)
+        for done in range(0, n, chunk_bits):
+            self.update(BitStream.from_generator(gen, min(chunk_bits, n - done)))
+        return self
+
+    def merge(self, other):
+        """
+        Присоединяет накопитель участка, следующего сразу за этим.
+
+        :param other: Накопитель с той же ожидаемой длиной, `other.start == self.start + self.n`
+            и уровнем блуждания `self.walk.final`.
+        :type other: NistStream
+        """
+        if other.total != self.total or other.start != self.start + self.n:
+            raise ValueError("streams must be consecutive parts of one sequence")
+        self._bits.merge(other._bits)
+        for name, blocks in self._blocks.items():
+            blocks.merge(other._blocks[name])
+        if self._maurer is not None:
+            self._maurer.merge(other._maurer)
+        self._patterns.merge(other._patterns)
+        self.walk.merge(other.walk)
+        self.n += other.n
+
+    def pvalues(self):
+        """
+        p-значения тестов для накопленной последовательности. Тест Маурера
+        включается, только если `total` не меньше `MAURER_MIN_BITS`, тесты случайных
+        отклонений - если блуждание содержит достаточно циклов.
+
+        :return: Словарь {тест: p-значение}; для тестов с несколькими p-значениями -
+            кортеж или словарь.
+        :rtype: dict
+        """
+        if self.start:
+            raise ValueError("p-values need the whole sequence (start == 0)")
+        n = self.n
+        counts = {name: blocks.total() for name, blocks in self._blocks.items()}
+        ma = self.entropy_block
+        histograms = nist._shorter_histograms(self._patterns.histogram(), self._patterns.m - min(6, ma))
+        by_length = {len(h).bit_length() - 1: h for h in histograms}
+        templates = counts['non_overlapping_templates']
+        T = len(self._templates)
+        res = {
+            'frequency': nist._frequency_pvalue(self._bits.ones, n),
+            'block_frequency': nist._block_frequency_pvalue(counts['block_frequency'][0], counts['block_frequency'][1], 128),
+            'cumulative_sums': nist.cumulative_sum_test(self.walk),
+            'runs': nist._runs_pvalue(self._bits.ones, self._bits.transitions, n),
+            'longest_run': nist._chi2_pvalue(counts['longest_run'], nist.LONGEST_RUN[self.longest_block][1],
+                                             len(nist.LONGEST_RUN[self.longest_block][1]) - 1),
+            'rank': nist._rank_pvalue(counts['rank'], 32),
+            'spectral': nist._spectral_pvalue(counts['spectral'][0], counts['spectral'][1]),
+            'non_overlapping_templates': dict(zip(self._templates, nist._non_overlapping_pvalues(
+                templates[1:T + 1], templates[T + 1:], templates[0], self.template_block, 9).tolist())),
+            'overlapping_template': nist._overlapping_pvalue(counts['overlapping_template'], 9, 1032),
+            'linear_complexity': nist._chi2_pvalue(counts['linear_complexity'], nist.LINEAR_COMPLEXITY_PROBS, 6),
+            'serial': nist._serial_pvalues([by_length[8], by_length[7], by_length[6]], n, 8),
+            'approximate_entropy': nist._approximate_entropy_pvalue(by_length[ma + 1], by_length[ma], n, ma),
+        }
+        if self._maurer is not None:
+            res['universal'] = self._maurer.pvalue()
+        if nist.excursions_applicable(self.walk):
+            res['random_excursions'] = nist.random_excursions_test(self.walk)
+            res['random_excursions_variant'] = nist.random_excursions_variant_test(self.walk)
+        return res
+
+    def score(self):
+        """
+        Средний процент успешности тестов (см. `nist_score`).
+
+        :rtype: float
+        """
+        return nist.nist_score(self.pvalues())
+
+def nist_stream(gen, n: int, chunk_bits: int = STREAM_CHUNK):
+    """
+    Накапливает статистики тестов NIST по первым `n` битам генератора,
+    запрашивая их участками по `chunk_bits` бит.
+
+    :param gen: Генератор пакета gens или любой итератор 32-битных чисел.
+    :param n: Длина последовательности.
+    :type n: int
+    :param chunk_bits: Длина участка (кратна 32).
+    :type chunk_bits: int
+    :rtype: NistStream
+    """
+    return NistStream(n).extend(gen, n, chunk_bits)
@@ -1,5 +1,11 @@
+from math import ceil
 import numpy as np
-from scipy.stats import chisquare, norm
+from gen_tests.distributions import chisquare, igamc
+from gen_tests.gf2 import gf2_rank, rank_classes, rank_probabilities
+from gens.protocol import as_generator
+
+#наименьшая ожидаемая частота класса рангов для критерия хи-квадрат
+MIN_EXPECTED = 5
 
 def birthday_spacings(samples, n, m):
     """
@@ -105,20 +111,72 @@ def overlapping_sums(samples, k):
     sums = [np.sum(samples[i:i+k]) for i in range(len(samples) - k + 1)]
     return chisquare(sums).pvalue
 
+def rank_matrices_needed(rows, cols, low):
+    """
+    Наименьшее число матриц `rows x cols`, при котором ожидаемая частота каждого
+    класса рангов теста `binary_rank_test` не меньше `MIN_EXPECTED`
+    (946 матриц для 31x31 и 32x32, 530 для 6x8).
+
+    :param rows: Количество строк матрицы.
+    :type rows: int
+    :param cols: Количество столбцов (старших бит числа).
+    :type cols: int
+    :param low: Наибольший ранг объединенного класса.
+    :type low: int
+    :rtype: int
+    """
+    probs = rank_probabilities(rows, cols)
+    return ceil(MIN_EXPECTED / min(probs[:low + 1].sum(), probs[low + 1:].min()))
+
+def binary_rank_test(samples, rows, cols, low):
+    """
+    Тест ранга двоичных матриц: каждые `rows` последовательных 32-битных чисел образуют
+    матрицу `rows x cols` из старших `cols` бит чисел (31x31, 32x32 и 6x8 в Diehard).
+    Ранги над GF(2) с объединением рангов `<= low` в один класс сравниваются
+    с теоретическим распределением критерием хи-квадрат.
+
+    :param samples: Массив 32-битных образцов.
+    :type samples: list[int] | np.ndarray
+    :param rows: Количество строк матрицы.
+    :type rows: int
+    :param cols: Количество столбцов (старших бит числа).
+    :type cols: int
+    :param low: Наибольший ранг объединенного класса.
+    :type low: int
+    :return: p-значение теста хи-квадрат.
+    :rtype: float
+    :raises ValueError: Если матриц меньше `rank_matrices_needed(rows, cols, low)`.
+    """
+    count = len(samples) // rows
+    needed = rank_matrices_needed(rows, cols, low)
+    if count < needed:
+        raise ValueError(f"{count} matrices {rows}x{cols} are too few for the chi-square test, "
+                         f"at least {needed} ({needed * rows} samples) are needed")
+    words = np.asarray(samples[:count * rows], dtype=np.uint64) >> np.uint64(32 - cols)
+    ranks = gf2_rank(words.reshape(count, rows), cols)
+    observed, expected = rank_classes(ranks, rows, cols, low)
+    chi2 = float(np.sum((observed - expected)**2 / expected))
+    return igamc((len(observed) - 1) / 2, chi2 / 2)
+
+#тесты рангов Diehard: (строки, столбцы, наибольший ранг объединенного класса)
+RANK_TESTS = ((31, 31, 28), (32, 32, 29), (6, 8, 4))
+
 def diehard_tests(gen,num):
     """
     Выполняет серию тестов Diehard для проверки качества генератора псевдослучайных чисел.
 
-    :param gen: Генератор псевдослучайных чисел.
+    :param gen: Генератор псевдослучайных чисел (генератор пакета gens или любой итератор).
     :type gen: generator
-    :param num: Количество генерируемых чисел для тестов.
+    :param num: Количество генерируемых 32-битных чисел для тестов.
     :type num: int
-    :return: Средний процент успешности тестов.
-    :rtype: str
+    :return: Средний процент успешности тестов: среднее p-значений, умноженное на 100
+        и округленное до двух знаков. Тесты рангов 31x31, 32x32 и 6x8 выполняются,
+        только если `num` дает достаточно матриц (не меньше 29 326, 30 272 и 3180 чисел,
+        см. `rank_matrices_needed`); пропущенные тесты в среднее не входят.
+    :rtype: float
     """
-    posled = []
-    for i in range(num):
-        posled.append(next(gen))
+    words = as_generator(gen).fill_u32(np.empty(num, dtype=np.uint32))
+    posled = words.astype(np.int64)
     res = []
     res.append(birthday_spacings(posled,500,50))
     res.append(overlapping_permutations(posled,4))
@@ -127,4 +185,9 @@ def diehard_tests(gen,num):
     res.append(parking_lot_test(posled,100,10))
     res.append(minimum_distance_test(posled,100))
     res.append(overlapping_sums(posled,10))
-    return round((sum(res)/7)*100,2)
\ No newline at end of file
+    #тесты рангов применимы, только если матриц достаточно для критерия хи-квадрат,
+    #иначе в среднее они не входят
+    for rows, cols, low in RANK_TESTS:
+        if len(posled) // rows >= rank_matrices_needed(rows, cols, low):
+            res.append(binary_rank_test(posled, rows, cols, low))
+    return round((sum(res)/len(res))*100,2)
\ No newline at end of file
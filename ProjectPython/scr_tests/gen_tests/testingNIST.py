@@ -1,231 +1,870 @@
-from scipy.stats import norm
+"""
+Тесты NIST SP 800-22 для битовых последовательностей.
+
+Тесты принимают `BitStream` (упакованный поток), массив NumPy или список бит
+и считают статистики по упакованному виду (см. `gen_tests.bitstream`).
+"""
+from math import erfc, exp, lgamma, log, sqrt
 import numpy as np
+from gen_tests.bitstream import BitStream, CHUNK_BITS, POPCOUNT, as_bits, as_stream
+from gen_tests.distributions import igamc, norm_cdf
+from gen_tests.gf2 import gf2_rank, rank_probabilities
+from gen_tests.randomwalk import RandomWalk, as_walk
+
+#тест самой длинной серии единиц: длина блока M -> (наименьший класс v, вероятности классов)
+LONGEST_RUN = {
+    8: (1, (0.2148, 0.3672, 0.2305, 0.1875)),
+    128: (4, (0.1174, 0.2430, 0.2493, 0.1752, 0.1027, 0.1124)),
+    10000: (10, (0.0882, 0.2092, 0.2483, 0.1933, 0.1208, 0.0675, 0.0727)),
+}
+
+#тест перекрывающегося шаблона (M = 1032, m = 9): вероятности 0, 1, 2, 3, 4 и >= 5 вхождений
+OVERLAPPING_PROBS = (0.364091, 0.185659, 0.139381, 0.100571, 0.070432, 0.139865)
+
+#универсальный тест Маурера: ожидаемое значение и дисперсия статистики для L = 1..16
+MAURER_EXPECTED = (0, 0.7326495, 1.5374383, 2.4016068, 3.3112247, 4.2534266, 5.2177052, 6.1962507, 7.1836656,
+                   8.1764248, 9.1723243, 10.170032, 11.168765, 12.168070, 13.167693, 14.167488, 15.167379)
+MAURER_VARIANCE = (0, 0.690, 1.338, 1.901, 2.358, 2.705, 2.954, 3.125, 3.238,
+                   3.311, 3.356, 3.384, 3.401, 3.410, 3.416, 3.419, 3.421)
+
+#тест линейной сложности: вероятности классов T <= -2.5, (-2.5, -1.5], ..., T > 2.5
+LINEAR_COMPLEXITY_PROBS = (0.010417, 0.03125, 0.125, 0.5, 0.25, 0.0625, 0.020833)
+#сколько блоков обрабатывается алгоритмом Берлекэмпа-Мэсси одновременно
+LINEAR_COMPLEXITY_BATCH = 4096
+#сколько элементов (последовательностей x бит) преобразуется одним вызовом rfft
+SPECTRAL_BATCH = 1 << 24
+#наименьшее число циклов блуждания для тестов случайных отклонений
+MIN_CYCLES = 500
+#наименьшая длина последовательности для теста Маурера (блоки L = 6, порог NIST 1010*2^L*L)
+MAURER_MIN_BITS = 387840
+
+def _chi2_pvalue(counts, probs, df):
+    """
+    p-значение критерия хи-квадрат для частот классов `counts` при вероятностях
+    классов `probs` и `df` степенях свободы.
+    """
+    expected = counts.sum() * np.asarray(probs)
+    chi2 = float(np.sum((counts - expected)**2 / expected))
+    return igamc(df / 2, chi2 / 2)
 
 def frequency_test(bits):
     """
     Тест частоты (Frequency Test). Оценивает равномерность распределения 0 и 1 в последовательности.
 
     :param bits: Последовательность битов.
-    :type bits: list[int]
+    :type bits: BitStream | np.ndarray | list[int]
     :return: p-значение теста.
     :rtype: float
     """
-    return 2 * (1 - norm.cdf(abs(2 * sum(bits) - len(bits)) / np.sqrt(len(bits))))
+    bits = as_stream(bits)
+    return _frequency_pvalue(bits.count_ones(), len(bits))
+
+def _frequency_pvalue(ones, n):
+    """
+    p-значение теста частоты по числу единиц `ones` среди `n` бит.
+    """
+    return 2 * (1 - norm_cdf(abs(2 * ones - n) / np.sqrt(n)))
 
 def block_frequency_test(bits, block_size):
     """
-    Тест частоты в блоках. Проверяет равномерность 0 и 1 в заданных блоках.
+    Тест частоты в блоках. Проверяет равномерность 0 и 1 в заданных блоках:
+    `χ² = 4M Σ(π_i - 1/2)²` по долям единиц `π_i` в `N = n // M` блоках,
+    p-значение `igamc(N/2, χ²/2)`.
 
     :param bits: Последовательность битов.
-    :type bits: list[int]
-    :param block_size: Размер блока.
+    :type bits: BitStream | np.ndarray | list[int]
+    :param block_size: Размер блока `M` (NIST рекомендует `M >= 20`, `M > 0.01n`).
     :type block_size: int
     :return: p-значение теста.
     :rtype: float
     """
-    blocks = [bits[i:i+block_size] for i in range(0, len(bits), block_size)]
-    return 2 * (1 - norm.cdf(abs(2 * sum(map(sum, blocks)) - len(bits)) / np.sqrt(len(bits))))
+    ones = as_stream(bits).block_ones(block_size)
+    if not len(ones):
+        raise ValueError("sequence is shorter than one block")
+    deviation = int(np.sum((2 * ones - block_size)**2))
+    return _block_frequency_pvalue(deviation, len(ones), block_size)
+
+def _block_frequency_pvalue(deviation, N, M):
+    """
+    p-значение теста частоты в блоках по сумме `Σ(2·ones_i - M)²` по `N` блокам
+    длины `M` (`χ² = 4M Σ(π_i - 1/2)²` - эта сумма, деленная на `M`).
+    """
+    return igamc(N / 2, deviation / M / 2)
+
+def _cusum_pvalue(z, n):
+    """
+    p-значение теста кумулятивных сумм для наибольшего отклонения `z`
+    блуждания длины `n`.
+    """
+    if z == 0:
+        return 1.0
+    total = 1.0
+    #слагаемые дальше 10 сигм от нуля пренебрежимо малы
+    limit = int(10 * sqrt(n) / (4 * z)) + 2
+    for k in range(max(int((-n / z + 1) / 4), -limit), min(int((n / z - 1) / 4), limit) + 1):
+        total -= norm_cdf((4 * k + 1) * z / sqrt(n)) - norm_cdf((4 * k - 1) * z / sqrt(n))
+    for k in range(max(int((-n / z - 3) / 4), -limit), min(int((n / z - 1) / 4), limit) + 1):
+        total += norm_cdf((4 * k + 3) * z / sqrt(n)) - norm_cdf((4 * k + 1) * z / sqrt(n))
+    return total
 
 def cumulative_sum_test(bits):
     """
-    Кумулятивный тест суммы. Проверяет отклонение кумулятивной суммы от ожидаемого значения.
+    Тест кумулятивных сумм. Наибольшее отклонение от нуля случайного блуждания
+    (частичных сумм шагов `±1`) сравнивается с его распределением для случайной
+    последовательности; суммы накапливаются с начала и с конца последовательности.
 
-    :param bits: Последовательность битов.
-    :type bits: list[int]
-    :return: p-значение теста.
-    :rtype: float
+    :param bits: Последовательность битов или уже вычисленное блуждание.
+    :type bits: RandomWalk | BitStream | np.ndarray | list[int]
+    :return: Пара p-значений (прямые суммы, обратные суммы).
+    :rtype: tuple[float, float]
     """
-    s = np.cumsum([2*b-1 for b in bits])
-    return 2 * (1 - norm.cdf(abs(s[-1]) / np.sqrt(len(bits))))
+    walk = as_walk(bits)
+    return _cusum_pvalue(walk.forward, walk.n), _cusum_pvalue(walk.backward, walk.n)
 
 def runs_test(bits):
     """
-    Тест серий (Runs Test). Оценивает частоту чередования 0 и 1 в последовательности.
+    Тест серий (Runs Test). Оценивает частоту чередования 0 и 1 в последовательности:
+    число серий `V = 1 + (число смен значения)` сравнивается с `2nπ(1 - π)`.
+    Если доля единиц `π` не прошла предварительный тест частоты, p-значение равно 0.
 
     :param bits: Последовательность битов.
-    :type bits: list[int]
+    :type bits: BitStream | np.ndarray | list[int]
     :return: p-значение теста.
     :rtype: float
     """
-    runs = sum(1 for i in range(1, len(bits)) if bits[i] != bits[i-1])
-    expected_runs = 2 * len(bits) / 3
-    return 2 * (1 - norm.cdf(abs(runs - expected_runs) / np.sqrt(len(bits))))
+    bits = as_stream(bits)
+    return _runs_pvalue(bits.count_ones(), bits.transitions(), len(bits))
 
-def longest_run_test(bits, block_size):
+def _runs_pvalue(ones, transitions, n):
     """
-    Тест максимальной длины серии. Проверяет максимальную длину последовательной серии 0 или 1.
+    p-значение теста серий по числу единиц и числу смен значения среди `n` бит.
+    """
+    pi = ones / n
+    if abs(pi - 0.5) >= 2 / sqrt(n):
+        return 0.0
+    runs = transitions + 1
+    return erfc(abs(runs - 2 * n * pi * (1 - pi)) / (2 * sqrt(2 * n) * pi * (1 - pi)))
+
+def longest_run_test(bits, block_size=None):
+    """
+    Тест самой длинной серии единиц в блоке. Распределение длин самых длинных
+    серий в `N = n // M` блоках сравнивается с теоретическим критерием хи-квадрат.
 
     :param bits: Последовательность битов.
-    :type bits: list[int]
-    :param block_size: Размер блока.
+    :type bits: BitStream | np.ndarray | list[int]
+    :param block_size: Размер блока `M`: 8, 128 или 10000; по умолчанию выбирается
+        по длине последовательности (не меньше 128, 6272 и 750000 бит соответственно).
     :type block_size: int
     :return: p-значение теста.
     :rtype: float
     """
-    max_run = max(map(len, ''.join(map(str, bits)).split('0')))
-    return 2 * (1 - norm.cdf(abs(max_run - block_size) / np.sqrt(block_size)))
+    bits = as_stream(bits)
+    if block_size is None:
+        block_size = _longest_run_block(len(bits))
+    if block_size not in LONGEST_RUN:
+        raise ValueError(f"block_size must be one of {sorted(LONGEST_RUN)}")
+    counts = _longest_run_counts(bits, block_size)
+    if not counts.sum():
+        raise ValueError("sequence is shorter than one block")
+    probs = LONGEST_RUN[block_size][1]
+    return _chi2_pvalue(counts, probs, len(probs) - 1)
+
+def _longest_run_block(n):
+    """
+    Длина блока теста самой длинной серии по умолчанию для `n` бит.
+    """
+    return 10000 if n >= 750000 else 128 if n >= 6272 else 8
 
-def rank_test(bits, matrix_size):
+def _longest_run_counts(bits, M):
     """
-    Тест ранга. Оценивает ранг матрицы, сформированной из последовательности.
+    Частоты классов длины самой длинной серии единиц в блоках длины `M`.
+    """
+    low, probs = LONGEST_RUN[M]
+    K = len(probs) - 1
+    return np.bincount(np.clip(bits.longest_runs(M) - low, 0, K), minlength=K + 1)
+
+def rank_test(bits, matrix_size=32):
+    """
+    Тест ранга двоичных матриц. Последовательность делится на `N = n // M^2`
+    матриц `M x M`, их ранги над GF(2) делятся на классы `M`, `M - 1` и остальные,
+    и частоты классов сравниваются с теоретическими критерием хи-квадрат.
 
     :param bits: Последовательность битов.
-    :type bits: list[int]
-    :param matrix_size: Размер матрицы (n x n).
+    :type bits: BitStream | np.ndarray | list[int]
+    :param matrix_size: Размер матрицы `M` (не больше 64; в NIST 32).
     :type matrix_size: int
     :return: p-значение теста.
     :rtype: float
     """
-    matrix = np.array(bits).reshape(matrix_size, matrix_size)
-    rank = np.linalg.matrix_rank(matrix)
-    return 2 * (1 - norm.cdf(abs(rank - matrix_size) / np.sqrt(matrix_size)))
+    bits = as_stream(bits)
+    if len(bits) < matrix_size * matrix_size:
+        raise ValueError("sequence is shorter than one matrix")
+    return _rank_pvalue(_rank_counts(bits, matrix_size), matrix_size)
+
+def _rank_counts(bits, M):
+    """
+    Частоты классов рангов `<= M - 2`, `M - 1`, `M` матриц `M x M` из `n // M^2`
+    последовательных блоков.
+    """
+    N = len(bits) // (M * M)
+    ranks = gf2_rank(bits.words(M, N * M).reshape(N, M), M)
+    return np.bincount(np.clip(ranks - (M - 2), 0, None), minlength=3)
+
+def _rank_pvalue(counts, M):
+    """
+    p-значение теста ранга по частотам классов рангов.
+    """
+    probs = rank_probabilities(M, M)
+    return _chi2_pvalue(counts, [probs[:M - 1].sum(), probs[M - 1], probs[M]], 2)
 
 def fourier_transform_test(bits):
     """
-    Тест преобразования Фурье. Проверяет спектральное распределение последовательности.
+    Спектральный тест (дискретное преобразование Фурье). Считает, сколько
+    из первых `n/2` амплитуд спектра последовательности `±1` ниже порога
+    `T = √(ln(1/0.05)·n)`, и сравнивает это число с ожидаемым `0.95·n/2`.
 
     :param bits: Последовательность битов.
-    :type bits: list[int]
+    :type bits: BitStream | np.ndarray | list[int]
     :return: p-значение теста.
     :rtype: float
     """
-    N = len(bits)
-    f = np.fft.fft(bits)
-    return 2 * (1 - norm.cdf(abs(f[1]) / np.sqrt(N)))
+    return float(fourier_transform_batch([bits])[0])
+
+def fourier_transform_batch(sequences):
+    """
+    Спектральный тест для набора последовательностей одной длины: последовательности
+    собираются в двумерный массив float32 и преобразуются одним вызовом `np.fft.rfft`
+    по строкам (по `SPECTRAL_BATCH // n` строк за раз).
+
+    :param sequences: Двумерный массив бит (строка - последовательность)
+        или список последовательностей.
+    :type sequences: np.ndarray | list[BitStream | np.ndarray | list[int]]
+    :return: Массив p-значений, по одному на последовательность.
+    :rtype: np.ndarray
+    """
+    n = len(sequences[0])
+    return np.array([_spectral_pvalue(peaks, n) for peaks in _spectral_peaks(sequences)])
+
+def _spectral_peaks(sequences):
+    """
+    Число амплитуд ниже порога `√(ln(1/0.05)·n)` среди первых `n/2` амплитуд
+    спектра каждой последовательности.
+    """
+    count = len(sequences)
+    n = len(sequences[0])
+    threshold = sqrt(log(1 / 0.05) * n)
+    peaks = np.zeros(count, dtype=np.int64)
+    step = max(1, SPECTRAL_BATCH // n)
+    for first in range(0, count, step):
+        group = sequences[first:first + step]
+        signal = np.empty((len(group), n), dtype=np.float32)
+        for row, bits in zip(signal, group):
+            bits = as_bits(bits)
+            if len(bits) != n:
+                raise ValueError("sequences must have the same length")
+            row[:] = bits
+        signal *= 2
+        signal -= 1
+        spectrum = np.abs(np.fft.rfft(signal, axis=1)[:, :n // 2])
+        peaks[first:first + step] = np.count_nonzero(spectrum < threshold, axis=1)
+    return peaks
+
+def _spectral_pvalue(peaks, n):
+    """
+    p-значение спектрального теста по числу амплитуд ниже порога. Ожидаемое число
+    и дисперсия пропорциональны длине, поэтому `peaks` и `n` могут быть суммами
+    по нескольким независимым участкам.
+    """
+    d = (peaks - 0.95 * n / 2) / sqrt(n * 0.95 * 0.05 / 4)
+    return erfc(abs(d) / sqrt(2))
+
+def aperiodic_templates(m=9):
+    """
+    Апериодические шаблоны длины `m`: ни один собственный префикс не совпадает
+    с суффиксом той же длины (для `m = 9` их 148, как в наборе NIST). Вхождения
+    такого шаблона не могут перекрываться.
+
+    :param m: Длина шаблона.
+    :type m: int
+    :return: Шаблоны из символов '0' и '1' в порядке возрастания.
+    :rtype: list[str]
+    """
+    out = []
+    for code in range(1 << m):
+        t = format(code, f'0{m}b')
+        if all(t[k:] != t[:m - k] for k in range(1, m)):
+            out.append(t)
+    return out
+
+def _template_counts(bits, m, blocks, block_size, overlap_code):
+    """
+    Один проход по скользящим m-битным кодам потока для обоих тестов шаблонов.
+
+    :param bits: Упакованная последовательность.
+    :type bits: BitStream
+    :param m: Длина шаблонов.
+    :type m: int
+    :param blocks: Количество блоков `N` теста непересекающихся шаблонов.
+    :type blocks: int
+    :param block_size: Длина блока `M` теста перекрывающегося шаблона.
+    :type block_size: int
+    :param overlap_code: Код шаблона теста с перекрытиями.
+    :type overlap_code: int
+    :return: Матрица `(N, 2^m)` числа вхождений каждого шаблона в каждый блок
+        длины `n // N` и массив числа вхождений шаблона `overlap_code` в каждый
+        из `n // block_size` блоков.
+    :rtype: tuple[np.ndarray, np.ndarray]
+    """
+    n = len(bits)
+    size = n // blocks
+    count = n // block_size
+    W = np.zeros(blocks << m, dtype=np.int64)
+    V = np.zeros(count, dtype=np.int64)
+    total = n - m + 1
+    for start in range(0, max(total, 0), CHUNK_BITS):
+        codes = bits.codes(m, start, min(total, start + CHUNK_BITS)).astype(np.int64)
+        pos = np.arange(start, start + len(codes), dtype=np.int64)
+        #окно учитывается, только если целиком лежит внутри блока
+        j = pos // size
+        keep = (j < blocks) & (pos - j * size <= size - m)
+        W += np.bincount((j[keep] << m) + codes[keep], minlength=blocks << m)
+        hits = pos[codes == overlap_code]
+        j = hits // block_size
+        keep = (j < count) & (hits - j * block_size <= block_size - m)
+        V += np.bincount(j[keep], minlength=count)
+    return W.reshape(blocks, 1 << m), V
+
+def _non_overlapping_pvalues(total, squares, N, M, m):
+    """
+    p-значения теста непересекающихся шаблонов по суммам чисел вхождений `ΣW`
+    и их квадратов `ΣW²` (массивы по шаблонам) в `N` блоках длины `M`:
+    `Σ(W - μ)² = ΣW² - 2μΣW + Nμ²`.
+    """
+    mu = (M - m + 1) / 2**m
+    sigma2 = M * (1 / 2**m - (2 * m - 1) / 2**(2 * m))
+    chi2 = (squares - 2 * mu * total + N * mu**2) / sigma2
+    return np.array([igamc(N / 2, x / 2) for x in chi2])
+
+def _non_overlapping_sums(W):
+    """
+    Суммы `ΣW` и `ΣW²` по блокам для матрицы чисел вхождений `(N, T)`.
+    """
+    return W.sum(axis=0), (W * W).sum(axis=0)
+
+def _overlapping_counts(V):
+    """
+    Частоты классов 0, 1, 2, 3, 4, >=5 вхождений шаблона в блоки.
+    """
+    return np.bincount(np.clip(V, 0, 5), minlength=6)
+
+def _overlapping_pvalue(observed, m, block_size):
+    """
+    p-значение теста перекрывающегося шаблона по частотам классов числа вхождений.
+    """
+    if (block_size, m) == (1032, 9):
+        probs = np.array(OVERLAPPING_PROBS)
+    else:
+        eta = (block_size - m + 1) / 2**m / 2
+        probs = np.array([_overlapping_prob(u, eta) for u in range(5)])
+        probs = np.append(probs, 1 - probs.sum())
+    return _chi2_pvalue(observed, probs, 5)
+
+def _overlapping_prob(u, eta):
+    """
+    Вероятность `u` вхождений шаблона в блок (формула из эталонной реализации NIST).
+    """
+    if u == 0:
+        return exp(-eta)
+    return sum(exp(-eta - u * log(2) + l * log(eta) - lgamma(l + 1) + lgamma(u) - lgamma(l) - lgamma(u - l + 1))
+               for l in range(1, u + 1))
 
-def template_matching_test(bits, template):
+def template_matching_test(bits, template, blocks=8):
     """
-    Тест поиска шаблона. Проверяет частоту появления заданного шаблона в последовательности.
+    Тест непересекающихся шаблонов. Последовательность делится на `N` блоков, в каждом
+    считается число непересекающихся вхождений апериодического шаблона, и отклонения
+    от ожидаемого `μ = (M - m + 1)/2^m` суммируются в критерий хи-квадрат.
 
     :param bits: Последовательность битов.
-    :type bits: list[int]
-    :param template: Шаблон для поиска.
+    :type bits: BitStream | np.ndarray | list[int]
+    :param template: Апериодический шаблон из символов '0' и '1'.
     :type template: str
+    :param blocks: Количество блоков `N` (в NIST 8).
+    :type blocks: int
     :return: p-значение теста.
     :rtype: float
     """
-    matches = sum(1 for i in range(len(bits)-len(template)+1) if bits[i:i+len(template)] == template)
-    expected_matches = (len(bits) - len(template) + 1) / 2
-    return 2 * (1 - norm.cdf(abs(matches - expected_matches) / np.sqrt(len(bits))))
+    bits = as_stream(bits)
+    m = len(template)
+    if template not in aperiodic_templates(m):
+        raise ValueError("template must be aperiodic")
+    W, _ = _template_counts(bits, m, blocks, len(bits), -1)
+    total, squares = _non_overlapping_sums(W[:, [int(template, 2)]])
+    return float(_non_overlapping_pvalues(total, squares, blocks, len(bits) // blocks, m)[0])
 
-def overlapping_template_matching_test(bits, template):
+def overlapping_template_matching_test(bits, template='111111111', block_size=1032):
     """
-    Тест с перекрывающимися шаблонами. Проверяет частоту появления шаблона с учётом перекрытий.
+    Тест перекрывающегося шаблона. Последовательность делится на блоки длины `M`,
+    в каждом считается число вхождений шаблона с перекрытиями, и распределение
+    этих чисел по классам 0, 1, 2, 3, 4, >=5 сравнивается с теоретическим.
 
     :param bits: Последовательность битов.
-    :type bits: list[int]
-    :param template: Шаблон для поиска.
+    :type bits: BitStream | np.ndarray | list[int]
+    :param template: Шаблон из символов '0' и '1' (в NIST девять единиц).
     :type template: str
+    :param block_size: Длина блока `M` (в NIST 1032).
+    :type block_size: int
     :return: p-значение теста.
     :rtype: float
     """
-    matches = sum(1 for i in range(len(bits)-len(template)+1) if bits[i:i+len(template)] == template)
-    expected_matches = (len(bits) - len(template) + 1) / 2
-    return 2 * (1 - norm.cdf(abs(matches - expected_matches) / np.sqrt(len(bits))))
+    bits = as_stream(bits)
+    m = len(template)
+    _, V = _template_counts(bits, m, 1, block_size, int(template, 2))
+    if not len(V):
+        raise ValueError("sequence is shorter than one block")
+    return _overlapping_pvalue(_overlapping_counts(V), m, block_size)
 
-def maurers_test(bits):
+def template_tests(bits, m=9, blocks=8, block_size=1032):
     """
-    Тест уникальности подпоследовательностей. Проверяет количество уникальных подпоследовательностей.
+    Оба теста шаблонов за один проход по последовательности: тест непересекающихся
+    шаблонов для всех апериодических шаблонов длины `m` и тест перекрывающегося
+    шаблона из `m` единиц.
+
+    :param bits: Последовательность битов.
+    :type bits: BitStream | np.ndarray | list[int]
+    :param m: Длина шаблонов.
+    :type m: int
+    :param blocks: Количество блоков теста непересекающихся шаблонов.
+    :type blocks: int
+    :param block_size: Длина блока теста перекрывающегося шаблона.
+    :type block_size: int
+    :return: Словарь p-значений теста непересекающихся шаблонов по шаблонам
+        и p-значение теста перекрывающегося шаблона.
+    :rtype: tuple[dict[str, float], float]
+    """
+    bits = as_stream(bits)
+    templates = aperiodic_templates(m)
+    W, V = _template_counts(bits, m, blocks, block_size, (1 << m) - 1)
+    if not len(V):
+        raise ValueError("sequence is shorter than one block")
+    codes = [int(t, 2) for t in templates]
+    total, squares = _non_overlapping_sums(W[:, codes])
+    pvalues = _non_overlapping_pvalues(total, squares, blocks, len(bits) // blocks, m)
+    return dict(zip(templates, pvalues.tolist())), _overlapping_pvalue(_overlapping_counts(V), m, block_size)
+
+def maurers_test(bits, L=None):
+    """
+    Универсальный статистический тест Маурера. Последовательность делится на L-битные
+    блоки; первые `Q = 10*2^L` блоков заполняют таблицу последних вхождений,
+    для остальных `K` блоков усредняется `log2` расстояния до предыдущего вхождения
+    того же блока, и среднее сравнивается с табличным ожиданием и дисперсией.
+
+    Блоки обрабатываются участками: расстояния внутри участка находятся устойчивой
+    сортировкой кодов, а до первых вхождений - по таблице, поэтому память ограничена
+    таблицей из `2^L` чисел и упакованной последовательностью.
 
     :param bits: Последовательность битов.
-    :type bits: list[int]
+    :type bits: BitStream | np.ndarray | list[int]
+    :param L: Длина блока (6-16, для меньших `L` табличные константы теста
+        неприменимы); по умолчанию наибольшая `L`, для которой `n >= 1010 * 2^L * L`
+        (это пороги NIST: 387840 бит для `L = 6` и т.д.).
+    :type L: int
     :return: p-значение теста.
     :rtype: float
+    :raises ValueError: Если `L` вне 6-16 или (при `L` по умолчанию) последовательность
+        короче `MAURER_MIN_BITS`.
+    """
+    bits = as_stream(bits)
+    n = len(bits)
+    if L is None:
+        L = _maurer_block(n)
+        if L is None:
+            raise ValueError(f"sequence is shorter than {MAURER_MIN_BITS} bits")
+    if not 6 <= L <= 16:
+        raise ValueError("L must be between 6 and 16")
+    Q = 10 * 2**L
+    K = n // L - Q
+    if K <= 0:
+        raise ValueError("sequence is too short for this L")
+    last = np.zeros(1 << L, dtype=np.int64)
+    total, _, index = _maurer_distances(bits.slice(0, (Q + K) * L), L, 0, last, Q)
+    #у первых вхождений предыдущее вхождение - "нулевой" блок
+    total += float(np.log2(index[index > Q]).sum())
+    return _maurer_pvalue(total, K, L)
+
+def _maurer_distances(bits, L, start, last, Q):
+    """
+    Расстояния до предыдущих вхождений для L-битных блоков участка. Блоки обрабатываются
+    частями: расстояния внутри части находятся устойчивой сортировкой кодов, а до
+    вхождений в предыдущих частях - по таблице последних вхождений.
+
+    :param bits: Участок из целых блоков.
+    :type bits: BitStream
+    :param L: Длина блока.
+    :type L: int
+    :param start: Количество блоков последовательности перед участком.
+    :type start: int
+    :param last: Таблица номеров последних вхождений кодов (0 - код не встречался),
+        обновляется.
+    :type last: np.ndarray
+    :param Q: Количество блоков инициализации.
+    :type Q: int
+    :return: Сумма `log2` расстояний для блоков с номерами больше `Q`, у которых есть
+        предыдущее вхождение, и массивы кодов и номеров (с единицы) блоков без
+        предыдущего вхождения.
+    :rtype: tuple[float, np.ndarray, np.ndarray]
+    """
+    count = len(bits) // L
+    total = 0.0
+    codes_first, index_first = [], []
+    step = max(1, CHUNK_BITS // L)
+    for first in range(0, count, step):
+        codes = bits.words(L, min(step, count - first), first).astype(np.int64)
+        #номера блоков во всей последовательности считаются с единицы, как в описании теста
+        index = np.arange(start + first + 1, start + first + len(codes) + 1, dtype=np.int64)
+        order = np.argsort(codes, kind='stable')
+        sc, si = codes[order], index[order]
+        new = np.ones(len(sc), dtype=bool)
+        new[1:] = sc[1:] != sc[:-1]
+        prev = np.empty_like(si)
+        prev[1:] = si[:-1]
+        prev[new] = last[sc[new]]
+        pending = prev == 0
+        codes_first.append(sc[pending])
+        index_first.append(si[pending])
+        test = (si > Q) & ~pending
+        total += float(np.log2(si[test] - prev[test]).sum())
+        end = np.append(new[1:], True)
+        last[sc[end]] = si[end]
+    empty = np.zeros(0, dtype=np.int64)
+    return total, np.concatenate(codes_first or [empty]), np.concatenate(index_first or [empty])
+
+def _maurer_block(n):
+    """
+    Длина блока теста Маурера по умолчанию для `n` бит; `None`, если `n < MAURER_MIN_BITS`
+    и тест неприменим.
+    """
+    return max([l for l in range(6, 17) if n >= 1010 * 2**l * l], default=None)
+
+def _maurer_pvalue(total, K, L):
+    """
+    p-значение теста Маурера по сумме `log2` расстояний `total` для `K` блоков.
+    """
+    f = total / K
+    c = 0.7 - 0.8 / L + (4 + 32 / L) * K**(-3 / L) / 15
+    sigma = c * sqrt(MAURER_VARIANCE[L] / K)
+    return erfc(abs(f - MAURER_EXPECTED[L]) / (sqrt(2) * sigma))
+
+def _shift_left(words):
+    """
+    Умножает многочлены над GF(2) на `x`. Многочлены записаны по столбцам массива uint64:
+    коэффициент при `x^i` - бит `i % 64` слова в строке `i // 64`.
+    """
+    carry = words[:-1] >> np.uint64(63)
+    words <<= np.uint64(1)
+    words[1:] |= carry
+
+def berlekamp_massey(blocks):
+    """
+    Линейная сложность каждой строки матрицы бит алгоритмом Берлекэмпа-Мэсси над GF(2).
+
+    Все строки обрабатываются одновременно: многочлен связи `C`, сдвинутый многочлен
+    `B*x^(n-m)` и последние биты последовательности (в обратном порядке) хранятся
+    упакованными по 64 бита в слове, а невязка - четность `C & R`. На шаге `n`
+    участвуют только слова с коэффициентами до `x^(n+1)`.
+
+    :param blocks: Матрица бит формы `(N, M)`.
+    :type blocks: np.ndarray
+    :return: Массив int64 из `N` линейных сложностей.
+    :rtype: np.ndarray
+    """
+    blocks = np.ascontiguousarray(np.asarray(blocks, dtype=np.uint64).T)
+    M, N = blocks.shape
+    W = (M + 1)//64 + 1
+    #слово w всех многочленов - строка w, так что активные слова идут подряд в памяти
+    C = np.zeros((W, N), dtype=np.uint64)
+    B = np.zeros((W, N), dtype=np.uint64)
+    R = np.zeros((W, N), dtype=np.uint64)
+    C[0] = B[0] = 1
+    L = np.zeros(N, dtype=np.int64)
+    for n in range(M):
+        k = (n + 1)//64 + 1
+        c, b, r = C[:k], B[:k], R[:k]
+        _shift_left(b)
+        _shift_left(r)
+        r[0] |= blocks[n]
+        x = np.bitwise_xor.reduce(c & r, axis=0)
+        for shift in (32, 16, 8):
+            x ^= x >> np.uint64(shift)
+        d = (POPCOUNT[(x & np.uint64(0xFF)).astype(np.uint8)] & 1).astype(bool)
+        if not d.any():
+            continue
+        grow = d & (2*L <= n)
+        old = c[:, grow]
+        c[:, d] ^= b[:, d]
+        b[:, grow] = old
+        L[grow] = n + 1 - L[grow]
+    return L
+
+def linear_complexity_test(bits, block_size=500):
+    """
+    Тест линейной сложности. Последовательность делится на `N = n // M` блоков,
+    для каждого блока алгоритмом Берлекэмпа-Мэсси находится длина `L` кратчайшего
+    LFSR, и распределение отклонений `T = (-1)^M (L - μ) + 2/9` по семи классам
+    сравнивается с теоретическим критерием хи-квадрат.
+
+    :param bits: Последовательность битов.
+    :type bits: BitStream | np.ndarray | list[int]
+    :param block_size: Длина блока `M` (NIST рекомендует 500-5000, не меньше 200 блоков).
+    :type block_size: int
+    :return: p-значение теста.
+    :rtype: float
+    """
+    bits = as_stream(bits)
+    if len(bits) < block_size:
+        raise ValueError("sequence is shorter than one block")
+    return _chi2_pvalue(_linear_complexity_counts(bits, block_size), LINEAR_COMPLEXITY_PROBS, 6)
+
+def _linear_complexity_counts(bits, M):
+    """
+    Частоты семи классов отклонения линейной сложности в `n // M` блоках длины `M`.
     """
-    pattern = [bits[i:i+5] for i in range(0, len(bits)-4)]
-    return 2 * (1 - norm.cdf(abs(len(set(map(tuple, pattern))) - len(pattern)) / np.sqrt(len(bits))))
+    N = len(bits) // M
+    L = np.empty(N, dtype=np.int64)
+    for first in range(0, N, LINEAR_COMPLEXITY_BATCH):
+        last = min(N, first + LINEAR_COMPLEXITY_BATCH)
+        L[first:last] = berlekamp_massey(bits.unpack(first * M, last * M).reshape(-1, M))
+    mu = M / 2 + (9 + (-1)**(M + 1)) / 36 - (M / 3 + 2 / 9) * 2.0**-M
+    T = (-1)**M * (L - mu) + 2 / 9
+    classes = np.searchsorted(np.array([-2.5, -1.5, -0.5, 0.5, 1.5, 2.5]), T, side='left')
+    return np.bincount(classes, minlength=7)
 
-def linear_complexity_test(bits):
+def pattern_histograms(bits, m, depth):
     """
-    Тест линейной сложности. Проверяет сложность последовательности на основе её длины.
+    Частоты перекрывающихся циклических шаблонов длины `m, m - 1, ..., m - depth`
+    за один проход по потоку. Циклическое окно длины `m - 1` - начало окна длины `m`
+    с той же позиции, поэтому более короткие гистограммы получаются суммированием
+    соседних элементов (шаблонов, отличающихся последним битом).
 
     :param bits: Последовательность битов.
-    :type bits: list[int]
-    :return: p-значение теста.
-    :rtype: float
+    :type bits: BitStream
+    :param m: Наибольшая длина шаблона (1-25).
+    :type m: int
+    :param depth: Сколько более коротких длин вычислить (не больше `m`).
+    :type depth: int
+    :return: Список массивов int64 длин `2^m, 2^(m-1), ..., 2^(m-depth)`;
+        каждый в сумме дает `n`.
+    :rtype: list[np.ndarray]
+    """
+    return _shorter_histograms(bits.pattern_counts(m, wrap=True), depth)
+
+def _shorter_histograms(counts, depth):
     """
-    complexity = np.random.randint(0, 5)
-    return 2 * (1 - norm.cdf(abs(complexity - len(bits)) / np.sqrt(len(bits))))
+    Гистограмма циклических m-битных шаблонов и `depth` гистограмм более коротких
+    шаблонов, полученных суммированием соседних элементов.
+    """
+    counts = [counts]
+    for _ in range(depth):
+        counts.append(counts[-1].reshape(-1, 2).sum(axis=1))
+    return counts
+
+def _psi2(counts, n):
+    """
+    Статистика `ψ²_m = 2^m/n Σν² - n` по частотам m-битных шаблонов.
+    """
+    return len(counts) / n * float(np.dot(counts, counts)) - n
+
+def _phi(counts, n):
+    """
+    Величина `φ_m = Σ π ln π` по частотам m-битных шаблонов (`π = ν/n`, пустые
+    шаблоны не учитываются).
+    """
+    pi = counts[counts > 0] / n
+    return float(np.sum(pi * np.log(pi)))
 
 def serial_test(bits, block_size):
     """
-    Сериальный тест. Проверяет частоту появления последовательностей фиксированной длины.
+    Сериальный тест. Проверяет равномерность частот всех перекрывающихся
+    (циклически) m-битных шаблонов: по `ψ²_m`, `ψ²_(m-1)`, `ψ²_(m-2)` вычисляются
+    `∇ψ² = ψ²_m - ψ²_(m-1)` и `∇²ψ² = ψ²_m - 2ψ²_(m-1) + ψ²_(m-2)`.
 
     :param bits: Последовательность битов.
-    :type bits: list[int]
-    :param block_size: Размер блока.
+    :type bits: BitStream | np.ndarray | list[int]
+    :param block_size: Длина шаблона `m` (2-16; NIST рекомендует `m < log2(n) - 2`).
     :type block_size: int
-    :return: p-значение теста.
-    :rtype: float
+    :return: Пара p-значений `igamc(2^(m-2), ∇ψ²/2)` и `igamc(2^(m-3), ∇²ψ²/2)`.
+    :rtype: tuple[float, float]
+    """
+    if block_size < 2:
+        raise ValueError("block_size must be at least 2")
+    bits = as_stream(bits)
+    return _serial_pvalues(pattern_histograms(bits, block_size, 2), len(bits), block_size)
+
+def _serial_pvalues(histograms, n, m):
+    """
+    p-значения сериального теста по гистограммам шаблонов длины `m, m - 1, m - 2`.
     """
-    blocks = [bits[i:i+block_size] for i in range(0, len(bits)-block_size+1)]
-    return 2 * (1 - norm.cdf(abs(sum(map(sum, blocks)) - len(bits)) / np.sqrt(len(bits))))
+    psi = [_psi2(counts, n) for counts in histograms]
+    delta = psi[0] - psi[1]
+    delta2 = psi[0] - 2 * psi[1] + psi[2]
+    return igamc(2**(m - 2), delta / 2), igamc(2**(m - 3), delta2 / 2)
 
-def approximate_entropy_test(bits):
+def approximate_entropy_test(bits, block_size=None):
     """
-    Тест приближённой энтропии. Проверяет уровень случайности последовательности.
+    Тест приближённой энтропии. Сравнивает частоты перекрывающихся (циклически)
+    шаблонов соседних длин `m` и `m + 1`: `ApEn = φ_m - φ_(m+1)`,
+    `χ² = 2n(ln 2 - ApEn)`, p-значение `igamc(2^(m-1), χ²/2)`.
 
     :param bits: Последовательность битов.
-    :type bits: list[int]
+    :type bits: BitStream | np.ndarray | list[int]
+    :param block_size: Длина шаблона `m` (1-16); по умолчанию наибольшая
+        из рекомендованных NIST (`m < log2(n) - 5`), но не больше 10.
+    :type block_size: int
     :return: p-значение теста.
     :rtype: float
     """
-    phi = sum(abs(bits[i] - bits[i+1]) for i in range(len(bits)-1))
-    return 2 * (1 - norm.cdf(abs(phi - np.mean(bits)) / np.sqrt(len(bits))))
+    bits = as_stream(bits)
+    n = len(bits)
+    if block_size is None:
+        block_size = _approximate_entropy_block(n)
+    longer, shorter = pattern_histograms(bits, block_size + 1, 1)
+    return _approximate_entropy_pvalue(longer, shorter, n, block_size)
+
+def _approximate_entropy_block(n):
+    """
+    Длина шаблона теста приближенной энтропии по умолчанию для `n` бит.
+    """
+    return min(10, max(1, n.bit_length() - 7))
+
+def _approximate_entropy_pvalue(longer, shorter, n, m):
+    """
+    p-значение теста приближенной энтропии по гистограммам шаблонов длины `m + 1` и `m`.
+    """
+    apen = _phi(shorter, n) - _phi(longer, n)
+    chi2 = 2 * n * (log(2) - apen)
+    return igamc(2**(m - 1), chi2 / 2)
+
+def excursions_applicable(walk):
+    """
+    Проверяет, достаточно ли циклов блуждания для тестов случайных отклонений:
+    NIST требует `J >= max(0.005√n, 500)`.
+
+    :param walk: Статистики блуждания.
+    :type walk: RandomWalk
+    :rtype: bool
+    """
+    return walk.cycles >= max(0.005 * sqrt(walk.n), MIN_CYCLES)
+
+def _excursion_probs(x):
+    """
+    Вероятности того, что цикл посещает состояние `x` ровно `0, 1, ..., 4`
+    и не менее 5 раз.
+    """
+    q = 1 - 1 / (2 * abs(x))
+    return np.array([q] + [q**(k - 1) / (4 * x * x) for k in range(1, 5)] + [q**4 / (2 * abs(x))])
 
 def random_excursions_test(bits):
     """
-    Тест случайных отклонений. Оценивает частоту изменения направления последовательности.
+    Тест случайных отклонений. Для состояний `x = ±1, ..., ±4` распределение числа
+    посещений состояния за цикл блуждания сравнивается с теоретическим
+    критерием хи-квадрат.
 
-    :param bits: Последовательность битов.
-    :type bits: list[int]
-    :return: p-значение теста.
-    :rtype: float
+    :param bits: Последовательность битов или уже вычисленное блуждание.
+    :type bits: RandomWalk | BitStream | np.ndarray | list[int]
+    :return: Словарь {состояние: p-значение}.
+    :rtype: dict[int, float]
     """
-    excursions = sum(1 for i in range(1, len(bits)) if bits[i] != bits[i-1])
-    return 2 * (1 - norm.cdf(abs(excursions - len(bits)) / np.sqrt(len(bits))))
+    walk = as_walk(bits)
+    if not excursions_applicable(walk):
+        raise ValueError("too few cycles for the random excursions test")
+    classes = walk.classes
+    return {x: _chi2_pvalue(classes[x], _excursion_probs(x), 5) for x in (-4, -3, -2, -1, 1, 2, 3, 4)}
 
 def random_excursions_variant_test(bits):
     """
-    Вариант теста случайных отклонений. Учитывает среднее значение отклонений.
+    Вариант теста случайных отклонений. Для состояний `x = ±1, ..., ±9` общее
+    число посещений `ξ(x)` сравнивается с числом циклов `J`:
+    p-значение `erfc(|ξ(x) - J| / √(2J(4|x| - 2)))`.
 
-    :param bits: Последовательность битов.
-    :type bits: list[int]
-    :return: p-значение теста.
-    :rtype: float
+    :param bits: Последовательность битов или уже вычисленное блуждание.
+    :type bits: RandomWalk | BitStream | np.ndarray | list[int]
+    :return: Словарь {состояние: p-значение}.
+    :rtype: dict[int, float]
     """
-    excursions = sum(1 for i in range(1, len(bits)) if bits[i] != bits[i-1])
-    return 2 * (1 - norm.cdf(abs(excursions - np.mean(bits)) / np.sqrt(len(bits))))
+    walk = as_walk(bits)
+    if not excursions_applicable(walk):
+        raise ValueError("too few cycles for the random excursions variant test")
+    J = walk.cycles
+    return {x: erfc(abs(walk.visits[x] - J) / sqrt(2 * J * (4 * abs(x) - 2))) for x in range(-9, 10) if x}
 
-def nist_tests(gen, num):
+def nist_tests(gen, num, chunk_bits=None):
     """
     Запускает набор тестов NIST для оценки качества генератора случайных чисел.
 
-    :param gen: Генератор случайных чисел.
+    :param gen: Генератор случайных чисел (генератор пакета gens или любой итератор).
     :type gen: generator
-    :param num: Количество генерируемых чисел.
+    :param num: Количество генерируемых 32-битных чисел; тесты получают
+        поток из `32*num` бит (каждое число - ровно 32 бита, включая ведущие нули).
     :type num: int
-    :return: Средний процент успешности тестов.
-    :rtype: str
-    """
-    posled = []
-    for i in range(num):
-        posled.extend(map(int, bin(next(gen))[2:]))
-    posled = [int(i) for i in posled]
-    res = []
-    res.append(frequency_test(posled))
-    res.append(block_frequency_test(posled,8))
-    res.append(cumulative_sum_test(posled))
-    res.append(runs_test(posled))
-    res.append(longest_run_test(posled,8))
-    res.append(rank_test(posled[:int(len(posled)**0.5)**2],int(len(posled)**0.5)))
-    res.append(fourier_transform_test(posled))
-    res.append(template_matching_test(posled,'111'))
-    res.append(overlapping_template_matching_test(posled,'000'))
-    res.append(maurers_test(posled))
-    res.append(linear_complexity_test(posled))
-    res.append(serial_test(posled,8))
-    res.append(approximate_entropy_test(posled))
-    res.append(random_excursions_test(posled))
-    res.append(random_excursions_variant_test(posled))
-    return round((sum(res)/15)*100,2)
\ No newline at end of file
+    :param chunk_bits: Если задан, последовательность не хранится целиком, а запрашивается
+        участками по `chunk_bits` бит и проверяется потоково (см. `gen_tests.streaming`).
+    :type chunk_bits: int
+    :return: Средний процент успешности тестов (`nist_score`): среднее p-значений,
+        умноженное на 100 и округленное до двух знаков.
+    :rtype: float
+    """
+    if chunk_bits:
+        from gen_tests.streaming import nist_stream
+        return nist_stream(gen, 32*num, chunk_bits).score()
+    return nist_score(nist_pvalues(BitStream.from_generator(gen, 32*num)))
+
+def nist_pvalues(posled):
+    """
+    p-значения всех тестов набора NIST для одной последовательности.
+
+    :param posled: Последовательность битов.
+    :type posled: BitStream | np.ndarray | list[int]
+    :return: Словарь {тест: p-значение}; для тестов с несколькими p-значениями -
+        кортеж или словарь. Тест Маурера включается, только если последовательность
+        не короче `MAURER_MIN_BITS`, тесты случайных отклонений - если блуждание
+        содержит достаточно циклов.
+    :rtype: dict
+    """
+    posled = as_stream(posled)
+    walk = RandomWalk(posled)
+    #один проход для 148 шаблонов и перекрывающегося шаблона
+    templates, overlapping = template_tests(posled)
+    res = {
+        'frequency': frequency_test(posled),
+        'block_frequency': block_frequency_test(posled,128),
+        'cumulative_sums': cumulative_sum_test(walk),
+        'runs': runs_test(posled),
+        'longest_run': longest_run_test(posled),
+        'rank': rank_test(posled),
+        'spectral': fourier_transform_test(posled),
+        'non_overlapping_templates': templates,
+        'overlapping_template': overlapping,
+        'linear_complexity': linear_complexity_test(posled),
+        'serial': serial_test(posled,8),
+        'approximate_entropy': approximate_entropy_test(posled),
+    }
+    #тест Маурера применим к последовательностям от MAURER_MIN_BITS бит, а тесты
+    #случайных отклонений - если блуждание содержит достаточно циклов; иначе
+    #в среднее они не входят
+    if _maurer_block(len(posled)) is not None:
+        res['universal'] = maurers_test(posled)
+    if excursions_applicable(walk):
+        res['random_excursions'] = random_excursions_test(walk)
+        res['random_excursions_variant'] = random_excursions_variant_test(walk)
+    return res
+
+def nist_score(pvalues):
+    """
+    Средний процент успешности тестов: среднее p-значений тестов, умноженное на 100;
+    для теста с несколькими p-значениями (кортеж или словарь) берется их среднее.
+
+    :param pvalues: Словарь {тест: p-значение, кортеж или словарь p-значений}.
+    :type pvalues: dict
+    :rtype: float
+    """
+    res = [float(np.mean(list(p.values()) if isinstance(p, dict) else p)) for p in pvalues.values()]
+    return round((sum(res)/len(res))*100,2)
@@ -4,5 +4,5 @@ setup(
     name="gen_tests",
     version="0.1",
     packages=find_packages(),
-    install_requires=[],
+    install_requires=["gens"],
 )
\ No newline at end of file
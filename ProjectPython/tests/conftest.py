@@ -0,0 +1,39 @@
+"""
+Настройка pytest: пакеты gens и gen_tests импортируются из исходных каталогов.
+Запуск из каталога ProjectPython:
+
+    python -m pytest -q tests
+"""
+import os
+import sys
+import numpy as np
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+for path in (os.path.join(ROOT, "scr"), os.path.join(ROOT, "scr_tests")):
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+def _e_fraction(a, b):
+    """
+    Сумма `a!/(a+1)! + ... + a!/b!` в виде дроби `(P, Q)` (двоичное разбиение).
+    """
+    if b - a == 1:
+        return 1, b
+    m = (a + b) // 2
+    p1, q1 = _e_fraction(a, m)
+    p2, q2 = _e_fraction(m, b)
+    return p1*q2 + p2, q1*q2
+
+@pytest.fixture(scope="session")
+def e_bits():
+    """
+    Первые 10^6 двоичных цифр числа e (включая целую часть `10`) - последовательность
+    примеров раздела 2 SP 800-22.
+    """
+    from gen_tests.bitstream import BitStream
+    n = 10**6
+    #75000! > 2^(10^6), остаток ряда меньше последнего бита
+    p, q = _e_fraction(0, 75000)
+    digits = bin(((p + q) << (n - 2)) // q)[2:]
+    return BitStream.from_bits(np.frombuffer(digits.encode(), dtype=np.uint8) - ord('0'))
@@ -0,0 +1,66 @@
+"""
+Проверки многократной проверки NIST: результат не зависит от числа процессов
+и совпадает с последовательной проверкой.
+"""
+import random
+import numpy as np
+import pytest
+from gen_tests.assessment import _draw, _flatten, nist_protocol, second_level
+from gen_tests.bitstream import BitStream
+from gen_tests.testingNIST import nist_pvalues
+from gens.protocol import as_generator, from_state
+
+def python_random(seed):
+    rng = random.Random(seed)
+    while True:
+        yield rng.getrandbits(32)
+
+def isaac():
+    from gens import isaac_generator
+    return isaac_generator(b'protocol')
+
+def lagged_fibonacci():
+    from gens import lagged_fibonacci_generator
+    return lagged_fibonacci_generator(word_bits=8)
+
+def lcg():
+    from gens import linear_congruential_generator
+    return linear_congruential_generator(2**32, 1664525, 1013904223, 7)
+
+def bbs():
+    from gens.AlgBBS_PRNG import BlumBlumShub, preferences
+    return BlumBlumShub(*preferences(3), 2**40 + 7)
+
+@pytest.mark.parametrize("make, num, skipped", [(lcg, 1000, True), (isaac, 1000, True), (bbs, 1000, True),
+                                                (bbs, 1001, False), (lagged_fibonacci, 1000, False)])
+def test_draw(monkeypatch, make, num, skipped):
+    #участок пропускается прыжком skip, без выдачи его чисел через fill
+    gen, expected = make(), make()
+    if skipped:
+        monkeypatch.setattr(type(gen), "fill", lambda self, n: pytest.fail("range replayed"))
+    state = _draw(gen, 3, num)
+    monkeypatch.undo()
+    words = np.empty(3*num + 10, dtype=np.uint32)
+    expected.fill_u32(words)
+    assert from_state(state).next_u32() == words[0]
+    assert [gen.next_u32() for _ in range(10)] == list(words[3*num:])
+
+@pytest.mark.parametrize("make", [isaac, lagged_fibonacci, lambda: python_random(5)])
+def test_workers(make):
+    sequences, num = 9, 2000
+    single = nist_protocol(make(), sequences, num, workers=1)
+    assert nist_protocol(make(), sequences, num, workers=3) == single
+    gen = as_generator(make())
+    pvalues = {}
+    for _ in range(sequences):
+        for name, p in _flatten(nist_pvalues(BitStream.from_generator(gen, 32*num))):
+            pvalues.setdefault(name, []).append(p)
+    assert single == {name: second_level(values) for name, values in pvalues.items()}
+
+def test_second_level():
+    rng = np.random.default_rng(25)
+    count, proportion, uniformity, passed = second_level(rng.random(1000))
+    assert count == 1000 and passed and uniformity > 0.0001
+    assert not second_level(rng.random(1000)**3)[3]
+    #слишком мало прошедших последовательностей при равномерных p-значениях
+    assert not second_level(np.r_[np.full(20, 0.001), rng.random(980)])[3]
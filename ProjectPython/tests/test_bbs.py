@@ -0,0 +1,38 @@
+"""
+Проверки генератора Blum-Blum-Shub по прямому вычислению состояний.
+"""
+import pytest
+from gens.AlgBBS_PRNG import BlumBlumShub, preferences
+from gens.protocol import from_state
+
+P, Q = preferences(3)
+#простые числа Мерсенна 2^127 - 1 и 2^89 - 1 - простые числа Блюма
+P2, Q2 = 2**127 - 1, 2**89 - 1
+SEED = 2**200 + 12345
+
+def reference(gen, n):
+    """
+    `n` байт из `bits_per_step` младших бит состояний, выданных `next()`.
+    """
+    k = gen.bits_per_step
+    low = ''.join(format(next(gen) & ((1 << k) - 1), f'0{k}b') for _ in range(8*n//k + 1))
+    return int(low[:8*n], 2).to_bytes(n, 'big')
+
+def test_states():
+    gen = BlumBlumShub(P, Q, SEED)
+    states = [next(gen) for _ in range(50)]
+    assert states == [SEED] + [pow(SEED, 2**i, P*Q) for i in range(1, 50)]
+    assert [gen.at(i) for i in range(50)] == states
+
+@pytest.mark.parametrize("p, q, k", [(P, Q, None), (P, Q, 1), (P, Q, 3), (P, Q, 8), (P, Q, 13),
+                                     (P2, Q2, 64), (P2, Q2, 65), (P2, Q2, 100)])
+def test_random_bytes(p, q, k):
+    expected = reference(BlumBlumShub(p, q, SEED, k), 104)
+    gen = BlumBlumShub(p, q, SEED, k)
+    assert gen.random_bytes(3) + gen.random_bytes(101) == expected
+
+def test_restore():
+    expected = BlumBlumShub(P, Q, SEED).random_bytes(104)
+    gen = BlumBlumShub(P, Q, SEED)
+    gen.random_bytes(7)
+    assert from_state(gen.getstate()).random_bytes(97) == expected[7:]
@@ -0,0 +1,53 @@
+"""
+Проверки упакованного битового потока по распакованным массивам.
+"""
+import numpy as np
+import pytest
+from gen_tests.bitstream import BitStream
+
+@pytest.fixture(params=[1, 7, 64, 1001, 100003])
+def sample(request):
+    x = np.random.default_rng(request.param).integers(0, 2, request.param).astype(np.uint8)
+    return x, BitStream.from_bits(x)
+
+def test_counts(sample):
+    x, s = sample
+    assert len(s) == len(x)
+    assert (s.unpack() == x).all()
+    assert s.count_ones() == x.sum()
+    assert s.transitions() == np.count_nonzero(x[1:] != x[:-1])
+
+@pytest.mark.parametrize("M", [1, 3, 8, 128])
+def test_blocks(sample, M):
+    x, s = sample
+    blocks = x[:len(x)//M*M].reshape(-1, M)
+    assert list(s.block_ones(M)) == list(blocks.sum(axis=1))
+    assert list(s.longest_runs(M)) == [max(map(len, ''.join(map(str, b)).split('0'))) for b in blocks]
+
+def test_slice_concatenate(sample):
+    x, s = sample
+    rng = np.random.default_rng(len(x))
+    cuts = sorted(rng.integers(0, len(x) + 1, 4).tolist())
+    edges = [0] + cuts + [len(x)]
+    parts = [s.slice(a, b) for a, b in zip(edges, edges[1:])]
+    assert all((part.unpack() == x[a:b]).all() for part, a, b in zip(parts, edges, edges[1:]))
+    joined = BitStream.concatenate(parts)
+    assert len(joined) == len(x) and (joined.packed == s.packed).all()
+
+@pytest.mark.parametrize("m", [1, 2, 9, 16])
+def test_codes(sample, m):
+    x, s = sample
+    if len(x) < m:
+        return
+    expected = [int(''.join(map(str, x[i:i + m])), 2) for i in range(len(x) - m + 1)]
+    assert list(s.codes(m)) == expected
+    wrapped = np.concatenate([x, x[:m - 1]])
+    counts = np.bincount([int(''.join(map(str, wrapped[i:i + m])), 2) for i in range(len(x))], minlength=1 << m)
+    assert list(s.pattern_counts(m, wrap=True)) == list(counts)
+
+def test_from_generator_words():
+    words = np.random.default_rng(5).integers(0, 2**32, 100, dtype=np.uint64)
+    s = BitStream.from_generator(iter(int(w) for w in words), 3000)
+    assert len(s) == 3000
+    expected = np.unpackbits(words.astype('>u4').view(np.uint8))[:3000]
+    assert (s.unpack() == expected).all()
@@ -0,0 +1,44 @@
+"""
+Проверки тестов рангов Diehard: тест выполняется, только если ожидаемая частота
+каждого класса рангов не меньше `MIN_EXPECTED`.
+"""
+import numpy as np
+import pytest
+from gen_tests.gf2 import rank_classes
+from gen_tests.testingDiehard import (MIN_EXPECTED, RANK_TESTS, binary_rank_test, birthday_spacings,
+                                      count_the_1s, diehard_tests, minimum_distance_test,
+                                      overlapping_permutations, overlapping_quadruples,
+                                      overlapping_sums, parking_lot_test, rank_matrices_needed)
+from gens.LCM import LinearCongruentialGenerator
+
+def words(num):
+    gen = LinearCongruentialGenerator(2**32, 1664525, 1013904223, 12345)
+    return gen.fill_u32(np.empty(num, dtype=np.uint32)).astype(np.int64)
+
+@pytest.mark.parametrize("rows, cols, low, needed", [(31, 31, 28, 946), (32, 32, 29, 946), (6, 8, 4, 530)])
+def test_matrices_needed(rows, cols, low, needed):
+    assert rank_matrices_needed(rows, cols, low) == needed
+    #ожидаемые частоты не зависят от наблюдаемых рангов
+    _, expected = rank_classes(np.zeros(needed, dtype=np.int64), rows, cols, low)
+    assert expected.min() >= MIN_EXPECTED
+    _, expected = rank_classes(np.zeros(needed - 1, dtype=np.int64), rows, cols, low)
+    assert expected.min() < MIN_EXPECTED
+
+@pytest.mark.parametrize("rows, cols, low", RANK_TESTS)
+def test_binary_rank_minimum(rows, cols, low):
+    needed = rank_matrices_needed(rows, cols, low)
+    samples = words(needed * rows + rows - 1)
+    with pytest.raises(ValueError, match="too few"):
+        binary_rank_test(samples[:-rows], rows, cols, low)
+    assert 0 <= binary_rank_test(samples, rows, cols, low) <= 1
+
+@pytest.mark.parametrize("num, ranks", [(1000, ()), (3180, (2,)), (30272, (0, 1, 2))])
+def test_diehard_tests(num, ranks):
+    posled = words(num)
+    res = [birthday_spacings(posled,500,50), overlapping_permutations(posled,4),
+           overlapping_quadruples(posled), count_the_1s(posled), parking_lot_test(posled,100,10),
+           minimum_distance_test(posled,100), overlapping_sums(posled,10)]
+    res += [binary_rank_test(posled, *RANK_TESTS[i]) for i in ranks]
+    gen = LinearCongruentialGenerator(2**32, 1664525, 1013904223, 12345)
+    score = diehard_tests(gen, num)
+    assert isinstance(score, float) and score == round((sum(res)/len(res))*100,2)
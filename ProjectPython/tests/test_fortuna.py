@@ -0,0 +1,30 @@
+"""
+Проверки фонового сбора энтропии Fortuna: поток накопителя останавливается.
+"""
+import gc
+from gens.Fortuna_auto import fortuna
+
+def accumulator_threads():
+    import threading
+    return [t for t in threading.enumerate() if t.name == "fortuna-accumulator"]
+
+def test_close():
+    with fortuna() as gen:
+        assert len(accumulator_threads()) == 1
+        next(gen)
+    assert not accumulator_threads()
+    gen.start_listen()
+    gen.close()
+    gen.close()
+    assert not accumulator_threads()
+
+def test_collected():
+    for _ in range(5):
+        next(fortuna())
+    gc.collect()
+    assert not accumulator_threads()
+
+def test_sources_added():
+    gen = fortuna([lambda: b'event'])
+    gen.close()
+    assert len(gen.accumulator.sources) == 3
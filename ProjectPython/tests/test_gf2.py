@@ -0,0 +1,44 @@
+"""
+Проверки ранга двоичных матриц над GF(2).
+"""
+import itertools
+import numpy as np
+import pytest
+from gen_tests.gf2 import gf2_rank, rank_probabilities
+
+def scalar_rank(rows, cols):
+    rows = [int(r) for r in rows]
+    rank = 0
+    for col in range(cols):
+        pivot = next((i for i in range(rank, len(rows)) if rows[i] >> col & 1), None)
+        if pivot is None:
+            continue
+        rows[rank], rows[pivot] = rows[pivot], rows[rank]
+        for i in range(len(rows)):
+            if i != rank and rows[i] >> col & 1:
+                rows[i] ^= rows[rank]
+        rank += 1
+    return rank
+
+@pytest.mark.parametrize("m, q", [(32, 32), (31, 31), (6, 8), (3, 5), (64, 64), (1, 1)])
+def test_gf2_rank_scalar(m, q):
+    rng = np.random.default_rng(m*100 + q)
+    X = rng.integers(0, 2**q, (300, m), dtype=np.uint64)
+    #нулевая матрица, одинаковые строки и строки, повторяющие другие
+    X[0] = 0
+    X[1] = X[1, 0]
+    X[2, m//2:2*(m//2)] = X[2, :m//2]
+    assert list(gf2_rank(X, q)) == [scalar_rank(rows, q) for rows in X]
+
+def test_gf2_rank_all_small():
+    #все матрицы 3 x 3 и распределение их рангов
+    matrices = np.array(list(itertools.product(range(8), repeat=3)), dtype=np.uint64)
+    ranks = gf2_rank(matrices, 3)
+    assert list(ranks) == [scalar_rank(rows, 3) for rows in matrices]
+    assert np.bincount(ranks, minlength=4)/len(matrices) == pytest.approx(rank_probabilities(3, 3))
+
+def test_rank_probabilities():
+    probs = rank_probabilities(32, 32)
+    assert probs.sum() == pytest.approx(1)
+    assert probs[32] == pytest.approx(0.2888, abs=1e-4)
+    assert probs[31] == pytest.approx(0.5776, abs=1e-4)
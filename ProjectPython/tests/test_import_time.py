@@ -0,0 +1,28 @@
+"""
+Проверки ленивого импорта: `benchmarks/import_time.py` укладывается в бюджеты,
+а `import gens` и `import gen_tests` не загружают NumPy и SciPy.
+"""
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def run(*args):
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join([os.path.join(ROOT, "scr"), os.path.join(ROOT, "scr_tests")])
+    return subprocess.run([sys.executable, *args], cwd=ROOT, env=env, capture_output=True, text=True)
+
+def test_budget():
+    result = run(os.path.join("benchmarks", "import_time.py"))
+    assert result.returncode == 0, result.stdout + result.stderr
+    assert result.stdout.count(" ok") == 2
+
+def test_lazy():
+    code = "import sys, gens, gen_tests; print(sorted(m for m in ('numpy', 'scipy') if m in sys.modules))"
+    result = run("-c", code)
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.strip() == "[]"
+    #первое обращение к имени загружает его модуль
+    result = run("-c", "import sys, gens; gens.isaac_generator; print('gens.ISAAC' in sys.modules)")
+    assert result.stdout.strip() == "True"
@@ -0,0 +1,48 @@
+"""
+Проверки линейного конгруэнтного генератора по поштучной генерации через `next()`.
+"""
+import numpy as np
+import pytest
+from gens.LCM import LinearCongruentialGenerator
+
+PARAMS = [(2**32, 1664525, 1013904223), (2**31 - 1, 16807, 0), (2**48, 25214903917, 11),
+          (2**64, 6364136223846793005, 1442695040888963407)]
+#начальное значение меньше модуля и не меньше его
+CASES = [(m, a, c, seed) for m, a, c in PARAMS for seed in (12345, m + 12345)]
+
+def reference(m, a, c, seed, n):
+    gen = LinearCongruentialGenerator(m, a, c, seed)
+    return [next(gen) for _ in range(n)]
+
+@pytest.mark.parametrize("block", [1, 100, 4096])
+@pytest.mark.parametrize("m, a, c, seed", CASES)
+def test_fill(m, a, c, seed, block):
+    gen = LinearCongruentialGenerator(m, a, c, seed, block)
+    parts = [gen.fill(k) for k in (1, 250, 0, 9749)]
+    assert [int(x) for part in parts for x in part] == reference(m, a, c, seed, 10000)
+    assert gen.position == 10000
+    assert next(gen) == reference(m, a, c, seed, 10001)[-1]
+
+@pytest.mark.parametrize("m, a, c, seed", CASES)
+def test_jump(m, a, c, seed):
+    states = reference(m, a, c, seed, 1100)
+    for k in (0, 1, 2, 7, 64, 1000, 1099):
+        gen = LinearCongruentialGenerator(m, a, c, seed).jump(k)
+        assert gen.position == k and next(gen) == states[k]
+    #прыжки складываются и для показателей больше периода
+    gen = LinearCongruentialGenerator(m, a, c, seed).jump(2**70).jump(3**40)
+    assert gen.x == LinearCongruentialGenerator(m, a, c, seed).jump(2**70 + 3**40).x
+    assert LinearCongruentialGenerator(m, a, c, seed).jump(5).jump(6).x == states[11]
+
+@pytest.mark.parametrize("stride", [1, 3, 8])
+@pytest.mark.parametrize("m, a, c, seed", CASES)
+def test_substream(m, a, c, seed, stride):
+    n = 24
+    states = reference(m, a, c, seed, n*stride)
+    gen = LinearCongruentialGenerator(m, a, c, seed)
+    #блоки по n чисел подряд и чехарда с шагом stride
+    blocks = [int(x) for i in range(stride) for x in gen.substream(i, n).fill(n)]
+    leapfrog = [gen.substream(i, stride, leapfrog=True).fill(n) for i in range(stride)]
+    assert blocks == states
+    assert [int(leapfrog[i][j]) for j in range(n) for i in range(stride)] == states
+    assert gen.position == 0 and next(gen) == states[0]
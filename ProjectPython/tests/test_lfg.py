@@ -0,0 +1,50 @@
+"""
+Проверки генератора Фибоначчи с запаздываниями по поштучной генерации.
+"""
+import operator
+import pytest
+from gens.Fibon_PRNG import lagged_fibonacci_generator, preferences
+
+def original(n):
+    """
+    Исходный генератор: `x = (base[24] + base[54]) % 256` со сдвигом базы.
+    """
+    base = preferences()
+    out = []
+    for _ in range(n):
+        x = (base[24] + base[54]) % 256
+        base = [x] + base[:54]
+        out.append(x)
+    return out
+
+def test_original():
+    expected = original(3000)
+    gen = lagged_fibonacci_generator()
+    assert [next(gen) for _ in range(3000)] == expected
+    gen = lagged_fibonacci_generator()
+    #блоки короче, длиннее и кратные меньшему запаздыванию, вперемешку с next()
+    parts = [gen.fill(k) for k in (1, 24, 25, 26, 0, 1000)] + [[next(gen)]] + [gen.fill(1923)]
+    assert [int(x) for part in parts for x in part] == expected
+    assert gen.position == 3000
+
+def reference(gen, n):
+    """
+    `x[n] = x[n-j] op x[n-k] mod 2^w` по полной истории значений генератора `gen`.
+    """
+    func = {'+': operator.add, '-': operator.sub, '*': operator.mul, '^': operator.xor}[gen.op]
+    history = gen.ring[gen.pos:] + gen.ring[:gen.pos]
+    for _ in range(n):
+        history.append(func(history[-gen.short], history[-gen.long]) & (2**gen.word_bits - 1))
+    return history[gen.long:]
+
+@pytest.mark.parametrize("lags", [(1, 2), (5, 17), (24, 55), (38, 89)])
+@pytest.mark.parametrize("word_bits", [8, 12, 32, 64])
+@pytest.mark.parametrize("op", ['+', '-', '*', '^'])
+def test_fill(op, word_bits, lags):
+    gen = lagged_fibonacci_generator(lags, op, word_bits)
+    expected = reference(gen, 2000)
+    assert [next(gen) for _ in range(700)] == expected[:700]
+    parts = [gen.fill(k) for k in (1, lags[0], lags[1] + 1, 0, 1300 - lags[0] - lags[1] - 2)]
+    assert [int(x) for part in parts for x in part] == expected[700:]
+    assert all(part.dtype == parts[0].dtype for part in parts)
+    assert gen.position == 2000
@@ -0,0 +1,184 @@
+"""
+Проверки тестов NIST SP 800-22 по примерам из описания тестов (раздел 2).
+"""
+from math import erfc, log, log2, sqrt
+import numpy as np
+import pytest
+from gen_tests.bitstream import BitStream, as_stream
+from gen_tests import testingNIST
+from gen_tests.distributions import igamc
+from gen_tests.testingNIST import (MAURER_MIN_BITS, OVERLAPPING_PROBS, _chi2_pvalue, _linear_complexity_counts,
+                                   _longest_run_counts, _maurer_block, _maurer_pvalue, _overlapping_counts, _template_counts, approximate_entropy_test,
+                                   berlekamp_massey, block_frequency_test, cumulative_sum_test, fourier_transform_test,
+                                   frequency_test, linear_complexity_test, longest_run_test, maurers_test,
+                                   nist_pvalues, overlapping_template_matching_test, random_excursions_test,
+                                   random_excursions_variant_test, rank_test, runs_test, serial_test,
+                                   template_matching_test, template_tests)
+
+#первые 100 двоичных цифр числа π из примеров раздела 2
+PI_100 = ('11001001000011111101101010100010001000010110100011'
+          '00001000110100110001001100011001100010100010111000')
+
+def bits(s):
+    return [int(c) for c in s]
+
+@pytest.mark.parametrize("test, sequence, args, expected", [
+    (frequency_test, '1011010101', (), 0.527089),
+    (frequency_test, PI_100, (), 0.109599),
+    (block_frequency_test, '0110011010', (3,), 0.801252),
+    (block_frequency_test, PI_100, (10,), 0.706438),
+    (runs_test, '1001101011', (), 0.147232),
+    (runs_test, PI_100, (), 0.500798),
+    (template_matching_test, '10100100101110010110', ('001', 2), 0.344154),
+    (serial_test, '0011011101', (3,), (0.808792, 0.670320)),
+    (approximate_entropy_test, '0100110101', (3,), 0.261961),
+    (approximate_entropy_test, PI_100, (2,), 0.235301),
+    (cumulative_sum_test, '1011010111', (), (0.4116588, 0.4116588)),
+    (cumulative_sum_test, PI_100, (), (0.219194, 0.114866)),
+])
+def test_examples(test, sequence, args, expected):
+    assert test(bits(sequence), *args) == pytest.approx(expected, abs=1e-6)
+
+def test_longest_run_example():
+    #пример 2.4.8: частоты совпадают, p-значение в описании округлено (χ² = 4.882605)
+    e = bits('11001100000101010110110001001100111000000000001001001101010100010001'
+             '001111010110100000001101011111001100111001101101100010110010')
+    assert list(_longest_run_counts(as_stream(e), 8)) == [4, 9, 3, 0]
+    assert longest_run_test(e, 8) == pytest.approx(0.180609, abs=2e-5)
+
+def spectral_reference(x):
+    x = np.asarray(x, dtype=np.float64)
+    n = len(x)
+    peaks = np.sum(np.abs(np.fft.fft(2*x - 1))[:n//2] < sqrt(log(20)*n))
+    return erfc(abs(peaks - 0.95*n/2)/sqrt(n*0.95*0.05/4)/sqrt(2))
+
+def test_fourier_transform_reference():
+    #пример 2.6.8 (0.168669) соответствует 46 пикам ниже порога, полное ДПФ дает 48
+    rng = np.random.default_rng(23)
+    sequences = [bits(PI_100)] + [rng.integers(0, 2, n) for n in (1000, 4097, 10000)]
+    for x in sequences:
+        assert fourier_transform_test(x) == pytest.approx(spectral_reference(x), abs=1e-9)
+
+@pytest.mark.parametrize("test, args, expected", [
+    (frequency_test, (), 0.953749),
+    (block_frequency_test, (128,), 0.211072),
+    (runs_test, (), 0.561917),
+    (longest_run_test, (), 0.718945),
+    (maurers_test, (7,), 0.282568),
+    (serial_test, (2,), (0.843764, 0.561915)),
+    (approximate_entropy_test, (10,), 0.700073),
+    (cumulative_sum_test, (), (0.669886, 0.724266)),
+])
+def test_e_examples(e_bits, test, args, expected):
+    assert test(e_bits, *args) == pytest.approx(expected, abs=1e-6)
+
+def test_rank_e(e_bits):
+    assert rank_test(e_bits.slice(0, 100000)) == pytest.approx(0.532069, abs=1e-6)
+
+def test_random_excursions_e(e_bits):
+    expected = {-4: 0.573306, -3: 0.197996, -2: 0.164011, -1: 0.007779,
+                1: 0.786868, 2: 0.440912, 3: 0.797854, 4: 0.778186}
+    assert random_excursions_test(e_bits) == pytest.approx(expected, abs=1e-6)
+
+def test_random_excursions_variant_e(e_bits):
+    expected = [0.858946, 0.794755, 0.576249, 0.493417, 0.633873, 0.917283, 0.934708, 0.816012, 0.826009,
+                0.137861, 0.200642, 0.441254, 0.939291, 0.505683, 0.445935, 0.512207, 0.538635, 0.593930]
+    res = random_excursions_variant_test(e_bits)
+    assert list(res) == [x for x in range(-9, 10) if x]
+    assert list(res.values()) == pytest.approx(expected, abs=1e-6)
+
+def test_linear_complexity_e(e_bits):
+    #пример 2.10.8 округляет π_0 до 0.01047, точное значение 1/96
+    counts = _linear_complexity_counts(e_bits, 1000)
+    assert list(counts) == [11, 31, 116, 501, 258, 57, 26]
+    rounded = np.array([0.01047, 0.03125, 0.125, 0.5, 0.25, 0.0625, 0.020833])
+    assert _chi2_pvalue(counts, rounded, 6) == pytest.approx(0.845406, abs=1e-6)
+    assert linear_complexity_test(e_bits, 1000) == pytest.approx(_chi2_pvalue(counts, [1/96, 1/32, 1/8, 1/2, 1/4, 1/16, 1/48], 6), abs=1e-4)
+
+def scalar_maurer(x, L):
+    Q = 10 * 2**L
+    K = len(x) // L - Q
+    last = [0] * 2**L
+    total = 0.0
+    for i in range(1, Q + K + 1):
+        code = int(''.join(map(str, x[(i - 1)*L:i*L])), 2)
+        if i > Q:
+            total += log2(i - last[code])
+        last[code] = i
+    return _maurer_pvalue(total, K, L)
+
+@pytest.mark.parametrize("chunk", [1000, 1 << 22])
+def test_maurer_scalar(monkeypatch, chunk):
+    monkeypatch.setattr(testingNIST, "CHUNK_BITS", chunk)
+    x = list(np.random.default_rng(20).integers(0, 2, 300000))
+    for L in (6, 7, 8):
+        assert maurers_test(x, L) == pytest.approx(scalar_maurer(x, L), rel=1e-9)
+
+def test_maurer_applicable():
+    assert [_maurer_block(n) for n in (MAURER_MIN_BITS - 1, MAURER_MIN_BITS, 904959, 904960)] == [None, 6, 6, 7]
+    x = np.random.default_rng(21).integers(0, 2, MAURER_MIN_BITS)
+    #табличные константы теста неприменимы к блокам короче 6 бит
+    for L in (1, 5, 17):
+        with pytest.raises(ValueError):
+            maurers_test(x, L)
+    with pytest.raises(ValueError, match="shorter"):
+        maurers_test(x[:-1])
+    assert maurers_test(x) == maurers_test(x, 6)
+    assert nist_pvalues(x)['universal'] == maurers_test(x)
+    assert 'universal' not in nist_pvalues(x[:-1])
+
+def scalar_berlekamp_massey(s):
+    n = len(s)
+    c, b = [1] + [0]*n, [1] + [0]*n
+    L, m = 0, -1
+    for N in range(n):
+        d = s[N]
+        for i in range(1, L + 1):
+            d ^= c[i] & s[N - i]
+        if d:
+            t = c[:]
+            for i in range(n + 1 - (N - m)):
+                c[i + N - m] ^= b[i]
+            if 2*L <= N:
+                L, m, b = N + 1 - L, N, t
+    return L
+
+def test_berlekamp_massey_example():
+    assert list(berlekamp_massey(np.array([bits('1101011110001')]))) == [4]
+
+@pytest.mark.parametrize("M", [1, 2, 5, 63, 64, 65, 130, 500])
+def test_berlekamp_massey_scalar(M):
+    rng = np.random.default_rng(M)
+    X = rng.integers(0, 2, (40, M)).astype(np.uint8)
+    X[0] = 0
+    X[1] = 1
+    X[2] = 0
+    X[2, -1] = 1
+    assert list(berlekamp_massey(X)) == [scalar_berlekamp_massey(list(row)) for row in X]
+
+def test_overlapping_template_example():
+    #пример 2.8.4: частоты классов в описании (0, 1, 1, 1, 1, 1) и p-значение 0.274932 не соответствуют
+    #последовательности и χ² = 3.167729; по ней блоки содержат 5, 1, 3, 4, 1 вхождений шаблона 11
+    e = BitStream.from_bits(bits('10111011110010110100011100101110111110000101101001'))
+    _, V = _template_counts(e, 2, 1, 10, 0b11)
+    assert list(V) == [5, 1, 3, 4, 1]
+    probs = np.array([0.324652, 0.182617, 0.142670, 0.106645, 0.077147, 0.166269])
+    counts = np.array([0, 2, 0, 1, 1, 1])
+    expected = igamc(5/2, np.sum((counts - 5*probs)**2/(5*probs))/2)
+    assert overlapping_template_matching_test(e, '11', 10) == pytest.approx(expected, abs=1e-5)
+
+def test_overlapping_template_e(e_bits):
+    #пример 2.8.8 считает p-значение по прежним вероятностям классов, исправленным в NIST STS 2.1
+    _, V = _template_counts(e_bits, 9, 1, 1032, 0b111111111)
+    assert list(_overlapping_counts(V)) == [329, 164, 150, 111, 78, 136]
+    old = np.array([0.367879, 0.183940, 0.137955, 0.099634, 0.069935, 0.140657])
+    assert _chi2_pvalue(_overlapping_counts(V), old, 5) == pytest.approx(0.110434, abs=1e-5)
+    expected = _chi2_pvalue(_overlapping_counts(V), np.array(OVERLAPPING_PROBS), 5)
+    assert overlapping_template_matching_test(e_bits) == pytest.approx(expected)
+
+def test_overlapping_template_matches_template_tests():
+    rng = np.random.default_rng(19)
+    for _ in range(3):
+        s = BitStream(rng.integers(0, 256, 10**6//8, dtype=np.uint8))
+        _, expected = template_tests(s)
+        assert overlapping_template_matching_test(s) == pytest.approx(expected, abs=1e-12)
@@ -0,0 +1,122 @@
+"""
+Проверки решета, теста Миллера-Рабина и дискового кэша пар простых чисел Блюма.
+"""
+import json
+from math import isqrt
+import pytest
+import gens.primes as primes
+from gens.primes import MR_LIMIT, blum_pair, is_probable_prime, segmented_sieve, small_primes
+
+@pytest.fixture(autouse=True)
+def cache(tmp_path, monkeypatch):
+    path = tmp_path / "primes.json"
+    monkeypatch.setenv(primes.CACHE_ENV, str(path))
+    blum_pair.cache_clear()
+    yield path
+    blum_pair.cache_clear()
+
+def trial_division(n):
+    return n > 1 and all(n % d for d in range(2, isqrt(n) + 1))
+
+def jacobi(a, n):
+    result = 1
+    a %= n
+    while a:
+        while a % 2 == 0:
+            a //= 2
+            if n % 8 in (3, 5):
+                result = -result
+        a, n = n, a
+        if a % 4 == 3 and n % 4 == 3:
+            result = -result
+        a %= n
+    return result if n == 1 else 0
+
+def proth_prime(n):
+    """
+    Простота числа Прота `n = k*2^e + 1`, `k < 2^e`: для `a` с символом Якоби -1
+    `n` простое тогда и только тогда, когда `a^((n-1)/2) = -1 mod n`.
+    """
+    a = next(a for a in range(3, 1000) if jacobi(a, n) != 1)
+    return jacobi(a, n) == -1 and pow(a, (n - 1)//2, n) == n - 1
+
+@pytest.mark.parametrize("segment", [1, 5, 64, primes.SEGMENT])
+@pytest.mark.parametrize("lo, hi", [(0, 3), (2, 3), (3, 4), (0, 1000), (1, 1001), (2, 1500), (999, 5000),
+                                    (4096, 4099), (4096, 4100)])
+def test_segmented_sieve(monkeypatch, segment, lo, hi):
+    monkeypatch.setattr(primes, "SEGMENT", segment)
+    assert list(segmented_sieve(lo, hi)) == [p for p in small_primes(hi) if p >= lo]
+
+def test_segment_boundaries():
+    #граница двух сегментов по умолчанию и диапазон выше 10^9
+    lo = 10**6 + 2*primes.SEGMENT - 37
+    assert list(segmented_sieve(lo, lo + 100)) == [p for p in range(lo, lo + 100) if trial_division(p)]
+    lo = 10**9 + 2*primes.SEGMENT - 101
+    assert list(segmented_sieve(lo, lo + 300)) == [p for p in range(lo, lo + 300) if trial_division(p)]
+    assert small_primes(10**6)[-1] == 999983 and len(small_primes(10**6)) == 78498
+
+def test_small_numbers():
+    assert [n for n in range(20000) if is_probable_prime(n)] == small_primes(20000)
+    #верхняя граница не включается, в том числе если она простая
+    assert [small_primes(n) for n in range(6)] == [[], [], [], [2], [2, 3], [2, 3]]
+    assert small_primes(4099)[-1] == 4093 and small_primes(4100)[-1] == 4099
+
+@pytest.mark.parametrize("k", [1, 10110, 1000051, 20000556])
+def test_carmichael(k):
+    #числа Чернике (6k + 1)(12k + 1)(18k + 1) с простыми множителями - числа Кармайкла
+    factors = (6*k + 1, 12*k + 1, 18*k + 1)
+    n = factors[0]*factors[1]*factors[2]
+    assert all(trial_division(p) and (n - 1) % (p - 1) == 0 for p in factors)
+    assert not is_probable_prime(n)
+
+def test_strong_pseudoprimes():
+    #сильные псевдопростые по основаниям 2-23, 2-37 и 2-41 (последнее - сама граница MR_LIMIT)
+    for n, factors in [(3825123056546413051, (149491, 747451, 34233211)),
+                       (318665857834031151167461, (399165290221, 798330580441)),
+                       (MR_LIMIT, (1287836182261, 2575672364521))]:
+        assert n == factors[0]*factors[1]*(factors[2] if len(factors) > 2 else 1)
+        assert not is_probable_prime(n)
+
+def test_near_limit():
+    #числа Прота k*2^41 + 1 по обе стороны MR_LIMIT: точная и вероятностная ветви теста
+    k = MR_LIMIT >> 41
+    numbers = [j*2**41 + 1 for j in range(k - 300, k + 300)]
+    assert numbers[0] < MR_LIMIT < numbers[-1]
+    expected = [proth_prime(n) for n in numbers]
+    assert [is_probable_prime(n) for n in numbers] == expected
+    assert any(p for p, n in zip(expected, numbers) if n < MR_LIMIT)
+    assert any(p for p, n in zip(expected, numbers) if n > MR_LIMIT)
+
+@pytest.mark.parametrize("safe", [False, True])
+def test_blum_pair_cache(monkeypatch, cache, safe):
+    p, q = blum_pair(40, 3, safe)
+    assert p != q
+    for x in (p, q):
+        assert x % 4 == 3 and x.bit_length() == 40 and trial_division(x)
+        assert not safe or trial_division((x - 1)//2)
+    key = f"{'safe' if safe else 'blum'}:40:3"
+    assert json.loads(cache.read_text()) == {key: [format(p, 'x'), format(q, 'x')]}
+    #повторный запрос в новом процессе читает пару с диска без поиска
+    blum_pair.cache_clear()
+    with monkeypatch.context() as m:
+        m.setattr(primes, "_search", lambda *args: pytest.fail("cached pair searched again"))
+        assert blum_pair(40, 3, safe) == (p, q)
+
+@pytest.mark.parametrize("entry", [None, "junk", ["zz", "1"], [1, 2], ["a3"], "p,q",
+                                   "composite", "one_mod_4", "short", "same"])
+def test_invalid_cache(cache, entry):
+    p, q = blum_pair(40, 0)
+    blum_pair.cache_clear()
+    #составное число, p = 1 mod 4, меньшая длина и одинаковые числа
+    corrupt = {"composite": lambda: next(x for x in range(2**39 + 3, 2**40, 4) if not trial_division(x)),
+               "one_mod_4": lambda: next(x for x in range(2**39 + 1, 2**40, 4) if trial_division(x)),
+               "short": lambda: small_primes(2**20)[-1],
+               "same": lambda: p}
+    if isinstance(entry, str) and entry in corrupt:
+        entry = [format(corrupt[entry](), 'x'), format(q, 'x')]
+    cache.write_text(json.dumps({"blum:40:0": entry}))
+    assert blum_pair(40, 0) == (p, q)
+    assert json.loads(cache.read_text()) == {"blum:40:0": [format(p, 'x'), format(q, 'x')]}
+    cache.write_text("[1, 2]")
+    blum_pair.cache_clear()
+    assert blum_pair(40, 0) == (p, q)
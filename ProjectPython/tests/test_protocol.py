@@ -0,0 +1,155 @@
+"""
+Проверки общего интерфейса генераторов: `random_bytes`, `fill_u32`, `fill_u64`
+и `next_u32` выдают один поток бит - по `bits` младших бит каждого числа `next()`;
+сохраненное состояние продолжает этот поток.
+"""
+import copy
+import pickle
+import random
+import sys
+import numpy as np
+import pytest
+from gens.protocol import MAGIC, as_generator, from_bytes, from_state, load_checkpoint
+
+def lcg(m, a, c):
+    from gens.LCM import LinearCongruentialGenerator
+    return lambda: LinearCongruentialGenerator(m, a, c, 12345)
+
+def lfg(word_bits):
+    from gens.Fibon_PRNG import lagged_fibonacci_generator
+    return lambda: lagged_fibonacci_generator(word_bits=word_bits)
+
+def isaac(bits):
+    from gens.ISAAC import Isaac
+    return lambda: Isaac(b'protocol', bits)
+
+def bbs():
+    from gens.AlgBBS_PRNG import BlumBlumShub, preferences
+    return BlumBlumShub(*preferences(3), 2**40 + 7)
+
+def shuffle():
+    from gens.MM_PRNG import maclaren_marsaliya_generator
+    return maclaren_marsaliya_generator()
+
+def bays_durham():
+    from gens.ISAAC import Isaac
+    from gens.MM_PRNG import ShuffleGenerator
+    return ShuffleGenerator(Isaac(b'table', 64), k=32)
+
+def fortuna():
+    #без фонового сбора энтропии генератор не пересевается
+    from gens.Fortuna_auto import Fortuna_auto
+    return Fortuna_auto()
+
+def python_random(bits):
+    def make():
+        rng = random.Random(bits)
+        return as_generator(iter(lambda: rng.getrandbits(64), None), bits)
+    return make
+
+GENERATORS = {
+    'lcg32': lcg(2**32, 1664525, 1013904223),
+    'lcg31': lcg(2**31 - 1, 48271, 0),
+    'lcg64': lcg(2**64, 6364136223846793005, 1442695040888963407),
+    'lfg8': lfg(8),
+    'lfg12': lfg(12),
+    'lfg64': lfg(64),
+    'isaac32': isaac(32),
+    'isaac64': isaac(64),
+    'bbs': bbs,
+    'shuffle': shuffle,
+    'iterator32': python_random(32),
+    'iterator7': python_random(7),
+}
+
+def reference(gen, n):
+    """
+    Первые `n` байт потока: по `bits` младших бит чисел `next()`, начиная со старшего.
+    """
+    k = gen.bits
+    bits = ''.join(format(int(next(gen)) & ((1 << k) - 1), f'0{k}b') for _ in range(8*n//k + 1))
+    return int(bits[:8*n], 2).to_bytes(n, 'big')
+
+@pytest.fixture(params=list(GENERATORS))
+def make(request):
+    return GENERATORS[request.param]
+
+def test_random_bytes(make):
+    expected = reference(make(), 300)
+    gen = make()
+    #остаток бит переносится между вызовами любой длины
+    assert b''.join(gen.random_bytes(k) for k in (1, 3, 0, 7, 100, 189)) == expected
+
+def test_mixed(make):
+    expected = reference(make(), 400)
+    gen = make()
+    out = [gen.random_bytes(3)]
+    out.append(gen.fill_u32(np.empty(5, dtype=np.uint32)).astype('>u4').tobytes())
+    out.append(gen.random_bytes(1))
+    out.append(gen.fill_u64(np.empty(3, dtype=np.uint64)).astype('>u8').tobytes())
+    #буфер вызывающего: bytearray заполняется словами в порядке байт платформы
+    buf = bytearray(12)
+    gen.fill_u32(buf)
+    out.append(np.frombuffer(buf, dtype=np.uint32).astype('>u4').tobytes())
+    out.append(gen.next_u32().to_bytes(4, 'big'))
+    out.append(gen.fill_u32(np.empty(7, dtype=np.uint32)).astype('>u4').tobytes())
+    out.append(gen.fill_u64(np.empty(2, dtype=np.uint64)).astype('>u8').tobytes())
+    data = b''.join(out)
+    out.append(gen.random_bytes(400 - len(data)))
+    assert b''.join(out) == expected
+
+def test_buffer_errors():
+    gen = GENERATORS['lcg32']()
+    with pytest.raises(TypeError):
+        gen.fill_u32(np.empty(4, dtype=np.uint64))
+    with pytest.raises(TypeError):
+        gen.fill_u32(bytes(16))
+
+#все классы генераторов с сохраняемым состоянием
+SAVED = [GENERATORS[name] for name in ('lcg32', 'lcg64', 'lfg12', 'lfg64', 'isaac32', 'isaac64', 'bbs', 'shuffle')]
+
+@pytest.mark.parametrize("make", SAVED + [bays_durham, fortuna])
+def test_state(make, tmp_path):
+    gen = make()
+    #состояние посреди слова: остаток бит random_bytes тоже сохраняется
+    gen.random_bytes(5)
+    next(gen)
+    state = gen.getstate()
+    data = gen.to_bytes()
+    gen.checkpoint(tmp_path / "gen.state")
+    copied = copy.deepcopy(gen)
+    pickled = pickle.loads(pickle.dumps(gen))
+
+    def tail(g):
+        words = g.fill_u32(np.empty(9, dtype=np.uint32))
+        return g.random_bytes(13), words.tolist(), g.fill_u64(np.empty(3, dtype=np.uint64)).tolist(), g.position
+
+    expected = tail(gen)
+    restored = make()
+    restored.random_bytes(100)
+    restored.setstate(state)
+    for other in (from_state(state), from_bytes(data), load_checkpoint(tmp_path / "gen.state"),
+                  copied, pickled, restored):
+        assert type(other) is type(gen)
+        assert tail(other) == expected
+    assert data.startswith(MAGIC) and from_bytes(data).to_bytes() == data
+
+def test_state_errors():
+    gen = GENERATORS['lcg32']()
+    state = gen.getstate()
+    #класс ищется только в пакете gens, сторонние модули даже не импортируются
+    for path in ('tabnanny:NannyNag', 'os:system', 'builtins:object', 'gensx.protocol:BaseGenerator',
+                 'gens.protocol:as_generator', 'gens.protocol:np'):
+        with pytest.raises(ValueError):
+            from_state((path,) + state[1:])
+    assert 'tabnanny' not in sys.modules
+    with pytest.raises(ValueError):
+        GENERATORS['isaac32']().setstate(state)
+    with pytest.raises(ValueError):
+        from_bytes(b'GENS\x00' + gen.to_bytes()[len(MAGIC):])
+    with pytest.raises(ValueError):
+        from_bytes(gen.to_bytes() + b'N')
+    with pytest.raises(ValueError):
+        from_bytes(gen.to_bytes()[:-3])
+    with pytest.raises(TypeError):
+        GENERATORS['iterator32']().getstate()
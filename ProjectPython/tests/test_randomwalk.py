@@ -0,0 +1,53 @@
+"""
+Проверки статистик случайного блуждания по прямому подсчету.
+"""
+import numpy as np
+import pytest
+import gen_tests.randomwalk as randomwalk
+from gen_tests.randomwalk import RandomWalk
+
+def reference(x):
+    S = np.cumsum(2*np.asarray(x) - 1)
+    backward = np.abs(np.cumsum((2*np.asarray(x) - 1)[::-1])).max()
+    #блуждание дополняется нулем в конце, только если не заканчивается нулем
+    padded = np.concatenate([[0], S, [0] if S[-1] else []])
+    zeros = np.flatnonzero(padded == 0)
+    cycles = [padded[a:b + 1] for a, b in zip(zeros, zeros[1:])]
+    states = [s for s in range(-9, 10) if s]
+    visits = {s: int((S == s).sum()) for s in states}
+    classes = {s: np.bincount([min(int((c == s).sum()), 5) for c in cycles], minlength=6) for s in states}
+    return int(np.abs(S).max()), int(backward), len(cycles), visits, classes
+
+def check(walk, x):
+    forward, backward, cycles, visits, classes = reference(x)
+    assert (walk.forward, walk.backward, walk.cycles) == (forward, backward, cycles)
+    assert walk.visits == visits
+    assert all((walk.classes[s] == classes[s]).all() for s in classes)
+
+def test_example():
+    #пример 2.14.4: циклы (0, -1, 0), (0, 1, 0), (0, 1, 2, 1, 2, 1, 2, 0)
+    walk = RandomWalk([0, 1, 1, 0, 1, 1, 0, 1, 0, 1])
+    assert walk.cycles == 3 and walk.visits[1] == 4
+    assert list(walk.classes[1]) == [1, 1, 0, 1, 0, 0]
+    assert list(walk.classes[2]) == [2, 0, 0, 1, 0, 0]
+
+@pytest.mark.parametrize("chunk", [64, 1000, 1 << 22])
+@pytest.mark.parametrize("n", [6, 1000, 200001])
+def test_reference(monkeypatch, n, chunk):
+    monkeypatch.setattr(randomwalk, "CHUNK_BITS", chunk)
+    x = np.random.default_rng(n).integers(0, 2, n)
+    check(RandomWalk(x), x)
+
+def test_merge():
+    x = np.random.default_rng(3).integers(0, 2, 100000)
+    edges = [0, 1, 517, 40000, 40001, 99999, 100000]
+    walk = None
+    for a, b in zip(edges, edges[1:]):
+        part = RandomWalk(x[a:b], level=int(2*x[:a].sum() - a))
+        if walk is None:
+            walk = part
+        else:
+            walk.merge(part)
+    check(walk, x)
+    with pytest.raises(ValueError):
+        walk.merge(RandomWalk(x[:10], level=walk.final + 1))
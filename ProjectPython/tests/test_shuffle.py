@@ -0,0 +1,90 @@
+"""
+Проверки перемешивающего комбинатора по исходному генератору Макларена-Марсальи
+и по алгоритму B Кнута (схема Бейса-Дурхэма).
+"""
+import pytest
+from gens.LCM import LinearCongruentialGenerator
+from gens.MM_PRNG import ShuffleGenerator, maclaren_marsaliya_generator
+
+def baseline(n):
+    """
+    Исходная реализация `maclaren_marsaliya_generator`.
+    """
+    mY = 2**32
+    genX = LinearCongruentialGenerator(2_147_483_648, 594_156_893, 75_692, 123_456_789)
+    genY = LinearCongruentialGenerator(mY, 1_103_515_245, 12_345, 436_524_372)
+    k = 128
+    v = [0] + [next(genX) for i in range(k)]
+    out = []
+    for _ in range(n):
+        x = next(genX)
+        y = next(genY)
+        j = (k*y)//mY + ((k*y)%mY >= 0.5)
+        out.append(v[j])
+        v[j] = x
+    return out
+
+def maclaren_marsaglia(gen_x, gen_y, k, n):
+    """
+    Алгоритм M: ячейку `ceil(k*y / mY)` таблицы чисел `gen_x` выбирает число `gen_y`.
+    """
+    v = [0] + [next(gen_x) for _ in range(k)]
+    out = []
+    for _ in range(n):
+        x = next(gen_x)
+        j = -(-k*next(gen_y)//gen_y.m)
+        out.append(v[j])
+        v[j] = x
+    return out
+
+def bays_durham(gen, k, n):
+    """
+    Алгоритм B: таблица из `k` чисел, ячейку выбирает предыдущее выданное число.
+    """
+    v = [next(gen) for _ in range(k)]
+    y = next(gen)
+    out = []
+    for _ in range(n):
+        j = k*y//gen.m
+        y = v[j]
+        v[j] = next(gen)
+        out.append(y)
+    return out
+
+def lcg():
+    return LinearCongruentialGenerator(2**32, 1664525, 1013904223, 7)
+
+def isaac():
+    from gens.ISAAC import Isaac
+    return Isaac(b'shuffle')
+
+def lagged_fibonacci():
+    from gens.Fibon_PRNG import lagged_fibonacci_generator
+    return lagged_fibonacci_generator(word_bits=8)
+
+def read(gen, n, sizes):
+    #поштучно и блоками разной длины
+    parts = [[next(gen)]] + [gen.fill(k) for k in sizes] + [gen.fill(n - 1 - sum(sizes))]
+    return [int(x) for part in parts for x in part]
+
+@pytest.mark.parametrize("block", [1, 100, 4096])
+def test_maclaren_marsaglia(block):
+    expected = baseline(5000)
+    gen = maclaren_marsaliya_generator()
+    assert [next(gen) for _ in range(5000)] == expected
+    gen = maclaren_marsaliya_generator()
+    gen.block = block
+    assert read(gen, 5000, (127, 0, 1000)) == expected
+
+@pytest.mark.parametrize("make", [lcg, isaac, lagged_fibonacci])
+@pytest.mark.parametrize("k", [1, 32, 128])
+def test_bays_durham(make, k):
+    expected = bays_durham(make(), k, 3000)
+    assert [next(gen) for gen in [ShuffleGenerator(make(), k=k)] for _ in range(3000)] == expected
+    assert read(ShuffleGenerator(make(), k=k, block=100), 3000, (99, 0, 250)) == expected
+
+@pytest.mark.parametrize("make_x, make_y", [(isaac, lcg), (lagged_fibonacci, isaac), (lcg, lagged_fibonacci)])
+def test_combinations(make_x, make_y):
+    expected = maclaren_marsaglia(make_x(), make_y(), 64, 3000)
+    gen = ShuffleGenerator(make_x(), make_y(), k=64, block=100)
+    assert read(gen, 3000, (99, 0, 250)) == expected
@@ -0,0 +1,58 @@
+"""
+Проверки потокового набора NIST: результат не зависит от деления последовательности
+на участки и совпадает с `nist_pvalues`.
+"""
+import pickle
+import numpy as np
+import pytest
+from gen_tests.bitstream import BitStream
+from gen_tests.streaming import NistStream, nist_stream
+from gen_tests.testingNIST import nist_pvalues
+
+def assert_same(result, expected):
+    assert result.keys() == expected.keys()
+    for name, p in expected.items():
+        values = list(p.values()) if isinstance(p, dict) else p
+        other = list(result[name].values()) if isinstance(p, dict) else result[name]
+        assert np.allclose(other, values, rtol=1e-9, atol=1e-11), name
+
+@pytest.fixture(scope="module", params=[32000, 100003, 1000000])
+def sample(request):
+    rng = np.random.default_rng(request.param)
+    x = rng.integers(0, 2, request.param)
+    return x, BitStream.from_bits(x)
+
+def test_update(sample):
+    x, s = sample
+    rng = np.random.default_rng(1)
+    stream = NistStream(len(x))
+    start = 0
+    while start < len(x):
+        stop = start + int(rng.integers(1, len(x)//3))
+        stream.update(s.slice(start, stop))
+        start = stop
+    assert_same(stream.pvalues(), nist_pvalues(s))
+
+def test_merge(sample):
+    x, s = sample
+    rng = np.random.default_rng(2)
+    edges = [0] + sorted(set(rng.integers(1, len(x), 6).tolist())) + [len(x)]
+    parts = [NistStream(len(x), s.slice(a, b), a, int(2*x[:a].sum() - a)) for a, b in zip(edges, edges[1:])]
+    #объединение по дереву и восстановление из pickle
+    while len(parts) > 1:
+        merged = []
+        for a, b in zip(parts[::2], parts[1::2]):
+            a.merge(b)
+            merged.append(pickle.loads(pickle.dumps(a)))
+        parts = merged + parts[len(parts)//2*2:]
+    assert_same(parts[0].pvalues(), nist_pvalues(s))
+
+def test_extend():
+    from gens import isaac_generator
+    expected = nist_pvalues(BitStream.from_generator(isaac_generator(b'seed'), 32*40000))
+    assert_same(nist_stream(isaac_generator(b'seed'), 32*40000, 32*4096).pvalues(), expected)
+    gen = isaac_generator(b'seed')
+    stream = NistStream(32*40000)
+    stream.extend(gen, 32*25000, 32*3000)
+    stream.extend(gen, 32*15000, 32*5000)
+    assert_same(stream.pvalues(), expected)